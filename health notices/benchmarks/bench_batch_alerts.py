@@ -0,0 +1,66 @@
+"""
+Throughput of the batch alert job against scoring each location through
+predict_weather and get_recommendations one at a time
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from batch_alerts import run_batch  # noqa: E402
+from predict import MODEL_PATH, get_recommendations, predict_weather  # noqa: E402
+
+FALLBACK_MODEL_PATH = os.path.join(SRC_DIR, 'models', 'saved_models', 'weather_model.joblib')
+
+def write_grid(path, rows, seed=0):
+    """Readings over a lat/lon grid covering India"""
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(rows)))
+    lat, lon = np.meshgrid(np.linspace(8, 35, side), np.linspace(68, 97, side))
+    pd.DataFrame({
+        'latitude': lat.ravel()[:rows],
+        'longitude': lon.ravel()[:rows],
+        'temperature': rng.uniform(-20, 50, rows),
+        'humidity': rng.uniform(0, 100, rows),
+        'wind_speed': rng.uniform(0, 50, rows),
+        'uvi': rng.uniform(0, 11, rows),
+    }).to_csv(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--loop-rows', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--model', default=MODEL_PATH if os.path.exists(MODEL_PATH) else FALLBACK_MODEL_PATH)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    readings = os.path.join(directory, 'readings.csv')
+    write_grid(readings, args.rows)
+    print(f"{args.rows:,} readings ({os.path.getsize(readings) / 1e6:.0f} MB CSV)")
+
+    sample = pd.read_csv(readings, nrows=args.loop_rows)
+    predict_weather([0, 0, 0], args.model)
+    start = time.perf_counter()
+    for row in sample.itertuples():
+        condition = predict_weather([row.temperature, row.humidity, row.wind_speed], args.model)
+        get_recommendations(condition, row.uvi, row.humidity)
+    elapsed = time.perf_counter() - start
+    print(f"per-row loop ({args.loop_rows} rows):        {args.loop_rows / elapsed:>10,.0f} rows/s")
+
+    for workers in dict.fromkeys(args.workers):
+        rows, written, elapsed = run_batch(readings, os.path.join(directory, 'alerts.csv'), args.model,
+                                           workers=workers)
+        print(f"run_batch, {workers} worker(s):            {rows / elapsed:>10,.0f} rows/s "
+              f"({elapsed:.1f}s, {written:,} alerts)")
+
+if __name__ == '__main__':
+    main()
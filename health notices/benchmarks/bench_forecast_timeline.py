@@ -0,0 +1,55 @@
+"""
+Cost of the full 40-interval forecast risk timeline against one single-row prediction,
+both the original predict_weather (model loaded per call) and the registry path
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from forecast import forecast_timeline, parse_forecast  # noqa: E402
+from predict import FEATURES, MODEL_PATH, predict_weather  # noqa: E402
+from stub_openweather import forecast_payload  # noqa: E402
+
+FALLBACK_MODEL_PATH = os.path.join(SRC_DIR, 'models', 'saved_models', 'weather_model.joblib')
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default=MODEL_PATH if os.path.exists(MODEL_PATH) else FALLBACK_MODEL_PATH)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    forecast = forecast_payload(19.07, 72.87)
+    row = [31.5, 62.0, 4.1]
+
+    def legacy_single():
+        model = joblib.load(args.model)
+        return model.predict(pd.DataFrame([row], columns=FEATURES))[0]
+
+    predict_weather(row, args.model)
+    print(f"original single-row predict_weather:   {median_ms(legacy_single, 20):8.3f} ms")
+    print(f"registry single-row predict_weather:   {median_ms(lambda: predict_weather(row, args.model), args.repeat):8.3f} ms")
+    print(f"parse 40 intervals:                    {median_ms(lambda: parse_forecast(forecast), args.repeat):8.3f} ms")
+    print(f"parse + predict + recommend timeline:  "
+          f"{median_ms(lambda: forecast_timeline(forecast, 5.0, args.model), args.repeat):8.3f} ms")
+
+if __name__ == '__main__':
+    main()
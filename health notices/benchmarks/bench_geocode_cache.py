@@ -0,0 +1,87 @@
+"""
+Geocode cache under a skewed workload: a few hundred cities, most searches for the
+popular ones, answered by a fake Nominatim with fixed latency
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from geocode_cache import GeocodeCache  # noqa: E402
+
+Location = namedtuple('Location', ['latitude', 'longitude', 'address'])
+
+class FakeNominatim:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def geocode(self, query):
+        self.calls += 1
+        time.sleep(self.latency)
+        if query.startswith('nowhere'):
+            return None
+        return Location(float(len(query)), 0.0, query)
+
+def workload(n, cities, seed=0):
+    """Zipf-distributed searches with varied spelling, plus a few unknown places"""
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.3, size=n), cities) - 1
+    spellings = ['{}', '{} ', '{}, India', '{}'.upper()]
+    queries = []
+    for rank in ranks:
+        name = 'nowhere %d' % (rank % 5) if rank % 50 == 49 else 'city %d' % rank
+        queries.append(spellings[rng.integers(len(spellings))].format(name))
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--cities', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per fake Nominatim call')
+    parser.add_argument('--min-interval', type=float, default=0.0,
+                        help='Spacing between network calls (1.0 in production, 0 keeps the run short)')
+    args = parser.parse_args()
+
+    queries = workload(args.requests, args.cities)
+    nominatim = FakeNominatim(args.latency)
+    path = os.path.join(tempfile.mkdtemp(), 'geocode.sqlite')
+    cache = GeocodeCache(nominatim.geocode, path=path, min_interval=args.min_interval)
+
+    def timed_lookup(query):
+        start = time.perf_counter()
+        cache.lookup(query)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        samples = np.array(list(pool.map(timed_lookup, queries))) * 1000
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    p50, p99 = np.percentile(samples, [50, 99])
+    print(f"{args.requests} lookups in {elapsed:.1f}s: p50 {p50:.3f} ms, p99 {p99:.1f} ms")
+    print(f"network calls {nominatim.calls} (uncached: {args.requests} x {args.latency}s = "
+          f"{args.requests * args.latency:.0f}s of Nominatim time)")
+    print(f"hit rate {stats['hit_rate']:.1%}, negative hits {stats['negative_hits']}, "
+          f"memory {stats['memory_size']}, disk {stats['disk_size']}")
+
+    # A restarted process starts with an empty LRU but keeps the SQLite store
+    restarted = GeocodeCache(nominatim.geocode, path=path, min_interval=args.min_interval)
+    calls = nominatim.calls
+    for query in queries[:1000]:
+        restarted.lookup(query)
+    print(f"after restart: {nominatim.calls - calls} network calls for 1000 lookups, "
+          f"disk hits {restarted.stats()['disk_hits']}")
+
+if __name__ == '__main__':
+    main()
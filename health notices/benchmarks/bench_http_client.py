@@ -0,0 +1,97 @@
+"""
+Connection reuse: unpooled requests.get against the shared HttpClient, both talking
+to a local HTTP/1.1 keep-alive server that charges a fixed setup cost per new
+connection (standing in for the TCP + TLS handshake to a remote API)
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from http_client import HttpClient  # noqa: E402
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    setup_delay = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with self.lock:
+            KeepAliveHandler.connections += 1
+        time.sleep(self.setup_delay)
+        super().setup()
+
+    def do_GET(self):
+        data = json.dumps({'ok': True, 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def measure(get, url, count, concurrency):
+    """Per-request latencies in ms and total seconds"""
+    def one(i):
+        start = time.perf_counter()
+        response = get(f'{url}/items/{i}')
+        assert response.status_code == 200
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency == 1:
+        samples = [one(i) for i in range(count)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(count)))
+    return np.array(samples) * 1000, time.perf_counter() - start
+
+def report(name, samples, elapsed, connections):
+    p50, p95 = np.percentile(samples, [50, 95])
+    print(f"{name:<28} p50 {p50:7.2f} ms   p95 {p95:7.2f} ms   {len(samples) / elapsed:8.0f} req/s"
+          f"   {connections:5d} connections")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--setup-delay', type=float, default=0.02,
+                        help='Seconds charged for every new connection')
+    args = parser.parse_args()
+
+    KeepAliveHandler.setup_delay = args.setup_delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f"{args.requests} GETs, {args.setup_delay * 1000:.0f} ms per new connection")
+
+    for concurrency in (1, args.concurrency):
+        print(f"concurrency {concurrency}")
+        session = requests.Session()
+        with HttpClient(max_per_host=concurrency) as client:
+            for name, get in [('requests.get (no session)', requests.get),
+                              ('requests.Session', session.get),
+                              ('HttpClient', client.get)]:
+                before = KeepAliveHandler.connections
+                samples, elapsed = measure(get, url, args.requests, concurrency)
+                report(name, samples, elapsed, KeepAliveHandler.connections - before)
+        session.close()
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
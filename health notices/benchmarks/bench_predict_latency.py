@@ -0,0 +1,68 @@
+"""
+Weather prediction latency: loading the model on every call (the original
+predict_weather) against the registry's in-memory NumPy path, plus batch throughput
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from predict import FEATURES, MODEL_PATH, predict_weather, predict_weather_batch  # noqa: E402
+
+# Models trained from src/ land next to the sources
+FALLBACK_MODEL_PATH = os.path.join(SRC_DIR, 'models', 'saved_models', 'weather_model.joblib')
+
+def legacy_predict_weather(features, model_path):
+    """The original implementation: deserialize the forest and build a DataFrame per call"""
+    model = joblib.load(model_path)
+    feature_df = pd.DataFrame([features], columns=FEATURES)
+    return model.predict(feature_df)[0]
+
+def random_features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform([-20, 0, 0], [50, 100, 50], size=(n, 3))
+
+def latencies(fn, rows):
+    samples = []
+    for row in rows:
+        start = time.perf_counter()
+        fn(row)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+def report(name, samples):
+    p50, p95 = np.percentile(samples, [50, 95])
+    print(f"{name:<24} p50 {p50:8.3f} ms   p95 {p95:8.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default=MODEL_PATH if os.path.exists(MODEL_PATH) else FALLBACK_MODEL_PATH)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--legacy-calls', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rows = random_features(args.calls).tolist()
+    report('legacy (load per call)', latencies(lambda row: legacy_predict_weather(row, args.model),
+                                               rows[:args.legacy_calls]))
+    predict_weather(rows[0], args.model)  # first call loads the model
+    report('registry', latencies(lambda row: predict_weather(row, args.model), rows))
+
+    features = random_features(args.batch_size, seed=1)
+    start = time.perf_counter()
+    conditions = predict_weather_batch(features, args.model)
+    elapsed = time.perf_counter() - start
+    expected = joblib.load(args.model).predict(pd.DataFrame(features, columns=FEATURES))
+    print(f"batch of {len(features):,}: {elapsed:.2f}s ({len(features) / elapsed:,.0f} rows/s), "
+          f"matches sklearn: {bool((conditions == expected).all())}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Page-level upstream latency: the original sequential requests.get calls against
+OpenWeatherClient.fetch_all, both talking to a local stub with injected latency
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from stub_openweather import StubServer  # noqa: E402
+from weather_client import OpenWeatherClient  # noqa: E402
+
+def sequential_fetch(base_url, lat, lon):
+    """The original handler: three blocking calls, new connection each, no timeouts"""
+    current = requests.get(f"{base_url}/weather?lat={lat}&lon={lon}&appid=key&units=metric").json()
+    uv_response = requests.get(f"{base_url}/uvi?lat={lat}&lon={lon}&appid=key")
+    uvi = uv_response.json().get('value', 0) if uv_response.status_code == 200 else 0
+    forecast = requests.get(f"{base_url}/forecast?lat={lat}&lon={lon}&appid=key&units=metric").json()
+    return current, uvi, forecast
+
+def measure(fn, requests_count):
+    samples = []
+    for i in range(requests_count):
+        start = time.perf_counter()
+        fn(18.5 + i * 0.01, 73.8)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+def report(name, samples):
+    p50, p95 = np.percentile(samples, [50, 95])
+    print(f"{name:<34} p50 {p50:8.1f} ms   p95 {p95:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--weather-delay', type=float, default=0.08)
+    parser.add_argument('--uvi-delay', type=float, default=0.12)
+    parser.add_argument('--forecast-delay', type=float, default=0.15)
+    parser.add_argument('--slow-uvi-delay', type=float, default=4.0,
+                        help='UV latency for the degraded run, above the UV timeout')
+    args = parser.parse_args()
+
+    delays = {'weather': args.weather_delay, 'uvi': args.uvi_delay, 'forecast': args.forecast_delay}
+    print(f"injected latency: {delays}")
+    with StubServer(delays) as stub:
+        client = OpenWeatherClient('key', base_url=stub.url)
+        report('sequential requests.get', measure(lambda lat, lon: sequential_fetch(stub.url, lat, lon), args.requests))
+        report('concurrent fetch_all', measure(client.fetch_all, args.requests))
+
+        stub.set_delay('uvi', args.slow_uvi_delay)
+        client = OpenWeatherClient('key', base_url=stub.url, timeouts={'uvi': (1, 0.5)})
+        samples = measure(client.fetch_all, 3)
+        report(f'fetch_all, UV {args.slow_uvi_delay:.0f}s (0.5s timeout)', samples)
+        print(f"  degraded report: uvi={client.fetch_all(18.5, 73.8).uvi}, current still served")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Upstream calls and page latency with and without the weather response cache,
+for concurrent users spread over a few cities, against the local OpenWeather stub
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from stub_openweather import StubServer  # noqa: E402
+from weather_cache import WeatherCache  # noqa: E402
+from weather_client import OpenWeatherClient, parse_hourly_forecast  # noqa: E402
+
+CITIES = [(19.076, 72.8777), (28.6139, 77.209), (12.9716, 77.5946), (13.0827, 80.2707), (22.5726, 88.3639)]
+
+def users(n, seed=0):
+    """Coordinates of n searches, geocoded to slightly different points around each city"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(len(CITIES), size=n)
+    jitter = rng.normal(0, 0.004, size=(n, 2))
+    return [(CITIES[c][0] + dy, CITIES[c][1] + dx) for c, (dy, dx) in zip(picks, jitter)]
+
+def run(client, coordinates, threads):
+    def page(point):
+        start = time.perf_counter()
+        report = client.fetch_all(*point)
+        client.hourly_forecast(point[0], point[1], report.forecast)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        samples = np.array(list(pool.map(page, coordinates))) * 1000
+    return samples, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.1, help='Injected seconds per upstream call')
+    args = parser.parse_args()
+
+    coordinates = users(args.requests)
+    delays = {'weather': args.latency, 'uvi': args.latency, 'forecast': args.latency}
+    for name, cache in (('no cache', None), ('weather cache', WeatherCache())):
+        with StubServer(delays) as stub:
+            client = OpenWeatherClient('key', base_url=stub.url, cache=cache)
+            samples, elapsed = run(client, coordinates, args.threads)
+            calls = sum(stub.counts.values())
+        p50, p95 = np.percentile(samples, [50, 95])
+        print(f"{name:<14} {args.requests} pages in {elapsed:5.2f}s   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms   "
+              f"upstream calls {calls}")
+        if cache is not None:
+            print(f"  {cache.stats()}")
+        client.close()
+
+    forecast = {'list': [{'dt': 1700000000 + 10800 * i, 'main': {'temp': 20.0 + i}} for i in range(40)]}
+    start = time.perf_counter()
+    for _ in range(1000):
+        parse_hourly_forecast(forecast)
+    parse_ms = (time.perf_counter() - start)
+    print(f"forecast parsing avoided on hits: {parse_ms:.3f} ms per parse")
+
+if __name__ == '__main__':
+    main()
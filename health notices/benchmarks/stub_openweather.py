@@ -0,0 +1,106 @@
+"""
+Local stand-in for the OpenWeather endpoints used by the app, with injectable latency
+
+    python stub_openweather.py --port 8900 --delay weather=0.1 --delay uvi=0.3
+
+Point the app at it with openweather_base_url: http://127.0.0.1:8900 in config.yaml.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+def weather_payload(lat, lon):
+    return {'coord': {'lat': lat, 'lon': lon}, 'main': {'temp': 31.5, 'humidity': 62},
+            'wind': {'speed': 4.1}, 'name': 'Stub City'}
+
+def forecast_payload(lat, lon, intervals=40):
+    start = int(time.time()) // 10800 * 10800
+    return {'city': {'coord': {'lat': lat, 'lon': lon}}, 'list': [
+        {'dt': start + 10800 * i,
+         'main': {'temp': 24.0 + 12.0 * ((i % 8) / 7.0), 'humidity': 40 + (i * 7) % 50},
+         'wind': {'speed': 2.0 + (i % 5)}}
+        for i in range(intervals)
+    ]}
+
+class StubHandler(BaseHTTPRequestHandler):
+    # endpoint -> seconds to sleep before answering, set through StubServer
+    delays = {}
+    counts = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+        query = parse_qs(url.query)
+        lat = float(query.get('lat', ['0'])[0])
+        lon = float(query.get('lon', ['0'])[0])
+        with self.lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        time.sleep(self.delays.get(endpoint, 0))
+
+        if endpoint == 'weather':
+            status, body = 200, weather_payload(lat, lon)
+        elif endpoint == 'uvi':
+            status, body = 200, {'lat': lat, 'lon': lon, 'value': 7.2}
+        elif endpoint == 'forecast':
+            status, body = 200, forecast_payload(lat, lon)
+        else:
+            status, body = 404, {'cod': '404', 'message': 'Internal error'}
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (timeout)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer:
+    """Runs the stub on a background thread, use as a context manager"""
+
+    def __init__(self, delays=None, port=0):
+        handler = type('Handler', (StubHandler,), {'delays': dict(delays or {}), 'counts': {}})
+        self.handler = handler
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    @property
+    def counts(self):
+        return dict(self.handler.counts)
+
+    def set_delay(self, endpoint, seconds):
+        self.handler.delays[endpoint] = seconds
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve stub OpenWeather responses')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--delay', action='append', default=[], help='endpoint=seconds')
+    args = parser.parse_args()
+    delays = {name: float(value) for name, value in (item.split('=') for item in args.delay)}
+    with StubServer(delays, args.port) as stub:
+        print(f"Stub OpenWeather listening on {stub.url}")
+        stub.thread.join()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Score weather readings for many locations and write heat/cold-wave alerts
+
+    python batch_alerts.py readings.csv alerts.csv [--workers 4] [--chunk-size 100000] [--all]
+
+Input columns: latitude, longitude, temperature, humidity, wind_speed and optionally
+uvi (0 when missing). .parquet input and output need pyarrow.
+
+Each chunk is scored with one vectorized predict on the weather model and one
+get_recommendations_batch call. Chunks are spread over a process pool and written in
+input order as they finish, so memory stays bounded by a few chunks at any input size.
+By default only rows that need an alert (heat or cold wave) are written; --all keeps
+every row. The recommendations column holds message ids from recommendation_rules.yaml
+joined by " | " (e.g. "heat_wave | uv_high"); --texts writes the full messages instead.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from predict import FEATURES, MODEL_PATH, get_recommendations_batch, predict_weather_batch, recommendation_engine
+
+INPUT_COLUMNS = ['latitude', 'longitude'] + FEATURES
+OUTPUT_COLUMNS = INPUT_COLUMNS + ['uvi', 'condition', 'alert', 'recommendations']
+
+def iter_chunks(path, chunk_size):
+    """Stream a .csv or .parquet file of readings as DataFrames"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+def score_chunk(chunk, model_path=MODEL_PATH, alerts_only=True, texts=False):
+    """Conditions and recommendations for a DataFrame of readings"""
+    missing = [column for column in INPUT_COLUMNS if column not in chunk]
+    if missing:
+        raise ValueError(f"Input is missing columns {missing}")
+    chunk = chunk.dropna(subset=INPUT_COLUMNS)
+    uvi = chunk['uvi'].fillna(0).to_numpy(dtype=np.float64) if 'uvi' in chunk else np.zeros(len(chunk))
+
+    conditions = predict_weather_batch(chunk[FEATURES].to_numpy(dtype=np.float64), model_path)
+    codes = get_recommendations_batch(conditions, uvi, chunk['humidity'].to_numpy(dtype=np.float64))
+    alert = conditions != 'normal'
+
+    result = chunk[INPUT_COLUMNS].copy()
+    result['uvi'] = uvi
+    result['condition'] = conditions
+    result['alert'] = alert
+    if alerts_only:
+        result, codes = result[alert], codes[alert]
+    result['recommendations'] = recommendation_engine.join(codes, texts=texts)
+    return result
+
+class AlertWriter:
+    """Appends scored chunks to a .csv or .parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = None
+        self._header = True
+        if path.endswith('.parquet'):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise RuntimeError("Writing Parquet requires pyarrow (pip install pyarrow)")
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame):
+        if self.path.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a', header=self._header, index=False)
+            self._header = False
+        self.rows += len(frame)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        elif self._header:
+            # No alerts at all, still leave a file with the header
+            pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(self.path, index=False)
+
+def run_batch(input_path, output_path, model_path=MODEL_PATH, workers=None, chunk_size=100_000,
+              alerts_only=True, texts=False):
+    """Score input_path into output_path, returns (rows read, alerts written, seconds)"""
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    writer = AlertWriter(output_path)
+    rows = 0
+    try:
+        if workers == 1:
+            for chunk in iter_chunks(input_path, chunk_size):
+                writer.write(score_chunk(chunk, model_path, alerts_only, texts))
+                rows += len(chunk)
+        else:
+            # At most two chunks per worker are in flight, results are written in input order
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for chunk in iter_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk, model_path, alerts_only, texts))
+                    rows += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+    return rows, writer.rows, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Score weather readings and write heat/cold-wave alerts')
+    parser.add_argument('input', help='.csv or .parquet readings')
+    parser.add_argument('output', help='.csv or .parquet alerts')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--all', action='store_true', help='Write every row, not only alerts')
+    parser.add_argument('--texts', action='store_true', help='Write recommendation texts instead of ids')
+    args = parser.parse_args()
+
+    rows, written, elapsed = run_batch(args.input, args.output, args.model, args.workers,
+                                       args.chunk_size, alerts_only=not args.all, texts=args.texts)
+    print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), "
+          f"wrote {written} rows to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Health-risk timeline over the OpenWeather 5-day / 3-hour forecast
+
+All forecast intervals (up to 40) are parsed into one NumPy structured array, scored
+with a single batch call on the weather model and run through the recommendation
+rules together, so the whole timeline costs about as much as one prediction.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+# Imported as a top-level module from src/ (frontend.py) and as src.forecast (test_flask.py)
+try:
+    from predict import FEATURES, MODEL_PATH, get_recommendations_batch, predict_weather_batch, recommendation_engine
+except ImportError:
+    from .predict import FEATURES, MODEL_PATH, get_recommendations_batch, predict_weather_batch, recommendation_engine
+
+FORECAST_DTYPE = np.dtype([
+    ('dt', np.int64),
+    ('temperature', np.float32),
+    ('humidity', np.float32),
+    ('wind_speed', np.float32),
+])
+
+def parse_forecast(forecast_data):
+    """Structured FORECAST_DTYPE array with one row per forecast interval"""
+    intervals = forecast_data.get('list', [])
+    return np.fromiter(
+        ((h['dt'], h['main']['temp'], h['main'].get('humidity', np.nan), h.get('wind', {}).get('speed', np.nan))
+         for h in intervals),
+        dtype=FORECAST_DTYPE, count=len(intervals)
+    )
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+def interval_uvi(forecast_data, forecast, uvi):
+    """
+    UV index per forecast interval. The forecast carries no UV index: daytime intervals
+    get the current uvi and intervals between sunset and sunrise get 0. Today's
+    sunrise and sunset (city.sunrise/sunset) stand in for every day of the forecast.
+    Without them every interval gets uvi.
+    """
+    city = forecast_data.get('city', {})
+    sunrise, sunset = city.get('sunrise'), city.get('sunset')
+    if sunrise is None or sunset is None:
+        return np.full(len(forecast), uvi, dtype=np.float64)
+    daytime = (forecast['dt'] - sunrise) % SECONDS_PER_DAY < (sunset - sunrise) % SECONDS_PER_DAY
+    return np.where(daytime, float(uvi), 0.0)
+
+def forecast_timeline(forecast_data, uvi=0, model_path=MODEL_PATH):
+    """
+    One entry per forecast interval: time, readings, predicted condition and
+    recommendation ids. UV rules see uvi by day and 0 at night (interval_uvi).
+    """
+    forecast = parse_forecast(forecast_data)
+    if len(forecast) == 0:
+        return []
+    # Intervals with missing humidity or wind are scored with neutral values
+    features = np.column_stack([forecast[name] for name in FEATURES]).astype(np.float64)
+    features = np.where(np.isnan(features), [20.0, 50.0, 0.0], features)
+
+    conditions = predict_weather_batch(features, model_path)
+    codes = get_recommendations_batch(conditions, interval_uvi(forecast_data, forecast, uvi), features[:, 1])
+    recommendations = recommendation_engine.join(codes)
+
+    timeline = []
+    for row, condition, recommendation in zip(forecast.tolist(), conditions.tolist(), recommendations.tolist()):
+        dt, temperature, humidity, wind_speed = row
+        timeline.append({
+            'time': datetime.fromtimestamp(dt).strftime('%a %H:00'),
+            'temperature': round(temperature, 1),
+            'humidity': None if np.isnan(humidity) else round(humidity),
+            'wind_speed': None if np.isnan(wind_speed) else round(wind_speed, 1),
+            'condition': condition,
+            'recommendations': recommendation.split(' | ') if recommendation else [],
+        })
+    return timeline
@@ -2,12 +2,13 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from flask import Flask, render_template, request, json
-import requests
+from flask import Flask, render_template, request, json, jsonify
 from geopy.geocoders import Nominatim
-import pandas as pd
-from datetime import datetime, timedelta
 from predict import predict_weather, get_recommendations, load_config
+from forecast import forecast_timeline
+from geocode_cache import GeocodeCache
+from weather_cache import DEFAULT_GRID, WeatherCache, create_backend
+from weather_client import OPENWEATHER_URL, OpenWeatherClient
 
 print(f"Current working directory: {os.getcwd()}")
 template_path = '../templates'
@@ -24,9 +25,19 @@ try:
     print(f"API Key loaded: {API_KEY[:4]}...")
 except Exception as e:
     print(f"Error loading config: {e}")
+    config = {}
     API_KEY = None
 
 geolocator = Nominatim(user_agent="health_safety_app")
+# Repeat searches for a city are answered from memory or disk, only new ones reach Nominatim
+geocode_cache = GeocodeCache(geolocator.geocode)
+print(f"Geocode cache pre-warmed with {geocode_cache.prewarm()} common city entries")
+# Responses are shared per ~5 km grid cell and time bucket; weather_cache_url may point at Redis
+weather_cache = WeatherCache(create_backend(config.get('weather_cache_url')),
+                             grid=config.get('weather_cache_grid', DEFAULT_GRID))
+# openweather_base_url lets the app run against a local stub server
+weather_client = OpenWeatherClient(API_KEY, base_url=config.get('openweather_base_url') or OPENWEATHER_URL,
+                                   cache=weather_cache)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -35,46 +46,38 @@ def index():
         location = request.form['location']
         print(f"Received POST for location: {location}")
         try:
-            loc = geolocator.geocode(location)
+            loc = geocode_cache.lookup(location)
             if not loc:
                 print("Location not found")
                 return render_template('index.html', error="Location not found.")
             
-            # Current Weather API (free)
-            current_url = f"https://api.openweathermap.org/data/2.5/weather?lat={loc.latitude}&lon={loc.longitude}&appid={API_KEY}&units=metric"
-            print(f"Requesting current weather: {current_url}")
-            current_response = requests.get(current_url)
-            current_data = current_response.json()
+            # Current weather, UV and 5-day/3-hour forecast (free APIs) are requested concurrently
+            print(f"Requesting weather for {loc.latitude}, {loc.longitude}")
+            report = weather_client.fetch_all(loc.latitude, loc.longitude)
+            for endpoint, message in report.errors.items():
+                print(f"{endpoint} API error: {message}")
             
-            if current_response.status_code != 200:
-                print(f"Current API error: {current_data.get('message')}")
-                return render_template('index.html', error=f"Current weather error: {current_data.get('message', 'Unknown error')}")
+            if report.current is None:
+                return render_template('index.html', error=f"Current weather error: {report.errors.get('weather', 'Unknown error')}")
             
+            current_data = report.current
             temp = current_data['main']['temp']
             humidity = current_data['main']['humidity']
             wind_speed = current_data['wind']['speed']
             
-            # UV API (free)
-            uv_url = f"https://api.openweathermap.org/data/2.5/uvi?lat={loc.latitude}&lon={loc.longitude}&appid={API_KEY}"
-            print(f"Requesting UV: {uv_url}")
-            uv_response = requests.get(uv_url)
-            uvi = uv_response.json().get('value', 0) if uv_response.status_code == 200 else 0
+            # A failed or slow UV call leaves uvi at 0 instead of failing the page
+            uvi = report.uvi
             
-            # 5-day/3-hour Forecast API (free, for basic hourly-like data)
-            forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={loc.latitude}&lon={loc.longitude}&appid={API_KEY}&units=metric"
-            print(f"Requesting forecast: {forecast_url}")
-            forecast_response = requests.get(forecast_url)
-            forecast_data = forecast_response.json()
-            
-            if forecast_response.status_code != 200:
-                print(f"Forecast API error: {forecast_data.get('message')}")
+            forecast_data = report.forecast
+            if forecast_data is None:
                 hourly_times = []
                 hourly_temps = []
+                timeline = []
             else:
-                # Extract first 8 3-hour intervals (24 hours)
-                hourly_data = forecast_data['list'][:8]
-                hourly_times = [datetime.fromtimestamp(h['dt']).strftime('%H:00') for h in hourly_data]
-                hourly_temps = [h['main']['temp'] for h in hourly_data]
+                # First 8 3-hour intervals (24 hours)
+                hourly_times, hourly_temps = weather_client.hourly_forecast(loc.latitude, loc.longitude, forecast_data)
+                # Condition and recommendations for every interval, scored in one batch
+                timeline = forecast_timeline(forecast_data, uvi)
             
             print(f"Hourly data: times={hourly_times}, temps={hourly_temps}")
             
@@ -85,7 +88,8 @@ def index():
             
             return render_template('result.html', location=location, temp=temp, humidity=humidity, 
                                    wind_speed=wind_speed, condition=condition, recommendations=recommendations,
-                                   uvi=uvi, hourly_times=json.dumps(hourly_times), hourly_temps=json.dumps(hourly_temps))
+                                   uvi=uvi, hourly_times=json.dumps(hourly_times), hourly_temps=json.dumps(hourly_temps),
+                                   timeline=timeline)
         except Exception as e:
             print(f"Error in POST: {e}")
             return render_template('index.html', error=str(e))
@@ -93,5 +97,13 @@ def index():
     print("Rendering index.html for GET")
     return render_template('index.html')
 
+@app.route('/metrics/geocode')
+def geocode_metrics():
+    return jsonify(geocode_cache.stats())
+
+@app.route('/metrics/weather')
+def weather_metrics():
+    return jsonify(weather_cache.stats())
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -1,6 +1,14 @@
+import argparse
+import json
+import os
+import time
+
 import numpy as np
 import pandas as pd
-import os
+
+FEATURES = ['temperature', 'humidity', 'wind_speed']
+CLASSES = ['cold_wave', 'heat_wave', 'normal']
+NPY_DIR = 'data/raw/synthetic_weather_npy'
 
 
 def generate_synthetic_data(num_rows=1000):
@@ -31,5 +39,73 @@ def generate_synthetic_data(num_rows=1000):
         f"Generated {num_rows} rows of synthetic data at data/raw/synthetic_weather.csv")
 
 
+def label_conditions(temperatures):
+    """Class index into CLASSES: heat wave above 35, cold wave below 5 degrees"""
+    return np.select([temperatures > 35, temperatures < 5], [1, 0], 2).astype(np.int8)
+
+
+class NpyColumnWriter:
+    """Appends chunks to a 1-D .npy file whose final length is known up front"""
+
+    def __init__(self, path, dtype, length):
+        self.dtype = np.dtype(dtype)
+        self.file = open(path, 'wb')
+        header = {'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                  'shape': (length,)}
+        np.lib.format.write_array_header_1_0(self.file, header)
+
+    def write(self, values):
+        self.file.write(np.ascontiguousarray(values, dtype=self.dtype).tobytes())
+
+    def close(self):
+        self.file.close()
+
+
+def generate_npy_dataset(directory=NPY_DIR, num_rows=10_000_000, chunk_size=1_000_000, seed=42):
+    """
+    Stream num_rows rows to one .npy file per column (float32 features, int8 condition
+    indices into CLASSES), chunk_size rows at a time. Memory use is bounded by one chunk
+    whatever num_rows is; the files can be opened with np.load(mmap_mode='r').
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    columns = {name: NpyColumnWriter(os.path.join(directory, f'{name}.npy'), np.float32, num_rows)
+               for name in FEATURES}
+    columns['condition'] = NpyColumnWriter(os.path.join(directory, 'condition.npy'), np.int8, num_rows)
+    try:
+        for start in range(0, num_rows, chunk_size):
+            size = min(chunk_size, num_rows - start)
+            temperatures = rng.uniform(-20, 50, size).astype(np.float32)
+            columns['temperature'].write(temperatures)
+            columns['humidity'].write(rng.uniform(0, 100, size))
+            columns['wind_speed'].write(rng.uniform(0, 50, size))
+            columns['condition'].write(label_conditions(temperatures))
+    finally:
+        for writer in columns.values():
+            writer.close()
+
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({'rows': num_rows, 'features': FEATURES, 'classes': CLASSES, 'seed': seed}, f)
+    print(f"Generated {num_rows} rows of synthetic data in {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic weather data')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--format', choices=['csv', 'npy'], default='csv',
+                        help='csv: data/raw/synthetic_weather.csv, npy: chunked .npy files for large datasets')
+    parser.add_argument('--out', default=NPY_DIR, help='Output directory for --format npy')
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.format == 'csv':
+        generate_synthetic_data(args.rows)
+    else:
+        generate_npy_dataset(args.out, args.rows, args.chunk_size, args.seed)
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
+
 if __name__ == "__main__":
-    generate_synthetic_data()
+    main()
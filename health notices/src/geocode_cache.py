@@ -0,0 +1,186 @@
+"""
+Geocoding cache in front of Nominatim
+
+Lookups go through an in-process LRU, then a SQLite store that survives restarts,
+and only then the network. "Not found" answers are cached too, with a shorter TTL,
+so repeated typos do not spend the 1 request/second Nominatim budget.
+The store can be pre-warmed from data/common_cities.json.
+"""
+
+from collections import OrderedDict, namedtuple
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(SRC_DIR, 'data', 'geocode_cache.sqlite')
+COMMON_CITIES_PATH = os.path.join(SRC_DIR, 'data', 'common_cities.json')
+
+# Same attribute names as geopy's Location for the fields the app uses
+GeoPoint = namedtuple('GeoPoint', ['latitude', 'longitude', 'address'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocodes (
+    query TEXT PRIMARY KEY,
+    latitude REAL,
+    longitude REAL,
+    address TEXT,
+    expires_at REAL NOT NULL
+)
+"""
+
+def normalize_location(location):
+    """Cache key: lowercase, single spaces, no spaces around commas or trailing punctuation"""
+    location = re.sub(r'\s+', ' ', location.strip().lower())
+    location = re.sub(r'\s*,\s*', ', ', location)
+    return location.strip(' ,.')
+
+class GeocodeCache:
+    """Thread-safe geocoding cache, geocode(query) is called only on misses"""
+
+    def __init__(self, geocode, path=DEFAULT_DB_PATH, maxsize=1024, ttl=30 * 86400,
+                 negative_ttl=86400, min_interval=1.0):
+        """
+        geocode: function of a query string returning an object with latitude,
+        longitude and address (a geopy Location) or None when not found
+        min_interval: seconds between network lookups, Nominatim allows one per second
+        """
+        self.geocode = geocode
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_interval = min_interval
+        self._memory = OrderedDict()  # query -> (GeoPoint or None, expires_at)
+        self._lock = threading.Lock()
+        self._network_lock = threading.Lock()
+        self._last_request = 0.0
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'negative_hits': 0, 'errors': 0}
+
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # One connection guarded by _lock, statements are tiny
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _remember(self, query, point, expires_at):
+        with self._lock:
+            self._memory[query] = (point, expires_at)
+            self._memory.move_to_end(query)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def _lookup_memory(self, query, now):
+        with self._lock:
+            entry = self._memory.get(query)
+            if entry is None:
+                return False, None
+            if entry[1] <= now:
+                del self._memory[query]
+                return False, None
+            self._memory.move_to_end(query)
+            return True, entry
+
+    def _lookup_disk(self, query, now):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT latitude, longitude, address, expires_at FROM geocodes WHERE query = ?', (query,)
+            ).fetchone()
+        if row is None or row[3] <= now:
+            return False, None
+        point = None if row[0] is None else GeoPoint(row[0], row[1], row[2])
+        return True, (point, row[3])
+
+    def _store(self, query, point, expires_at):
+        values = (query, None, None, None, expires_at) if point is None else \
+            (query, point.latitude, point.longitude, point.address, expires_at)
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?, ?, ?)', values)
+            self._db.commit()
+        self._remember(query, point, expires_at)
+
+    def _lookup_cached(self, query, now):
+        found, entry = self._lookup_memory(query, now)
+        if found:
+            self._count('memory_hits')
+        else:
+            found, entry = self._lookup_disk(query, now)
+            if found:
+                self._count('disk_hits')
+                self._remember(query, *entry)
+        if found and entry[0] is None:
+            self._count('negative_hits')
+        return found, entry
+
+    def lookup(self, location):
+        """GeoPoint for a location string, or None if it cannot be found"""
+        query = normalize_location(location)
+        if not query:
+            return None
+        found, entry = self._lookup_cached(query, time.time())
+        if found:
+            return entry[0]
+
+        # Network lookups are serialized and spaced min_interval apart. Threads that queued
+        # behind a lookup of the same place find its answer cached and skip the network.
+        with self._network_lock:
+            now = time.time()
+            found, entry = self._lookup_cached(query, now)
+            if found:
+                return entry[0]
+            self._count('misses')
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                result = self.geocode(location)
+            except Exception:
+                # Timeouts and service errors are not answers, never cache them
+                self._count('errors')
+                raise
+            finally:
+                self._last_request = time.monotonic()
+
+            if result is None:
+                self._store(query, None, now + self.negative_ttl)
+                return None
+            point = GeoPoint(result.latitude, result.longitude, getattr(result, 'address', None))
+            self._store(query, point, now + self.ttl)
+            return point
+
+    def prewarm(self, path=COMMON_CITIES_PATH):
+        """
+        Load [{"name", "state", "latitude", "longitude"}, ...] into the store under
+        "<name>", "<name>, <state>" and "<name>, india", returns the number of entries added
+        """
+        with open(path, 'r') as f:
+            cities = json.load(f)
+        expires_at = time.time() + self.ttl
+        rows = []
+        for city in cities:
+            address = f"{city['name']}, {city['state']}, India"
+            for alias in (city['name'], f"{city['name']}, {city['state']}", f"{city['name']}, India"):
+                rows.append((normalize_location(alias), city['latitude'], city['longitude'], address, expires_at))
+        with self._lock:
+            before = self._db.total_changes
+            # Entries already resolved through Nominatim are kept
+            self._db.executemany('INSERT OR IGNORE INTO geocodes VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.commit()
+            return self._db.total_changes - before
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_size'] = len(self._memory)
+            stats['disk_size'] = self._db.execute('SELECT COUNT(*) FROM geocodes').fetchone()[0]
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
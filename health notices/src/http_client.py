@@ -0,0 +1,190 @@
+"""
+Shared outbound HTTP client for the Care-Connect services and scripts
+
+    from http_client import HttpClient, get_client
+    response = get_client().get('https://api.example.com/items', timeout=5)
+
+- keep-alive connection pooling (one httpx pool per client, reuse one client per process)
+- per-host concurrency limits, so one slow upstream cannot take every connection
+- connect/read timeouts on every call
+- retries with exponential backoff and full jitter for connection errors and
+  429/502/503/504 answers, honoring Retry-After; POST and PATCH are only retried
+  when the caller marks the request idempotent
+- optional HTTP/2 (needs h2: pip install "httpx[http2]")
+
+HttpClient is thread-safe; AsyncHttpClient offers the same API for asyncio code.
+
+mirotalkc2c-main/backend/api/provision/provision.py imports this module from here.
+"""
+
+import asyncio
+from collections import defaultdict
+import random
+import threading
+import time
+
+import httpx
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+class RetryPolicy:
+    """
+    How often and how long to wait between attempts
+    exceptions: transport errors worth another attempt, narrow it to leave out
+    read timeouts where the caller has a latency budget
+    """
+
+    def __init__(self, attempts=3, backoff=0.2, max_backoff=5.0, statuses=RETRY_STATUSES,
+                 exceptions=(httpx.TransportError,)):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+
+    def delay(self, attempt, response=None):
+        """Seconds to sleep before retry number attempt (1-based)"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+        # Full jitter spreads the retries of many clients hit by the same outage
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+def _build_kwargs(base_url, headers, timeout, max_connections, http2):
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise RuntimeError('HTTP/2 requires h2 (pip install "httpx[http2]")')
+    return {
+        'base_url': base_url,
+        'headers': headers,
+        'timeout': timeout,
+        'http2': http2,
+        'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    }
+
+def _host(client, url):
+    return client.build_request('GET', url).url.host
+
+class HttpClient:
+    """Pooled, retrying, per-host limited synchronous client"""
+
+    def __init__(self, base_url='', headers=None, timeout=DEFAULT_TIMEOUT, max_connections=100,
+                 max_per_host=20, retry=None, http2=False):
+        self.retry = retry or RetryPolicy()
+        self.max_per_host = max_per_host
+        self._client = httpx.Client(**_build_kwargs(base_url, headers, timeout, max_connections, http2))
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.max_per_host))
+        self._lock = threading.Lock()
+
+    def _slot(self, url):
+        host = _host(self._client, url)
+        with self._lock:
+            return self._host_slots[host]
+
+    def request(self, method, url, idempotent=None, retry=None, **kwargs):
+        """
+        Send a request, retrying transient failures
+        idempotent overrides the method-based decision whether retrying is safe
+        kwargs go to httpx (json=, params=, headers=, timeout=, ...)
+        """
+        retry = retry or self.retry
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = retry.attempts if idempotent else 1
+        slot = self._slot(url)
+
+        for attempt in range(1, attempts + 1):
+            try:
+                with slot:
+                    response = self._client.request(method, url, **kwargs)
+            except retry.exceptions:
+                if attempt == attempts:
+                    raise
+                time.sleep(retry.delay(attempt))
+                continue
+            if response.status_code in retry.statuses and attempt < attempts:
+                response.close()
+                time.sleep(retry.delay(attempt, response))
+                continue
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncHttpClient:
+    """asyncio counterpart of HttpClient"""
+
+    def __init__(self, base_url='', headers=None, timeout=DEFAULT_TIMEOUT, max_connections=100,
+                 max_per_host=20, retry=None, http2=False):
+        self.retry = retry or RetryPolicy()
+        self.max_per_host = max_per_host
+        self._client = httpx.AsyncClient(**_build_kwargs(base_url, headers, timeout, max_connections, http2))
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+
+    async def request(self, method, url, idempotent=None, retry=None, **kwargs):
+        retry = retry or self.retry
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempts = retry.attempts if idempotent else 1
+        slot = self._host_slots[_host(self._client, url)]
+
+        for attempt in range(1, attempts + 1):
+            try:
+                async with slot:
+                    response = await self._client.request(method, url, **kwargs)
+            except retry.exceptions:
+                if attempt == attempts:
+                    raise
+                await asyncio.sleep(retry.delay(attempt))
+                continue
+            if response.status_code in retry.statuses and attempt < attempts:
+                await response.aclose()
+                await asyncio.sleep(retry.delay(attempt, response))
+                continue
+            return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+_default_client = None
+_default_lock = threading.Lock()
+
+def get_client():
+    """Process-wide HttpClient, created on first use"""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
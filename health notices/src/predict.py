@@ -1,47 +1,93 @@
 import joblib
 import yaml
-import pandas as pd
+import numpy as np
 import os
+import threading
+
+# Imported as a top-level module from src/ (frontend.py) and as src.predict (test_flask.py)
+try:
+    from recommendations import RecommendationEngine
+except ImportError:
+    from .recommendations import RecommendationEngine
 
 # Base directory of the project
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'weather_model.joblib')
+FEATURES = ['temperature', 'humidity', 'wind_speed']
 
 def load_config():
     config_path = os.path.join(BASE_DIR, 'config', 'config.yaml')
     with open(config_path, 'r') as file:
         return yaml.safe_load(file)
 
-def predict_weather(features):
-    model_path = os.path.join(BASE_DIR, 'models', 'saved_models', 'weather_model.joblib')
-    model = joblib.load(model_path)
-    feature_df = pd.DataFrame([features], columns=['temperature', 'humidity', 'wind_speed'])
-    condition = model.predict(feature_df)[0]
-    return condition
+class WeatherModel:
+    """A loaded weather RandomForest with a NumPy prediction path"""
+
+    def __init__(self, estimator, mtime):
+        names = getattr(estimator, 'feature_names_in_', None)
+        if names is not None and list(names) != FEATURES:
+            raise ValueError(f"Model was trained on {list(names)}, expected {FEATURES}")
+        self.estimator = estimator
+        self.mtime = mtime
+        self.classes = estimator.classes_
+        self._trees = [tree.tree_ for tree in estimator.estimators_]
+
+    def predict(self, X):
+        """
+        Conditions for an (n, 3) array of temperature, humidity, wind_speed
+        Sums the per-tree class distributions directly, which gives the same
+        result as estimator.predict without its per-call DataFrame validation
+        and thread dispatch (the bulk of the cost for a single row)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(FEATURES):
+            raise ValueError(f"Expected an array of shape (n, {len(FEATURES)}), got {X.shape}")
+        proba = self._trees[0].predict(X).copy()
+        for tree in self._trees[1:]:
+            proba += tree.predict(X)
+        return self.classes[np.argmax(proba, axis=1)]
+
+class ModelRegistry:
+    """Loads each model file once and reloads it when the file's mtime changes"""
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, path=MODEL_PATH):
+        mtime = os.stat(path).st_mtime_ns
+        model = self._models.get(path)
+        if model is None or model.mtime != mtime:
+            with self._lock:
+                model = self._models.get(path)
+                if model is None or model.mtime != mtime:
+                    model = WeatherModel(joblib.load(path), mtime)
+                    self._models[path] = model
+                    print(f"Loaded weather model from {path}")
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+registry = ModelRegistry()
+
+def predict_weather_batch(features_2d, model_path=MODEL_PATH):
+    """Conditions for many locations at once, features_2d has one [temperature, humidity, wind_speed] row each"""
+    return registry.get(model_path).predict(features_2d)
+
+def predict_weather(features, model_path=MODEL_PATH):
+    return predict_weather_batch([features], model_path)[0]
+
+recommendation_engine = RecommendationEngine.from_file()
+
+def get_recommendations_batch(conditions, uvi, humidity):
+    """
+    Recommendation message codes for arrays of readings, shape (n, 3) for the
+    condition, UV and humidity groups, -1 where a group adds nothing
+    recommendation_engine.messages() / join() turn codes into texts
+    """
+    return recommendation_engine.evaluate(condition=conditions, uvi=uvi, humidity=humidity)
 
 def get_recommendations(condition, uvi, humidity):
-    recs = []
-    if condition == 'heat_wave':
-        recs.append(
-            "Heat wave detected! Stay hydrated, avoid outdoor activities during peak heat, wear light clothing, and seek air-conditioned spaces.")
-    elif condition == 'cold_wave':
-        recs.append(
-            "Cold wave detected! Dress in layers, stay indoors, keep warm with heaters, and avoid prolonged exposure to cold.")
-    else:
-        recs.append(
-            "Normal conditions. Maintain general safety: stay aware of weather changes and follow routine precautions.")
-
-    if uvi > 3:
-        recs.append(
-            "High UV index! Apply sunscreen (SPF 30+), wear protective clothing, and avoid direct sun between 10 AM and 4 PM.")
-    elif uvi > 0:
-        recs.append(
-            "Moderate UV index. Use sunscreen if outdoors for extended periods.")
-
-    if humidity > 80:
-        recs.append(
-            "High humidity! Stay hydrated, watch for mold or heat exhaustion, and use dehumidifiers indoors.")
-    elif humidity < 30:
-        recs.append(
-            "Low humidity! Use moisturizer to prevent dry skin, and consider a humidifier indoors.")
-
-    return recs
+    return recommendation_engine.recommend(condition=condition, uvi=uvi, humidity=humidity)
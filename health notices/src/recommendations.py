@@ -0,0 +1,106 @@
+"""
+Data-driven health recommendations
+Rules and message texts are loaded from recommendation_rules.yaml and evaluated with
+NumPy masks over whole arrays of readings at once
+
+Results are message codes: an int16 array with one column per rule group holding an
+index into RecommendationEngine.message_ids, or -1 when the group adds nothing.
+A million locations take a few MB instead of a few million Python strings.
+"""
+
+import os
+
+import numpy as np
+import yaml
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recommendation_rules.yaml')
+
+OPERATORS = {
+    'eq': np.equal,
+    'gt': np.greater,
+    'ge': np.greater_equal,
+    'lt': np.less,
+    'le': np.less_equal,
+    'in': np.isin,
+}
+
+class RecommendationEngine:
+    """Vectorized evaluator for grouped first-match recommendation rules"""
+
+    def __init__(self, messages, groups):
+        """
+        messages: {message_id: text}
+        groups: [{'name': ..., 'rules': [{'message': id, 'when': {input: test}}, ...]}, ...]
+        """
+        self.message_ids = tuple(messages)
+        self.texts = np.array([messages[message_id] for message_id in self.message_ids], dtype=object)
+        self.ids = np.array(self.message_ids, dtype=object)
+        codes = {message_id: code for code, message_id in enumerate(self.message_ids)}
+
+        self.group_names = [group['name'] for group in groups]
+        self.groups = []
+        for group in groups:
+            rules = []
+            for rule in group['rules']:
+                if rule['message'] not in codes:
+                    raise ValueError(f"Rule in group {group['name']!r} uses unknown message {rule['message']!r}")
+                tests = []
+                for name, test in (rule.get('when') or {}).items():
+                    if not isinstance(test, dict):
+                        test = {'eq': test}
+                    for operator, value in test.items():
+                        if operator not in OPERATORS:
+                            raise ValueError(f"Unknown operator {operator!r} in group {group['name']!r}")
+                        tests.append((name, OPERATORS[operator], value))
+                rules.append((codes[rule['message']], tests))
+            self.groups.append(rules)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        with open(path, 'r') as f:
+            rules = yaml.safe_load(f)
+        return cls(rules['messages'], rules['groups'])
+
+    def evaluate(self, **inputs):
+        """
+        Message codes for arrays (or scalars) of readings, e.g.
+        evaluate(condition=conditions, uvi=uvi, humidity=humidity)
+        Returns an int16 array of shape (n, number of groups)
+        """
+        arrays = {name: np.atleast_1d(np.asarray(values)) for name, values in inputs.items()}
+        n = max((len(values) for values in arrays.values()), default=1)
+        codes = np.full((n, len(self.groups)), -1, dtype=np.int16)
+        for column, rules in enumerate(self.groups):
+            unassigned = np.ones(n, dtype=bool)
+            for code, tests in rules:
+                mask = unassigned.copy()
+                for name, operator, value in tests:
+                    if name not in arrays:
+                        raise ValueError(f"Rules need input {name!r}")
+                    mask &= operator(arrays[name], value)
+                codes[mask, column] = code
+                unassigned &= ~mask
+        return codes
+
+    def messages(self, codes_row):
+        """Texts for one row of codes"""
+        return [self.texts[code] for code in codes_row if code >= 0]
+
+    def join(self, codes, texts=False, separator=' | '):
+        """
+        One string per row: message ids (or texts) of its codes joined by separator
+        Rows usually share a handful of combinations, each is only built once
+        """
+        labels = self.texts if texts else self.ids
+        codes = np.asarray(codes).reshape(-1, len(self.groups))
+        # Pack each row into one integer so the distinct combinations come from a 1-D unique
+        base = len(self.message_ids) + 1
+        packed = ((codes.astype(np.int64) + 1) * base ** np.arange(codes.shape[1], dtype=np.int64)).sum(axis=1)
+        _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+        joined = np.array([separator.join(labels[code] for code in codes[row] if code >= 0)
+                           for row in first], dtype=object)
+        return joined[inverse]
+
+    def recommend(self, **inputs):
+        """Texts for a single location"""
+        return self.messages(self.evaluate(**inputs)[0])
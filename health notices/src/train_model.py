@@ -1,26 +1,184 @@
+import argparse
+import json
+import os
+import resource
+import time
+
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
 import joblib
-import os
+
+FEATURES = ['temperature', 'humidity', 'wind_speed']
+MODEL_PATH = 'models/saved_models/weather_model.joblib'
+
+
+def save_model(model, path=MODEL_PATH):
+    # Write next to the target and rename, a running server reloads on the mtime change
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    joblib.dump(model, tmp)
+    os.replace(tmp, path)
+    print(f"Model saved at {path}")
+
 
 def train_model():
     data = pd.read_csv('data/raw/synthetic_weather.csv')
-    X = data[['temperature', 'humidity', 'wind_speed']]
+    X = data[FEATURES]
     y = data['condition']
-    
+
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
+
     model = RandomForestClassifier(n_estimators=100, random_state=42)
     model.fit(X_train, y_train)
-    
+
     predictions = model.predict(X_test)
     print(f"Model accuracy: {accuracy_score(y_test, predictions) * 100:.2f}%")
-    
-    os.makedirs('models/saved_models', exist_ok=True)
-    joblib.dump(model, 'models/saved_models/weather_model.joblib')
-    print("Model saved at models/saved_models/weather_model.joblib")
+
+    save_model(model)
+
+
+def _open_column(path):
+    """Open a 1-D .npy file positioned at its data, returns (file, dtype, length)"""
+    f = open(path, 'rb')
+    version = np.lib.format.read_magic(f)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran_order, dtype = read_header(f)
+    return f, dtype, shape[0]
+
+
+def iter_npy_chunks(directory, chunk_rows=1_000_000):
+    """
+    Yield (features DataFrame, conditions) chunks from a generate_dataset.py --format npy
+    directory. Columns are read sequentially with plain file reads, not mapped, so only
+    the current chunk is ever resident.
+    """
+    with open(os.path.join(directory, 'meta.json'), 'r') as f:
+        meta = json.load(f)
+    classes = np.array(meta['classes'], dtype=object)
+    columns = {name: _open_column(os.path.join(directory, f'{name}.npy')) for name in FEATURES + ['condition']}
+    try:
+        for start in range(0, meta['rows'], chunk_rows):
+            size = min(chunk_rows, meta['rows'] - start)
+            chunk = {name: np.fromfile(f, dtype=dtype, count=size) for name, (f, dtype, _) in columns.items()}
+            conditions = classes[chunk.pop('condition')]
+            yield pd.DataFrame(chunk, columns=FEATURES), conditions
+    finally:
+        for f, _, _ in columns.values():
+            f.close()
+
+
+def check_holdout_spread(temperatures, held_out, min_rows=100):
+    """
+    A uniform hold-out of a chunk covers its whole temperature range (to within 5%).
+    A narrower one means the split draws are correlated with the data.
+    """
+    held = temperatures[held_out]
+    if len(held) < min_rows or held_out.all():
+        return
+    low, high = temperatures.min(), temperatures.max()
+    margin = 0.05 * (high - low)
+    if held.min() > low + margin or held.max() < high - margin:
+        raise RuntimeError(f"Hold-out temperatures span only {held.min():.1f} to {held.max():.1f} of "
+                           f"{low:.1f} to {high:.1f}, the split depends on the data")
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def train_model_from_npy(directory, mode='subsample', max_rows=1_000_000, chunk_rows=1_000_000,
+                         n_estimators=100, holdout_rows=200_000, seed=42, model_path=MODEL_PATH):
+    """
+    Fit the weather RandomForest on a dataset of any size with bounded memory
+
+    subsample: one fit on a uniform sample of about max_rows rows
+    incremental: a warm-started forest that grows trees on each chunk of up to
+        chunk_rows rows, so every row is used but only one chunk is held at a time
+    A uniform sample of about holdout_rows rows is kept out of training for scoring.
+    """
+    with open(os.path.join(directory, 'meta.json'), 'r') as f:
+        rows = json.load(f)['rows']
+    start = time.perf_counter()
+    # generate_dataset.py draws its temperatures from default_rng(seed): drawing the split
+    # from the same stream would replay them and hold out by temperature (so by label)
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    holdout_rate = min(0.5, holdout_rows / rows)
+    train_rate = min(1.0, max_rows / (rows * (1 - holdout_rate)))
+    n_chunks = -(-rows // chunk_rows)
+
+    if mode == 'incremental':
+        if n_estimators < n_chunks:
+            raise ValueError(f"Incremental training needs at least one tree per chunk ({n_chunks} chunks), "
+                             f"raise --n-estimators or --chunk-rows")
+        # Every chunk grows an equal share of the trees, the last one also grows the remainder
+        trees_per_chunk, extra_trees = divmod(n_estimators, n_chunks)
+        model = RandomForestClassifier(n_estimators=0, warm_start=True, random_state=seed, n_jobs=-1)
+    elif mode != 'subsample':
+        raise ValueError(f"Unknown training mode {mode!r}")
+
+    samples, labels, holdout_X, holdout_y = [], [], [], []
+    trained_rows = 0
+    for chunk, (X, y) in enumerate(iter_npy_chunks(directory, chunk_rows)):
+        held_out = rng.random(len(X)) < holdout_rate
+        if chunk == 0:
+            check_holdout_spread(X['temperature'].to_numpy(), held_out)
+        holdout_X.append(X[held_out])
+        holdout_y.append(y[held_out])
+        X, y = X[~held_out], y[~held_out]
+
+        if mode == 'subsample':
+            keep = rng.random(len(X)) < train_rate
+            samples.append(X[keep])
+            labels.append(y[keep])
+        else:
+            if len(np.unique(y)) < 3:
+                raise ValueError("Every chunk must contain all conditions, use a larger --chunk-rows")
+            model.n_estimators += trees_per_chunk + (extra_trees if chunk == n_chunks - 1 else 0)
+            model.fit(X, y)
+            trained_rows += len(X)
+            print(f"  {trained_rows} rows, {model.n_estimators} trees, peak RSS {peak_rss_mb():.0f} MB")
+
+    if mode == 'subsample':
+        X, y = pd.concat(samples, ignore_index=True), np.concatenate(labels)
+        del samples, labels
+        model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=-1)
+        model.fit(X, y)
+        trained_rows = len(X)
+    else:
+        # Later fits only add trees, the settings of the last one are what gets saved
+        model.warm_start = False
+        assert len(model.estimators_) == n_estimators
+
+    accuracy = accuracy_score(np.concatenate(holdout_y), model.predict(pd.concat(holdout_X, ignore_index=True)))
+    elapsed = time.perf_counter() - start
+    print(f"Model accuracy: {accuracy * 100:.2f}% ({mode}, trained on {trained_rows} of {rows} rows, "
+          f"{len(model.estimators_)} trees)")
+    print(f"Training took {elapsed:.1f}s, peak RSS {peak_rss_mb():.0f} MB")
+    save_model(model, model_path)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the weather condition model')
+    parser.add_argument('--data', default=None,
+                        help='generate_dataset.py --format npy directory (default: the 1000-row CSV)')
+    parser.add_argument('--mode', choices=['subsample', 'incremental'], default='subsample')
+    parser.add_argument('--max-rows', type=int, default=1_000_000, help='Training rows for --mode subsample')
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--output', default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.data is None:
+        train_model()
+    else:
+        train_model_from_npy(args.data, args.mode, args.max_rows, args.chunk_rows, args.n_estimators,
+                             model_path=args.output)
+
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    main()
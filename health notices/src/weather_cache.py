@@ -0,0 +1,150 @@
+"""
+Response cache for OpenWeather calls
+
+Keys combine the endpoint, the coordinates snapped to a grid (0.05 degrees is about
+5 km) and a time bucket as long as the endpoint's TTL, so users in the same city
+within a few minutes share one upstream call. Concurrent misses for one key are
+coalesced: the first caller fetches, the others wait for its answer.
+
+The store is pluggable: MemoryBackend keeps entries in-process, RedisBackend shares
+them between workers and hosts (requires the redis package).
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import json
+import threading
+import time
+
+DEFAULT_GRID = 0.05
+
+# Seconds per endpoint; values derived from a response share its TTL
+TTLS = {
+    'weather': 600,
+    'uvi': 1800,
+    'forecast': 3600,
+    'forecast_hourly': 3600,
+}
+
+class MemoryBackend:
+    """In-process LRU store with per-entry expiry"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisBackend:
+    """Shared store on Redis, values are stored as JSON"""
+
+    def __init__(self, url, prefix='weather:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The Redis weather cache requires redis (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return None if data is None else json.loads(data)
+
+    def set(self, key, value, ttl):
+        self.client.setex(self.prefix + key, int(ttl), json.dumps(value))
+
+def create_backend(url=None):
+    """MemoryBackend for None or memory://, RedisBackend for redis:// URLs"""
+    if not url or url.startswith('memory://'):
+        return MemoryBackend()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported weather cache URL {url!r}")
+
+class WeatherCache:
+    """Grid/time-bucket cache with single-flight misses, shared by all request threads"""
+
+    def __init__(self, backend=None, grid=DEFAULT_GRID, ttls=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.grid = grid
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+
+    def snap(self, lat, lon):
+        """Center of the grid cell containing (lat, lon)"""
+        return (round(round(lat / self.grid) * self.grid, 6),
+                round(round(lon / self.grid) * self.grid, 6))
+
+    def key(self, name, lat, lon, now=None):
+        ttl = self.ttls[name]
+        bucket = int((time.time() if now is None else now) // ttl)
+        return f'{name}:{round(lat / self.grid)}:{round(lon / self.grid)}:{bucket}'
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_or_fetch(self, name, lat, lon, fetch):
+        """
+        Cached value of fetch(snapped_lat, snapped_lon) for the grid cell and time bucket
+        fetch errors are raised to every waiting caller and never cached
+        """
+        key = self.key(name, lat, lon)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count('hits')
+            return value
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            self._count('coalesced')
+            return flight.result()
+
+        self._count('misses')
+        try:
+            value = fetch(*self.snap(lat, lon))
+            self.backend.set(key, value, self.ttls[name])
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            self._count('errors')
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_rate'] = (stats['hits'] + stats['coalesced']) / lookups if lookups else 0.0
+        if isinstance(self.backend, MemoryBackend):
+            stats['entries'] = len(self.backend)
+        return stats
@@ -0,0 +1,125 @@
+"""
+OpenWeather client that fetches current weather, UV index and forecast concurrently
+over the shared pooled HTTP client (http_client.py), each call with its own timeout
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import httpx
+
+from http_client import HttpClient, RetryPolicy
+
+OPENWEATHER_URL = 'https://api.openweathermap.org/data/2.5'
+
+# (connect, read) timeouts in seconds per endpoint. UV is optional on the result
+# page, so it gets the shortest budget and falls back to 0 when it is slow.
+TIMEOUTS = {
+    'weather': (3.05, 5),
+    'uvi': (3.05, 2),
+    'forecast': (3.05, 5),
+}
+
+# current: /weather response, None if it failed
+# uvi: UV index, 0 if the UV call failed or timed out
+# forecast: /forecast response, None if it failed
+# errors: {endpoint: message} for every failed call
+WeatherReport = namedtuple('WeatherReport', ['current', 'uvi', 'forecast', 'errors'])
+
+class UpstreamError(Exception):
+    """OpenWeather answered with a non-200 status"""
+
+    def __init__(self, endpoint, status, message):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.status = status
+
+def create_http_client(pool_size=16):
+    """
+    HttpClient keeping up to pool_size connections alive. Failed connects and
+    dropped keep-alive connections get one quick retry, timeouts do not: the UV
+    budget is what keeps a slow UV endpoint from holding up the page.
+    """
+    retry = RetryPolicy(attempts=2, backoff=0.1, exceptions=(httpx.ConnectError, httpx.RemoteProtocolError))
+    return HttpClient(max_connections=pool_size, max_per_host=pool_size, retry=retry)
+
+def parse_hourly_forecast(forecast_data, intervals=8):
+    """Chart series (times, temperatures) for the first intervals 3-hour steps (24 hours)"""
+    hourly_data = forecast_data['list'][:intervals]
+    hourly_times = [datetime.fromtimestamp(h['dt']).strftime('%H:00') for h in hourly_data]
+    hourly_temps = [h['main']['temp'] for h in hourly_data]
+    return hourly_times, hourly_temps
+
+class OpenWeatherClient:
+    """Shared by all requests: one HTTP client, one thread pool and optionally a WeatherCache"""
+
+    def __init__(self, api_key, base_url=OPENWEATHER_URL, timeouts=None, http=None, max_workers=12,
+                 cache=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeouts = dict(TIMEOUTS, **(timeouts or {}))
+        self.http = http or create_http_client(pool_size=max_workers)
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='openweather')
+
+    def get(self, endpoint, lat, lon):
+        """JSON body of one endpoint, raises UpstreamError or httpx.HTTPError"""
+        if self.cache is not None:
+            return self.cache.get_or_fetch(endpoint, lat, lon, lambda lat, lon: self._request(endpoint, lat, lon))
+        return self._request(endpoint, lat, lon)
+
+    def hourly_forecast(self, lat, lon, forecast_data):
+        """parse_hourly_forecast(forecast_data), reused across requests for the same cell while cached"""
+        if self.cache is None:
+            return parse_hourly_forecast(forecast_data)
+        return self.cache.get_or_fetch('forecast_hourly', lat, lon,
+                                       lambda lat, lon: parse_hourly_forecast(forecast_data))
+
+    def _request(self, endpoint, lat, lon):
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key}
+        if endpoint != 'uvi':
+            params['units'] = 'metric'
+        connect, read = self.timeouts[endpoint]
+        response = self.http.get(f'{self.base_url}/{endpoint}', params=params,
+                                 timeout=httpx.Timeout(read, connect=connect))
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if response.status_code != 200:
+            message = data.get('message', 'Unknown error') if isinstance(data, dict) else 'Unknown error'
+            raise UpstreamError(endpoint, response.status_code, message)
+        return data
+
+    def fetch_all(self, lat, lon):
+        """
+        Request weather, UV and forecast at the same time
+        Page latency becomes the slowest call instead of the sum of all three
+        """
+        futures = {endpoint: self._executor.submit(self.get, endpoint, lat, lon) for endpoint in TIMEOUTS}
+        # One deadline for all calls, the largest endpoint budget: a server that keeps
+        # trickling bytes never hits the read timeout, so the wait is bounded as well
+        wait(futures.values(), timeout=max(sum(self.timeouts[endpoint]) for endpoint in futures))
+        results, errors = {}, {}
+        for endpoint, future in futures.items():
+            if not future.done():
+                future.cancel()
+                errors[endpoint] = 'timed out'
+                continue
+            try:
+                results[endpoint] = future.result()
+            except (UpstreamError, httpx.HTTPError) as e:
+                errors[endpoint] = str(e) or type(e).__name__
+
+        uvi = results['uvi'].get('value', 0) if 'uvi' in results else 0
+        return WeatherReport(
+            current=results.get('weather'),
+            uvi=uvi,
+            forecast=results.get('forecast'),
+            errors=errors
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.http.close()
@@ -2,9 +2,12 @@
 from flask import Flask, render_template, request, json
 from geopy.geocoders import Nominatim
 from src.predict import predict_weather, get_recommendations, load_config
-import requests
+from src.http_client import get_client
 from datetime import datetime
 
+# Pooled, retrying client shared by all outbound calls
+http = get_client()
+
 # Initialize Flask app
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
@@ -41,7 +44,7 @@ def index():
             print(f"\nDEBUG: Requesting weather data...")
             print(f"URL: {current_url[:80]}...")
             
-            current_response = requests.get(current_url)
+            current_response = http.get(current_url)
             current_data = current_response.json()
             
             # Debug output
@@ -71,7 +74,7 @@ def index():
             uvi = 0
             try:
                 uv_url = f"https://api.openweathermap.org/data/2.5/uvi?lat={loc.latitude}&lon={loc.longitude}&appid={API_KEY}"
-                uvi_response = requests.get(uv_url, timeout=5)
+                uvi_response = http.get(uv_url, timeout=5)
                 if uvi_response.status_code == 200:
                     uvi = uvi_response.json().get('value', 0)
                     print(f"DEBUG: UV Index: {uvi}")
@@ -82,7 +85,7 @@ def index():
             
             # 5-day forecast API (first 8 intervals = 24 hours)
             forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?lat={loc.latitude}&lon={loc.longitude}&appid={API_KEY}&units=metric"
-            forecast_response = requests.get(forecast_url)
+            forecast_response = http.get(forecast_url)
             forecast_data = forecast_response.json()
             
             hourly_data = forecast_data.get('list', [])[:8]
@@ -0,0 +1,108 @@
+"""
+Provisioning throughput against mock_mirotalk.py: the original one-blocking-POST-per-call
+pattern of join.py against provision.py at several concurrency levels
+
+The mock runs in its own process so its threads do not compete with the client for the GIL.
+"""
+
+import argparse
+from contextlib import contextmanager
+import csv
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from mock_mirotalk import API_KEY_SECRET
+from provision import provision_file
+
+MOCK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_mirotalk.py")
+
+
+@contextmanager
+def mock_server(latency, connect_delay, rate_limit):
+    """Start mock_mirotalk.py on a free port, yields (url, stats function)"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen([sys.executable, MOCK_PATH, "--port", str(port), "--latency", str(latency),
+                                "--connect-delay", str(connect_delay), "--rate-limit", str(rate_limit)],
+                               stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/api/v1"
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        yield url, lambda: requests.get(f"{url}/stats").json()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def write_appointments(path, count):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["appointment_id", "doctor", "patient"])
+        for i in range(count):
+            writer.writerow([f"A{i:06d}", f"dr{i % 50}", f"patient{i}"])
+
+
+def sequential(url, input_path):
+    """join.py in a loop: requests.post without a session, a new connection per call"""
+    headers = {"authorization": API_KEY_SECRET, "Content-Type": "application/json"}
+    start = time.perf_counter()
+    with open(input_path, newline="") as f:
+        for row in csv.DictReader(f):
+            for name in (row["doctor"], row["patient"]):
+                response = requests.post(f"{url}/join", headers=headers,
+                                         json={"room": f"appt-{row['appointment_id']}", "name": name})
+                json.loads(response.text)["join"]
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=1000)
+    parser.add_argument("--sequential-appointments", type=int, default=100,
+                        help="Appointments for the slow sequential baseline")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--connect-delay", type=float, default=0.03)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Mock 429s above this many requests/s")
+    parser.add_argument("--rate", type=float, default=0, help="Client-side requests/s cap")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    print(f"{args.latency * 1000:.0f} ms per request, {args.connect_delay * 1000:.0f} ms per new connection, "
+          f"2 join calls per appointment")
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "appointments.csv")
+        output_path = os.path.join(tmp, "rooms.jsonl")
+
+        with mock_server(args.latency, args.connect_delay, args.rate_limit) as (url, stats):
+            write_appointments(input_path, args.sequential_appointments)
+            elapsed = sequential(url, input_path)
+            # The readiness probe and the stats request open one connection each
+            print(f"{'sequential requests.post':<26} {args.sequential_appointments / elapsed:8.1f} appointments/s"
+                  f"   {stats().get('connections', 0) - 2:6d} connections")
+
+        write_appointments(input_path, args.appointments)
+        for concurrency in args.concurrency:
+            with mock_server(args.latency, args.connect_delay, args.rate_limit) as (url, stats):
+                ok, failed, _, elapsed = provision_file(input_path, output_path, concurrency=concurrency,
+                                                        base_url=url, rate=args.rate)
+                counts = stats()
+            print(f"{f'provision.py x{concurrency}':<26} {ok / elapsed:8.1f} appointments/s"
+                  f"   {counts.get('connections', 0) - 2:6d} connections   {failed} failed"
+                  f"   {counts.get('rate_limited', 0)} rate limited")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Local mock of the MiroTalk C2C /api/v1/meeting and /api/v1/join endpoints
+
+    python3 mock_mirotalk.py --port 8080 --latency 0.02 --connect-delay 0.03 --rate-limit 500
+
+Answers like server.js (403 without the API key), over HTTP/1.1 keep-alive. Every
+new connection costs --connect-delay (standing in for the TCP + TLS handshake),
+every request --latency, and above --rate-limit requests per second it answers 429
+with Retry-After. GET /api/v1/stats returns connection and request counters.
+"""
+
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import uuid
+
+API_KEY_SECRET = "mirotalkc2c_default_secret"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    # Set through MockServer
+    connect_delay = 0.0
+    latency = 0.0
+    rate_limit = 0
+    stats = {}
+    lock = threading.Lock()
+    window = [0.0, 0]
+
+    def setup(self):
+        self._count("connections")
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def _limited(self):
+        if not self.rate_limit:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window[0] >= 1.0:
+                self.window[:] = [now, 0]
+            self.window[1] += 1
+            return self.window[1] > self.rate_limit
+
+    def _reply(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.lock:
+                return self._reply(200, dict(self.stats))
+        self._reply(200, {"data": "404 not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null") or {}
+        endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+        time.sleep(self.latency)
+
+        if self._limited():
+            self._count("rate_limited")
+            return self._reply(429, {"error": "Too many requests"}, [("Retry-After", "1")])
+        if self.headers.get("authorization") != API_KEY_SECRET:
+            return self._reply(403, {"error": "Unauthorized!"})
+        self._count(endpoint)
+        host = self.headers.get("host", "localhost")
+        if endpoint == "meeting":
+            self._reply(200, {"meeting": f"http://{host}/?room={uuid.uuid4()}"})
+        elif endpoint == "join":
+            self._reply(200, {"join": f"http://{host}/join?room={body.get('room')}&name={body.get('name')}"})
+        else:
+            self._reply(200, {"data": "404 not found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connects when a client opens many at once
+    request_queue_size = 1024
+
+
+class MockServer:
+    """Context manager running the mock on a free port, url is the /api/v1 base"""
+
+    def __init__(self, latency=0.0, connect_delay=0.0, rate_limit=0, port=0):
+        MockHandler.latency = latency
+        MockHandler.connect_delay = connect_delay
+        MockHandler.rate_limit = rate_limit
+        MockHandler.stats = {}
+        self.server = MockHTTPServer(("127.0.0.1", port), MockHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1"
+
+    @property
+    def stats(self):
+        return dict(MockHandler.stats)
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the MiroTalk C2C REST API")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per request")
+    parser.add_argument("--connect-delay", type=float, default=0.03, help="Seconds per new connection")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before 429 (0: none)")
+    args = parser.parse_args()
+
+    with MockServer(args.latency, args.connect_delay, args.rate_limit, args.port) as mock:
+        print(f"Mock MiroTalk API on {mock.url}, CTRL+C to quit")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
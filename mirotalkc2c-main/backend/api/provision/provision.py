@@ -0,0 +1,234 @@
+# pip3 install httpx
+"""
+Provision MiroTalk C2C rooms for a list of appointments
+
+    python3 provision.py appointments.csv rooms.jsonl [--mode join] [--concurrency 32] [--rate 200]
+
+Input is .csv or .jsonl with an appointment_id column plus one column per participant
+(doctor and patient by default, see --participants).
+
+--mode join (default): the room is derived from the appointment id ("appt-<id>") and
+    /api/v1/join is called once per participant. The same room and name always give
+    the same URL, so every call is retried freely and re-running is harmless.
+--mode meeting: one /api/v1/meeting call per appointment. Each call creates a new
+    random room, so it is only retried when the server cannot have processed it
+    (connect errors, 429, 503).
+
+Requests share one keep-alive pool, at most --concurrency are in flight and --rate
+caps requests per second across all of them. A result line is appended to the output
+as soon as its appointment finishes. --resume skips appointments already written
+with status ok, so an interrupted run can be continued.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+
+import httpx
+
+# The pooled HTTP client is shared with the health notices service, one copy in health notices/src
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 4, 'health notices', 'src'))
+
+from http_client import AsyncHttpClient, RetryPolicy  # noqa: E402
+
+API_KEY_SECRET = os.environ.get("API_KEY_SECRET", "mirotalkc2c_default_secret")
+MIROTALK_URL = "https://c2c.mirotalk.com/api/v1"
+# MIROTALK_URL = "http://localhost:8080/api/v1"
+
+ROOM_PREFIX = "appt-"
+
+# Retrying /join repeats a pure function of room and name
+JOIN_RETRY = RetryPolicy(attempts=5, backoff=0.25, max_backoff=10.0)
+# A retried /meeting after a lost response would create a second room, so only
+# retry answers that say the request was not handled
+MEETING_RETRY = RetryPolicy(attempts=5, backoff=0.25, max_backoff=10.0, statuses={429, 503},
+                            exceptions=(httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: rate requests per second, bursts of up to burst"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def read_appointments(path):
+    """Yield appointment dicts from a .csv or .jsonl file"""
+    with open(path, "r", newline="") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def completed_ids(path):
+    """Appointment ids already provisioned in an earlier run's output"""
+    done = set()
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # last line of an interrupted run
+                if result.get("status") == "ok":
+                    done.add(str(result["appointment_id"]))
+    return done
+
+
+class Provisioner:
+    """Creates rooms over one pooled client, limited by a RateLimiter"""
+
+    def __init__(self, base_url=MIROTALK_URL, api_key=API_KEY_SECRET, mode="join", participants=("doctor", "patient"),
+                 concurrency=32, rate=0, timeout=10.0):
+        self.base_url = base_url.rstrip("/")
+        self.mode = mode
+        self.participants = participants
+        self.limiter = RateLimiter(rate)
+        self.client = AsyncHttpClient(
+            headers={"authorization": api_key, "Content-Type": "application/json"},
+            timeout=httpx.Timeout(timeout, connect=3.05),
+            max_connections=concurrency,
+            max_per_host=concurrency,
+        )
+
+    async def _post(self, endpoint, body, retry, idempotent):
+        await self.limiter.acquire()
+        response = await self.client.post(f"{self.base_url}/{endpoint}", json=body, retry=retry,
+                                          idempotent=idempotent)
+        if response.status_code != 200:
+            raise RuntimeError(f"/{endpoint} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def provision(self, appointment):
+        """Result dict for one appointment, never raises"""
+        appointment_id = str(appointment["appointment_id"])
+        start = time.perf_counter()
+        result = {"appointment_id": appointment_id}
+        try:
+            if self.mode == "meeting":
+                data = await self._post("meeting", None, MEETING_RETRY, idempotent=True)
+                result["meeting"] = data["meeting"]
+            else:
+                room = f"{ROOM_PREFIX}{appointment_id}"
+                names = [(p, appointment[p]) for p in self.participants if appointment.get(p)]
+                # Wait for every participant even when one fails, nothing is left running
+                responses = await asyncio.gather(*[
+                    self._post("join", {"room": room, "name": name}, JOIN_RETRY, idempotent=True)
+                    for _, name in names
+                ], return_exceptions=True)
+                for response in responses:
+                    if isinstance(response, BaseException):
+                        raise response
+                result["room"] = room
+                result["join"] = {participant: data["join"] for (participant, _), data in zip(names, responses)}
+            result["status"] = "ok"
+        except (httpx.HTTPError, RuntimeError, KeyError, ValueError) as e:
+            result["status"] = "error"
+            result["error"] = str(e) or type(e).__name__
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return result
+
+    async def run(self, appointments, output, concurrency=32):
+        """
+        Provision every appointment with concurrency workers, appending each result
+        to the open output file as it finishes. Returns (ok, failed).
+        """
+        queue = asyncio.Queue(maxsize=concurrency * 2)
+        counts = {"ok": 0, "error": 0}
+
+        async def worker():
+            while True:
+                appointment = await queue.get()
+                if appointment is None:
+                    return
+                result = await self.provision(appointment)
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                counts[result["status"]] += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for appointment in appointments:
+                await queue.put(appointment)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await self.client.aclose()
+        return counts["ok"], counts["error"]
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def provision_file(input_path, output_path, resume=False, concurrency=32, **kwargs):
+    """Provision input_path into output_path, returns (ok, failed, skipped, seconds)"""
+    done = completed_ids(output_path) if resume else set()
+    appointments = (a for a in read_appointments(input_path) if str(a["appointment_id"]) not in done)
+    start = time.perf_counter()
+
+    async def main():
+        provisioner = Provisioner(concurrency=concurrency, **kwargs)
+        with open(output_path, "a" if resume else "w") as output:
+            if output.tell() and not _ends_with_newline(output_path):
+                output.write("\n")  # finish the partial line of an interrupted run
+            return await provisioner.run(appointments, output, concurrency)
+
+    ok, failed = asyncio.run(main())
+    return ok, failed, len(done), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provision MiroTalk C2C rooms for a list of appointments")
+    parser.add_argument("input", help=".csv or .jsonl appointments with an appointment_id column")
+    parser.add_argument("output", help="JSON Lines results, one per appointment")
+    parser.add_argument("--url", default=MIROTALK_URL, help="API base URL (default: %(default)s)")
+    parser.add_argument("--mode", choices=["join", "meeting"], default="join")
+    parser.add_argument("--participants", default="doctor,patient",
+                        help="Columns holding participant names for --mode join")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight")
+    parser.add_argument("--rate", type=float, default=0, help="Max requests per second (0: unlimited)")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--resume", action="store_true", help="Skip appointments already ok in the output")
+    args = parser.parse_args()
+
+    ok, failed, skipped, elapsed = provision_file(
+        args.input, args.output, resume=args.resume, concurrency=args.concurrency, base_url=args.url,
+        mode=args.mode, participants=tuple(args.participants.split(",")), rate=args.rate, timeout=args.timeout,
+    )
+    print(f"Provisioned {ok} appointments in {elapsed:.1f}s ({ok / elapsed:,.0f}/s), "
+          f"{failed} failed, {skipped} skipped as already done")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,512 +1,488 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import pickle
 import re
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from artifacts import current_version, load_artifacts, save_artifacts
+from compiled_model import CascadeModel
+from doctor_directory import DEFAULT_DB_PATH, DoctorDirectory
+from inference import DiseaseInferenceEngine, interpret_prediction, preprocess_symptoms
+from metrics import StageMetrics
+from symptom_rules import SymptomRuleEngine
+from train_pipeline import ARTIFACT_DIR, describe_cascade, fit_forest, serving_model
+from training_data import create_training_dataset
 
 app = Flask(__name__)
 CORS(app)
 
+# Per-stage latency histograms (ML_METRICS=1) served at /api/metrics, and a
+# Server-Timing header on every response (ML_SERVER_TIMING=1)
+metrics = StageMetrics(enabled=os.environ.get('ML_METRICS') == '1',
+                       server_timing=os.environ.get('ML_SERVER_TIMING') == '1')
+
+if metrics.enabled:
+    @app.before_request
+    def start_request_timer():
+        metrics.begin_request()
+
+    @app.after_request
+    def record_request_time(response):
+        server_timing = metrics.end_request()
+        if server_timing:
+            response.headers['Server-Timing'] = server_timing
+        return response
+
+# Artifacts with a cascade answer confident requests from the fast linear tier and
+# only the rest from the forest; ML_CASCADE=0 sends every request to the forest
+CASCADE_ENABLED = os.environ.get('ML_CASCADE', '1') != '0'
+
 # Global variables for model and vectorizer
 model = None
 vectorizer = None
 label_encoder = None
 disease_to_specialty = {}
 symptom_keywords = set()
+inference_engine = None
 
-def load_or_train_model():
-    """Load existing model or train a new one"""
-    global model, vectorizer, label_encoder, disease_to_specialty, symptom_keywords
+class PredictionCache:
+    """
+    Bounded, thread-safe LRU cache with a per-entry TTL
+    clear() starts a new generation; values computed before it are not stored
+    """
     
-    try:
-        with open('disease_model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        with open('vectorizer.pkl', 'rb') as f:
-            vectorizer = pickle.load(f)
-        with open('label_encoder.pkl', 'rb') as f:
-            label_encoder = pickle.load(f)
-        with open('disease_specialty_map.json', 'r') as f:
-            disease_to_specialty = json.load(f)
-        with open('symptom_keywords.json', 'r') as f:
-            symptom_keywords = set(json.load(f))
-        print("Model loaded successfully!")
-    except FileNotFoundError:
-        print("Training new model...")
-        train_model()
-
-def train_model():
-    """Train the disease prediction model"""
-    global model, vectorizer, label_encoder, disease_to_specialty, symptom_keywords
+    def __init__(self, maxsize=4096, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
     
-    # Create comprehensive training dataset
-    data = create_training_dataset()
+    def get(self, key):
+        """Cached value or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
     
-    # Extract features and labels
-    X = data['symptoms']
-    y = data['disease']
+    def put(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
     
-    # Store all symptom keywords for validation
-    for symptoms in X:
-        words = re.findall(r'\b\w+\b', symptoms.lower())
-        symptom_keywords.update(words)
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
     
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'generation': self.generation
+            }
 
-    vectorizer = TfidfVectorizer(
-        max_features=1000,
-        ngram_range=(1, 3),
-        min_df=1,
-        max_df=0.95,
-        stop_words=None,  
-        sublinear_tf=True  
-    )
-    
-    # Transform text to features
-    X_vectorized = vectorizer.fit_transform(X)
-    
-    # Encode labels
-    label_encoder = LabelEncoder()
-    y_encoded = label_encoder.fit_transform(y)
+# Prediction results keyed on the preprocessed symptom text, flushed whenever a new model is installed
+prediction_cache = PredictionCache(maxsize=4096, ttl=3600)
+
+# Artifact version being served, and how often to look for a newer one
+model_version = None
+RELOAD_CHECK_INTERVAL = 5.0
+_next_reload_check = 0.0
+_reload_lock = threading.Lock()
+
+# Progress of the initial model load, reported by /api/health/ready
+model_status = {
+    'state': 'not_started',  # not_started, loading, ready or failed
+    'started_at': None,
+    'load_seconds': None,
+    'error': None
+}
+# Seconds clients are asked to wait (Retry-After) while the model is loading
+MODEL_LOADING_RETRY_AFTER = 5
+
+def load_or_train_model():
+    """Load existing model or train a new one"""
+    model_status.update(state='loading', started_at=time.time(), load_seconds=None, error=None)
+    start = time.monotonic()
+    try:
+        try:
+            artifacts = load_artifacts(ARTIFACT_DIR)
+        except FileNotFoundError:
+            try:
+                artifacts = export_pickled_model()
+            except FileNotFoundError:
+                print("Training new model...")
+                train_model()
+                artifacts = None
+        if artifacts is not None:
+            install_model(artifacts)
+            print(f"Model loaded successfully! (artifacts {artifacts.version})")
+    except Exception as e:
+        model_status.update(state='failed', error=str(e))
+        raise
+    model_status.update(state='ready', load_seconds=round(time.monotonic() - start, 3))
+
+def start_background_model_load():
+    """Load or train the model on a daemon thread so the server can answer right away"""
+    def run():
+        try:
+            load_or_train_model()
+            print(f"Model ready! Can predict {len(label_encoder.classes_)} diseases.")
+        except Exception as e:
+            print(f"Model loading failed: {e}")
     
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_vectorized, y_encoded, test_size=0.2, random_state=42
-    )
+    thread = threading.Thread(target=run, name='model-loader', daemon=True)
+    thread.start()
+    return thread
+
+def require_model(view):
+    """Answer 503 with Retry-After until a model is installed"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if inference_engine is None:
+            failed = model_status['state'] == 'failed'
+            response = jsonify({
+                'error': 'model_unavailable' if failed else 'model_loading',
+                'message': 'The prediction model failed to load' if failed
+                           else 'The prediction model is loading, please retry shortly',
+                'model_status': model_status['state']
+            })
+            response.status_code = 503
+            if not failed:
+                response.headers['Retry-After'] = str(MODEL_LOADING_RETRY_AFTER)
+            return response
+        reload_model_if_published()
+        return view(*args, **kwargs)
+    return wrapper
+
+def install_model(artifacts):
+    """Serve predictions from a loaded artifact version"""
+    global model, vectorizer, label_encoder, disease_to_specialty, symptom_keywords, inference_engine, model_version
     
-    # Train Random Forest model with adjusted parameters for better performance
-    model = RandomForestClassifier(
-        n_estimators=400,  # Increased from 300
-        max_depth=30,      # Increased from 25
-        min_samples_split=2,
-        min_samples_leaf=1,
-        random_state=42,
-        n_jobs=-1,
-        class_weight='balanced',  # Handle class imbalance better
-        max_features='sqrt'  # Better feature selection
-    )
-    model.fit(X_train, y_train)
+    model_version = artifacts.version
+    model = artifacts.model
+    if isinstance(model, CascadeModel) and not CASCADE_ENABLED:
+        model = model.slow
+    vectorizer = artifacts.vectorizer
+    label_encoder = artifacts.label_encoder
+    disease_to_specialty = artifacts.disease_to_specialty
+    symptom_keywords = artifacts.symptom_keywords
+    inference_engine = DiseaseInferenceEngine.from_label_encoder(model, vectorizer, label_encoder,
+                                                                 stage=metrics.stage)
+    prediction_cache.clear()
+
+def reload_model_if_published():
+    """
+    Swap to a newer artifact version published by train_pipeline.py
+    Checks the CURRENT pointer at most every RELOAD_CHECK_INTERVAL seconds
+    """
+    global _next_reload_check
     
-    # Calculate accuracy
-    accuracy = model.score(X_test, y_test)
-    print(f"Model trained with accuracy: {accuracy:.2%}")
+    if time.monotonic() < _next_reload_check:
+        return
+    with _reload_lock:
+        if time.monotonic() < _next_reload_check:
+            return
+        _next_reload_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        version = current_version(ARTIFACT_DIR)
+        if version is None or version == model_version:
+            return
+        try:
+            try:
+                artifacts = load_artifacts(ARTIFACT_DIR, version)
+            except FileNotFoundError:
+                # Pruned by a newer publish after CURRENT was read, load what is current now
+                artifacts = load_artifacts(ARTIFACT_DIR)
+            install_model(artifacts)
+            print(f"Switched to model artifacts {artifacts.version}")
+        except (OSError, ValueError) as e:
+            print(f"Could not load model artifacts {version}: {e}")
+
+def export_pickled_model():
+    """Convert the pickled model files into an artifact version and load it"""
+    with open('disease_model.pkl', 'rb') as f:
+        forest = pickle.load(f)
+    with open('vectorizer.pkl', 'rb') as f:
+        pickled_vectorizer = pickle.load(f)
+    with open('label_encoder.pkl', 'rb') as f:
+        pickled_label_encoder = pickle.load(f)
+    with open('disease_specialty_map.json', 'r') as f:
+        specialty_map = json.load(f)
+    with open('symptom_keywords.json', 'r') as f:
+        keywords = set(json.load(f))
     
-    # Create disease to specialty mapping
-    disease_to_specialty = dict(zip(data['disease'], data['specialty']))
+    print("Exporting pickled model to memory-mapped artifacts...")
+    save_artifacts(ARTIFACT_DIR, forest, pickled_vectorizer, pickled_label_encoder, specialty_map, keywords)
+    return load_artifacts(ARTIFACT_DIR)
+
+def train_model():
+    """
+    Train the disease prediction model in this process
+    Use train_pipeline.py to retrain while the server keeps running
+    """
+    trained = fit_forest(create_training_dataset())
+    print(f"Model trained with accuracy: {trained.accuracy:.2%}")
+    print(describe_cascade(trained))
     
     # Save model and related objects
     with open('disease_model.pkl', 'wb') as f:
-        pickle.dump(model, f)
+        pickle.dump(trained.model, f)
     with open('vectorizer.pkl', 'wb') as f:
-        pickle.dump(vectorizer, f)
+        pickle.dump(trained.vectorizer, f)
     with open('label_encoder.pkl', 'wb') as f:
-        pickle.dump(label_encoder, f)
+        pickle.dump(trained.label_encoder, f)
     with open('disease_specialty_map.json', 'w') as f:
-        json.dump(disease_to_specialty, f)
+        json.dump(trained.disease_to_specialty, f)
     with open('symptom_keywords.json', 'w') as f:
-        json.dump(list(symptom_keywords), f)
-
-def create_training_dataset():
-    """Create comprehensive training dataset with 5000+ samples"""
-    
-    # Define disease patterns with symptoms and specialties
-    disease_data = {
-        'Common Cold': {
-            'symptoms': ['runny nose', 'sneezing', 'sore throat', 'cough', 'mild fever', 'congestion', 
-                        'watery eyes', 'cold', 'stuffy nose', 'nasal discharge', 'blocked nose', 
-                        'nose', 'sneeze', 'running nose', 'nasal congestion'],
-            'specialty': 'General Physician'
-        },
-        'Influenza (Flu)': {
-            'symptoms': ['high fever', 'body aches', 'fatigue', 'chills', 'headache', 'dry cough', 'weakness'],
-            'specialty': 'General Physician'
-        },
-        'COVID-19': {
-            'symptoms': ['fever', 'dry cough', 'tiredness', 'loss of taste', 'loss of smell', 'breathing difficulty', 'chest pain'],
-            'specialty': 'Pulmonologist'
-        },
-        'Pneumonia': {
-            'symptoms': ['chest pain', 'cough with phlegm', 'fever', 'shortness of breath', 'rapid breathing', 'fatigue', 'sweating'],
-            'specialty': 'Pulmonologist'
-        },
-        'Bronchitis': {
-            'symptoms': ['persistent cough', 'mucus production', 'chest discomfort', 'wheezing', 'shortness of breath', 'mild fever'],
-            'specialty': 'Pulmonologist'
-        },
-        'Asthma': {
-            'symptoms': ['wheezing', 'shortness of breath', 'chest tightness', 'coughing at night', 'difficulty breathing', 'rapid breathing'],
-            'specialty': 'Pulmonologist'
-        },
-        'Migraine': {
-            'symptoms': ['severe headache', 'nausea', 'sensitivity to light', 'sensitivity to sound', 'visual disturbances', 'throbbing pain'],
-            'specialty': 'Neurologist'
-        },
-        'Tension Headache': {
-            'symptoms': ['mild to moderate headache', 'pressure in forehead', 'tight band around head', 'neck pain', 'shoulder pain'],
-            'specialty': 'Neurologist'
-        },
-        'Gastroenteritis': {
-            'symptoms': ['diarrhea', 'vomiting', 'stomach cramps', 'nausea', 'fever', 'abdominal pain', 'dehydration'],
-            'specialty': 'Gastroenterologist'
-        },
-        'Acid Reflux (GERD)': {
-            'symptoms': ['heartburn', 'chest pain', 'difficulty swallowing', 'regurgitation', 'sour taste', 'burning sensation'],
-            'specialty': 'Gastroenterologist'
-        },
-        'Irritable Bowel Syndrome': {
-            'symptoms': ['abdominal pain', 'bloating', 'gas', 'diarrhea', 'constipation', 'cramping', 'mucus in stool'],
-            'specialty': 'Gastroenterologist'
-        },
-        'Diabetes Type 2': {
-            'symptoms': ['increased thirst', 'frequent urination', 'increased hunger', 'fatigue', 'blurred vision', 'slow healing wounds'],
-            'specialty': 'Endocrinologist'
-        },
-        'Hypothyroidism': {
-            'symptoms': ['fatigue', 'weight gain', 'cold sensitivity', 'dry skin', 'hair loss', 'muscle weakness', 'depression'],
-            'specialty': 'Endocrinologist'
-        },
-        'Hyperthyroidism': {
-            'symptoms': ['weight loss', 'rapid heartbeat', 'increased appetite', 'nervousness', 'tremors', 'sweating', 'heat intolerance'],
-            'specialty': 'Endocrinologist'
-        },
-        'Hypertension': {
-            'symptoms': ['headaches', 'dizziness', 'nosebleeds', 'chest pain', 'shortness of breath', 'vision problems', 'fatigue'],
-            'specialty': 'Cardiologist'
-        },
-        'Coronary Artery Disease': {
-            'symptoms': ['chest pain', 'shortness of breath', 'heart palpitations', 'weakness', 'nausea', 'sweating', 'jaw pain'],
-            'specialty': 'Cardiologist'
-        },
-        'Arthritis': {
-            'symptoms': ['joint pain', 'stiffness', 'swelling', 'reduced range of motion', 'redness', 'warmth in joints', 'morning stiffness'],
-            'specialty': 'Rheumatologist'
-        },
-        'Osteoporosis': {
-            'symptoms': ['back pain', 'loss of height', 'stooped posture', 'bone fractures', 'weakness', 'bone pain'],
-            'specialty': 'Orthopedic'
-        },
-        'Dermatitis': {
-            'symptoms': ['itchy skin', 'red rash', 'dry skin', 'blisters', 'swelling', 'burning sensation', 'skin lesions'],
-            'specialty': 'Dermatologist'
-        },
-        'Psoriasis': {
-            'symptoms': ['red patches', 'silvery scales', 'dry cracked skin', 'itching', 'burning', 'thick nails', 'joint pain'],
-            'specialty': 'Dermatologist'
-        },
-        'Urinary Tract Infection': {
-            'symptoms': ['burning urination', 'frequent urination', 'cloudy urine', 'strong smelling urine', 'pelvic pain', 'blood in urine'],
-            'specialty': 'Urologist'
-        },
-        'Kidney Stones': {
-            'symptoms': ['severe back pain', 'side pain', 'painful urination', 'blood in urine', 'nausea', 'vomiting', 'frequent urination'],
-            'specialty': 'Nephrologist'
-        },
-        'Anemia': {
-            'symptoms': ['fatigue', 'weakness', 'pale skin', 'shortness of breath', 'dizziness', 'cold hands', 'chest pain', 'irregular heartbeat'],
-            'specialty': 'Hematologist'
-        },
-        'Depression': {
-            'symptoms': ['persistent sadness', 'loss of interest', 'fatigue', 'sleep problems', 'appetite changes', 'difficulty concentrating', 'hopelessness'],
-            'specialty': 'Psychiatrist'
-        },
-        'Anxiety Disorder': {
-            'symptoms': ['excessive worry', 'restlessness', 'rapid heartbeat', 'sweating', 'trembling', 'difficulty concentrating', 'insomnia'],
-            'specialty': 'Psychiatrist'
-        },
-        'Sinusitis': {
-            'symptoms': ['facial pain', 'nasal congestion', 'thick nasal discharge', 'reduced sense of smell', 'headache', 'cough', 'fever'],
-            'specialty': 'ENT Specialist'
-        },
-        'Tonsillitis': {
-            'symptoms': ['sore throat', 'difficulty swallowing', 'swollen tonsils', 'fever', 'bad breath', 'neck swelling', 'tender lymph nodes'],
-            'specialty': 'ENT Specialist'
-        },
-        'Conjunctivitis': {
-            'symptoms': ['red eyes', 'itchy eyes', 'discharge', 'watery eyes', 'burning sensation', 'swollen eyelids', 'blurred vision'],
-            'specialty': 'Ophthalmologist'
-        },
-        'Glaucoma': {
-            'symptoms': ['eye pain', 'blurred vision', 'seeing halos', 'redness', 'nausea', 'vision loss', 'headache'],
-            'specialty': 'Ophthalmologist'
-        },
-        'Dengue Fever': {
-            'symptoms': ['high fever', 'severe headache', 'pain behind eyes', 'joint pain', 'muscle pain', 'rash', 'mild bleeding'],
-            'specialty': 'General Physician'
-        },
-        'Malaria': {
-            'symptoms': ['fever', 'chills', 'sweating', 'headache', 'nausea', 'vomiting', 'muscle pain', 'fatigue'],
-            'specialty': 'General Physician'
-        },
-        'Typhoid': {
-            'symptoms': ['prolonged fever', 'weakness', 'stomach pain', 'headache', 'loss of appetite', 'constipation', 'rash'],
-            'specialty': 'General Physician'
-        },
-        'Chickenpox': {
-            'symptoms': ['itchy rash', 'blisters', 'fever', 'tiredness', 'loss of appetite', 'headache', 'red spots'],
-            'specialty': 'Dermatologist'
-        },
-        'Measles': {
-            'symptoms': ['fever', 'cough', 'runny nose', 'red eyes', 'rash', 'white spots in mouth', 'sore throat'],
-            'specialty': 'General Physician'
-        },
-        'Hepatitis': {
-            'symptoms': ['jaundice', 'fatigue', 'abdominal pain', 'loss of appetite', 'nausea', 'dark urine', 'pale stool'],
-            'specialty': 'Hepatologist'
-        },
-        'Cirrhosis': {
-            'symptoms': ['fatigue', 'easy bruising', 'swelling legs', 'yellow skin', 'itchy skin', 'weight loss', 'confusion'],
-            'specialty': 'Hepatologist'
-        },
-        'Appendicitis': {
-            'symptoms': ['sudden pain right side', 'nausea', 'vomiting', 'loss of appetite', 'fever', 'constipation', 'abdominal swelling'],
-            'specialty': 'General Surgeon'
-        },
-        'Gallstones': {
-            'symptoms': ['sudden pain upper right abdomen', 'back pain', 'nausea', 'vomiting', 'indigestion', 'bloating'],
-            'specialty': 'Gastroenterologist'
-        },
-        'Pancreatitis': {
-            'symptoms': ['upper abdominal pain', 'pain radiating to back', 'nausea', 'vomiting', 'fever', 'rapid pulse', 'tender abdomen'],
-            'specialty': 'Gastroenterologist'
-        },
-        'Vertigo': {
-            'symptoms': ['spinning sensation', 'loss of balance', 'nausea', 'vomiting', 'headache', 'sweating', 'ringing in ears'],
-            'specialty': 'ENT Specialist'
-        },
-        'Epilepsy': {
-            'symptoms': ['seizures', 'temporary confusion', 'staring spell', 'uncontrollable jerking', 'loss of consciousness', 'fear', 'anxiety'],
-            'specialty': 'Neurologist'
-        },
-        "Parkinson's Disease": {
-            'symptoms': ['tremors', 'slowed movement', 'rigid muscles', 'impaired posture', 'loss of balance', 'speech changes', 'writing changes'],
-            'specialty': 'Neurologist'
-        },
-        "Alzheimer's Disease": {
-            'symptoms': ['memory loss', 'difficulty planning', 'confusion', 'difficulty speaking', 'misplacing things', 'poor judgment', 'mood changes'],
-            'specialty': 'Neurologist'
-        },
-        'Multiple Sclerosis': {
-            'symptoms': ['numbness', 'tingling', 'weakness', 'vision problems', 'dizziness', 'fatigue', 'difficulty walking'],
-            'specialty': 'Neurologist'
-        },
-        'Chronic Kidney Disease': {
-            'symptoms': ['fatigue', 'swelling', 'shortness of breath', 'nausea', 'confusion', 'chest pain', 'high blood pressure'],
-            'specialty': 'Nephrologist'
-        },
-        'Lupus': {
-            'symptoms': ['fatigue', 'joint pain', 'rash', 'fever', 'chest pain', 'hair loss', 'sensitivity to light'],
-            'specialty': 'Rheumatologist'
-        },
-        'Gout': {
-            'symptoms': ['intense joint pain', 'redness', 'swelling', 'limited range of motion', 'tenderness', 'warmth'],
-            'specialty': 'Rheumatologist'
-        },
-        'Fibromyalgia': {
-            'symptoms': ['widespread pain', 'fatigue', 'sleep problems', 'cognitive difficulties', 'headaches', 'depression', 'anxiety'],
-            'specialty': 'Rheumatologist'
-        },
-        'Sleep Apnea': {
-            'symptoms': ['loud snoring', 'gasping during sleep', 'morning headache', 'excessive daytime sleepiness', 'difficulty concentrating', 'irritability'],
-            'specialty': 'Pulmonologist'
-        },
-        'Tuberculosis': {
-            'symptoms': ['persistent cough', 'coughing blood', 'chest pain', 'weight loss', 'fever', 'night sweats', 'fatigue'],
-            'specialty': 'Pulmonologist'
-        },
-        'COPD': {
-            'symptoms': ['shortness of breath', 'chronic cough', 'wheezing', 'chest tightness', 'frequent respiratory infections', 'fatigue', 'mucus production'],
-            'specialty': 'Pulmonologist'
-        }
-    }
-    
-    # Generate variations of symptoms to create robust dataset
-    training_data = []
-    
-    for disease, info in disease_data.items():
-        symptoms_list = info['symptoms']
-        specialty = info['specialty']
-        
-        # Generate 200+ variations per disease for robust training (increased from 150)
-        for _ in range(200):
-            # Random selection of 2-7 symptoms (increased upper bound)
-            num_symptoms = np.random.randint(2, min(8, len(symptoms_list) + 1))
-            selected_symptoms = np.random.choice(symptoms_list, num_symptoms, replace=False)
-            
-            # Create variations with different word orders and connectors
-            connectors = [', ', ' and ', ', ', ' with ', ', also ']
-            symptom_text = ''
-            
-            for i, symptom in enumerate(selected_symptoms):
-                if i == 0:
-                    symptom_text = symptom
-                else:
-                    connector = np.random.choice(connectors)
-                    symptom_text += connector + symptom
-            
-            # Add some natural language variations with more diversity
-            prefixes = ['I have ', 'Experiencing ', 'Suffering from ', 'Feeling ', 
-                       'I am having ', 'Having ', '', 'Got ', 'Recently developed ',
-                       'Patient has ', 'Started with ', 'Symptoms include ']
-            suffixes = ['', ' for few days', ' since yesterday', ' since last week',
-                       ' recently', ' from past 2 days', ' today', ' for a while',
-                       ' getting worse', ' mild', ' severe']
-            
-            prefix = np.random.choice(prefixes)
-            suffix = np.random.choice(suffixes)
-            
-            final_text = prefix + symptom_text + suffix
-            
-            training_data.append({
-                'symptoms': final_text.strip(),
-                'disease': disease,
-                'specialty': specialty
-            })
+        json.dump(list(trained.symptom_keywords), f)
     
-    df = pd.DataFrame(training_data)
-    return df
+    # Export the compiled forest (and fast tier) and serve predictions from the mapped artifacts
+    version = save_artifacts(ARTIFACT_DIR, serving_model(trained), trained.vectorizer, trained.label_encoder,
+                             trained.disease_to_specialty, trained.symptom_keywords)
+    install_model(load_artifacts(ARTIFACT_DIR, version))
+    print(f"Model artifacts saved: {ARTIFACT_DIR}/{version}")
 
-def preprocess_symptoms(text):
-    """Preprocess symptom text"""
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+# Words of 3+ letters that carry no symptom information
+SYMPTOM_WORD = re.compile(r'\b\w{3,}\b')
+COMMON_WORDS = frozenset({'have', 'experiencing', 'feeling', 'suffering', 'from', 'since',
+                          'yesterday', 'last', 'week', 'days', 'recently', 'past', 'got'})
 
 def validate_symptoms(text):
-    """Check if text contains valid medical symptom keywords"""
-    words = set(re.findall(r'\b\w{3,}\b', text.lower()))
-    common_words = {'have', 'experiencing', 'feeling', 'suffering', 'from', 'since', 
-                   'yesterday', 'last', 'week', 'days', 'recently', 'past', 'got'}
-    
-    # Remove common words
-    symptom_words = words - common_words
-    
-    # Check if at least one word matches known symptom keywords
-    if symptom_keywords and len(symptom_words & symptom_keywords) > 0:
-        return True
-    return len(symptom_words) > 0
+    """
+    Check if text contains any word that could describe a symptom
+    Any 3+ letter word outside COMMON_WORDS qualifies, known symptom keywords included
+    """
+    return any(word not in COMMON_WORDS for word in SYMPTOM_WORD.findall(text.lower()))
+
+# Manual symptom patterns, compiled once from symptom_rules.json
+symptom_rules = SymptomRuleEngine.from_file()
 
 def check_manual_patterns(text):
     """
     Manual pattern matching for common symptom combinations
     Returns (disease, confidence, specialty) or None
     """
-    text_lower = text.lower()
+    with metrics.stage('manual_patterns'):
+        return symptom_rules.match(text)
+
+# Upper bound on records accepted by /api/predict/batch in one request
+MAX_BATCH_SIZE = 1000
+
+INVALID_INPUT = {
+    'error': 'invalid_input',
+    'message': 'Send a JSON object whose symptoms field is a string'
+}
+
+def check_prediction_input(symptoms_text, state, city):
+    """
+    Validate a single prediction record
+    Returns (processed_symptoms, None) or (None, error) where error is a response dict
+    """
+    if not symptoms_text:
+        return None, {
+            'error': 'no_input',
+            'message': 'Please enter your symptoms'
+        }
     
-    # Common cold patterns
-    cold_keywords = ['cold', 'runny', 'nose', 'sneez', 'congestion', 'stuffy']
-    cold_count = sum(1 for keyword in cold_keywords if keyword in text_lower)
-    if cold_count >= 2:
-        return ('Common Cold', 0.75, 'General Physician')
+    if not state or not city:
+        return None, {
+            'error': 'no_location',
+            'message': 'Please select your location'
+        }
     
-    # Flu patterns
-    flu_keywords = ['fever', 'headache', 'body', 'pain', 'ache', 'fatigue', 'chills']
-    flu_count = sum(1 for keyword in flu_keywords if keyword in text_lower)
-    if flu_count >= 2:
-        return ('Influenza (Flu)', 0.70, 'General Physician')
+    # Preprocess symptoms
+    with metrics.stage('preprocess'):
+        processed_symptoms = preprocess_symptoms(symptoms_text)
     
-    # Chest/respiratory
-    if ('chest' in text_lower and 'pain' in text_lower) or \
-       ('shortness' in text_lower and 'breath' in text_lower) or \
-       ('breathing' in text_lower and 'difficulty' in text_lower):
-        return ('Respiratory Infection', 0.65, 'Pulmonologist')
+    # Validate if symptoms contain medical keywords
+    with metrics.stage('validate'):
+        valid = validate_symptoms(processed_symptoms)
+    if not valid:
+        return None, {
+            'error': 'no_match',
+            'message': 'Could not identify valid symptoms. Please describe your health condition.'
+        }
     
-    # Stomach issues
-    stomach_keywords = ['stomach', 'nausea', 'vomit', 'diarrhea', 'abdominal']
-    stomach_count = sum(1 for keyword in stomach_keywords if keyword in text_lower)
-    if stomach_count >= 2:
-        return ('Gastroenteritis', 0.70, 'Gastroenterologist')
+    return processed_symptoms, None
+
+def predict_with_cache(records):
+    """
+    Predict (symptoms_text, processed_symptoms) records, reusing cached results
+    Cache misses are scored together in one forest pass
+    Returns a list of (result, error) as from interpret_prediction
+    """
+    outcomes = [None] * len(records)
+    misses = []  # (index, processed_symptoms)
+    # The engine reference is swapped as a whole on reload, keep one for the whole call
+    engine = inference_engine
+    generation = prediction_cache.generation
     
-    return None
+    for i, (_, processed_symptoms) in enumerate(records):
+        # Keyed on exactly what the model scores, so a hit answers as the model would:
+        # case, punctuation and spacing variants share an entry, other word orders
+        # do not (the 2-3 word n-grams depend on the order)
+        cached = prediction_cache.get(processed_symptoms)
+        if cached is None:
+            misses.append((i, processed_symptoms))
+        else:
+            outcomes[i] = cached
+    
+    if misses:
+        # Manual patterns compete with the model confidence, which only the forest's
+        # calibration was tuned for: matched records skip the cascade's fast tier
+        overrides = [check_manual_patterns(m[1]) for m in misses]
+        predictions = engine.predict([m[1] for m in misses], defer=[o is not None for o in overrides])
+        for (i, processed_symptoms), prediction, override in zip(misses, predictions, overrides):
+            outcomes[i] = interpret_prediction(prediction, override, disease_to_specialty)
+            prediction_cache.put(processed_symptoms, outcomes[i], generation)
+    
+    # Error dicts are extended by the routes, hand out copies
+    return [(result, dict(error) if error else None) for result, error in outcomes]
 
 @app.route('/api/predict', methods=['POST'])
+@require_model
 def predict_disease():
     """Predict disease from symptoms"""
     try:
-        data = request.json
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('symptoms', ''), str):
+            return jsonify(INVALID_INPUT), 400
         symptoms_text = data.get('symptoms', '').strip()
         state = data.get('state', '')
         city = data.get('city', '')
         
-        if not symptoms_text:
-            return jsonify({
-                'error': 'no_input',
-                'message': 'Please enter your symptoms',
-                'suggestions': get_common_symptom_suggestions()
-            }), 400
+        processed_symptoms, error = check_prediction_input(symptoms_text, state, city)
+        if error:
+            if error['error'] != 'no_location':
+                error['suggestions'] = get_common_symptom_suggestions()
+            return jsonify(error), 400
         
-        if not state or not city:
-            return jsonify({
-                'error': 'no_location',
-                'message': 'Please select your location'
-            }), 400
+        # Vectorize and predict with a single forest pass, unless the result is cached
+        result, error = predict_with_cache([(symptoms_text, processed_symptoms)])[0]
+        if error:
+            error['suggestions'] = get_common_symptom_suggestions()
+            return jsonify(error), 400
+        disease, confidence, specialty = result
         
-        # Preprocess symptoms
-        processed_symptoms = preprocess_symptoms(symptoms_text)
+        # Get top doctors
+        doctors = get_doctors(specialty, state, city)
         
-        # Validate if symptoms contain medical keywords
-        if not validate_symptoms(processed_symptoms):
+        return jsonify({
+            'disease': disease,
+            'confidence': confidence,
+            'specialty': specialty,
+            'doctors': doctors,
+            'message': 'Prediction successful'
+        })
+        
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': 'server_error',
+            'message': 'An error occurred while processing your request'
+        }), 500
+
+@app.route('/api/predict/batch', methods=['POST'])
+@require_model
+def predict_disease_batch():
+    """
+    Predict diseases for a list of {symptoms, state, city} records
+    All valid records are vectorized together and scored with a single forest pass
+    """
+    try:
+        data = request.get_json(silent=True)
+        records = data.get('records') if isinstance(data, dict) else data
+        include_doctors = data.get('include_doctors', True) if isinstance(data, dict) else True
+        
+        if not isinstance(records, list) or not records:
             return jsonify({
-                'error': 'no_match',
-                'message': 'Could not identify valid symptoms. Please describe your health condition.',
-                'suggestions': get_common_symptom_suggestions()
+                'error': 'no_input',
+                'message': 'Please send a non-empty list of records'
             }), 400
         
-        # Manual pattern matching for common cases (boosts low confidence predictions)
-        manual_override = check_manual_patterns(processed_symptoms)
-        
-        # Vectorize symptoms
-        symptoms_vectorized = vectorizer.transform([processed_symptoms])
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({
+                'error': 'batch_too_large',
+                'message': f'At most {MAX_BATCH_SIZE} records can be predicted per request'
+            }), 413
         
-        # Predict disease
-        prediction = model.predict(symptoms_vectorized)[0]
-        probabilities = model.predict_proba(symptoms_vectorized)[0]
+        results = [None] * len(records)
+        pending = []  # (index, symptoms_text, processed_symptoms, state, city)
         
-        # Get confidence score
-        confidence = float(probabilities[prediction])
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                results[i] = {'index': i, 'error': 'invalid_record', 'message': 'Each record must be an object'}
+                continue
+            state = record.get('state', '')
+            city = record.get('city', '')
+            if not isinstance(record.get('symptoms', ''), str):
+                results[i] = {'index': i, **INVALID_INPUT}
+                continue
+            symptoms_text = record.get('symptoms', '').strip()
+            processed_symptoms, error = check_prediction_input(symptoms_text, state, city)
+            if error:
+                results[i] = {'index': i, **error}
+            else:
+                pending.append((i, symptoms_text, processed_symptoms, state, city))
         
-        # If manual override exists and has better confidence, use it
-        if manual_override and manual_override[1] > confidence:
-            disease = manual_override[0]
-            confidence = manual_override[1]
-            specialty = manual_override[2]
-        else:
-            # Get top 3 predictions for better decision making
-            top_3_indices = np.argsort(probabilities)[-3:][::-1]
-            top_3_predictions = [(label_encoder.inverse_transform([idx])[0], probabilities[idx]) for idx in top_3_indices]
+        if pending:
+            # One sparse matrix and one forest traversal for all uncached records
+            outcomes = predict_with_cache([(p[1], p[2]) for p in pending])
             
-            # Decode prediction
-            disease = label_encoder.inverse_transform([prediction])[0]
-            specialty = disease_to_specialty.get(disease, 'General Physician')
-            
-            # Very lenient threshold - accept almost any reasonable prediction
-            if confidence < 0.08:  # Lowered from 0.10 to 0.08 (8%)
-                # Check if any of top 3 predictions are reasonable
-                if top_3_predictions[0][1] > 0.05:  # If best prediction is above 5%, use it
-                    disease = top_3_predictions[0][0]
-                    confidence = top_3_predictions[0][1]
-                    specialty = disease_to_specialty.get(disease, 'General Physician')
-                else:
-                    return jsonify({
-                        'error': 'low_confidence',
-                        'message': 'Could not confidently predict. Please provide more specific symptoms.',
-                        'suggestions': get_common_symptom_suggestions(),
-                        'confidence': confidence
-                    }), 400
-        
-        # Get top doctors
-        doctors = get_doctors(specialty, state, city)
+            for (i, _, _, state, city), (result, error) in zip(pending, outcomes):
+                if error:
+                    results[i] = {'index': i, **error}
+                    continue
+                disease, confidence, specialty = result
+                results[i] = {
+                    'index': i,
+                    'disease': disease,
+                    'confidence': confidence,
+                    'specialty': specialty
+                }
+                if include_doctors:
+                    results[i]['doctors'] = get_doctors(specialty, state, city)
         
+        failed = sum(1 for r in results if 'error' in r)
         return jsonify({
-            'disease': disease,
-            'confidence': confidence,
-            'specialty': specialty,
-            'doctors': doctors,
-            'message': 'Prediction successful'
+            'results': results,
+            'count': len(results),
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'suggestions': get_common_symptom_suggestions() if failed else [],
+            'message': 'Batch prediction complete'
         })
         
     except Exception as e:
@@ -529,9 +505,27 @@ def get_common_symptom_suggestions():
         'back pain, muscle ache'
     ]
 
+# Indexed doctor directory, built with seed_doctors.py; random mock doctors are served without one
+try:
+    doctor_directory = DoctorDirectory(DEFAULT_DB_PATH)
+except FileNotFoundError:
+    doctor_directory = None
+    print(f"No doctor directory at {DEFAULT_DB_PATH}, serving mock doctors")
+
 def get_doctors(specialty, state, city):
-    """Get top 10 doctors for specialty in location"""
-    # Mock doctor data - In production, this would query a real database
+    """
+    Get top 10 doctors for specialty in location
+    Locations the directory does not cover get mock doctors, as before the directory existed
+    """
+    with metrics.stage('doctors'):
+        if doctor_directory is not None:
+            doctors = doctor_directory.top_doctors(specialty, state, city, limit=10)
+            if doctors:
+                return doctors
+        return get_mock_doctors(specialty, state, city)
+
+def get_mock_doctors(specialty, state, city):
+    """Random doctors for development setups and locations outside the doctor directory"""
     doctor_names = ['Sharma', 'Patel', 'Kumar', 'Singh', 'Reddy', 
                    'Gupta', 'Verma', 'Mehta', 'Joshi', 'Khan',
                    'Agarwal', 'Desai', 'Iyer', 'Nair', 'Rao']
@@ -559,15 +553,89 @@ def get_doctors(specialty, state, city):
     doctors.sort(key=lambda x: x['rating'], reverse=True)
     return doctors
 
+@app.route('/api/doctors', methods=['GET'])
+def search_doctors():
+    """
+    Page through doctors of a specialty in a city, best rated first
+    Query parameters: specialty, state, city, limit (default 10, max 100),
+    available (true/false, optional) and cursor (next_cursor of the previous page)
+    """
+    specialty = request.args.get('specialty', '').strip()
+    state = request.args.get('state', '').strip()
+    city = request.args.get('city', '').strip()
+    if not specialty or not state or not city:
+        return jsonify({
+            'error': 'missing_parameters',
+            'message': 'specialty, state and city are required'
+        }), 400
+    if doctor_directory is None:
+        return jsonify({
+            'error': 'directory_unavailable',
+            'message': 'The doctor directory has not been set up'
+        }), 503
+    
+    available = request.args.get('available')
+    if available is not None:
+        available = available.lower() in ('1', 'true', 'yes')
+    try:
+        limit = int(request.args.get('limit', 10))
+        doctors, next_cursor = doctor_directory.search(
+            specialty, state, city, limit=limit, available=available,
+            cursor=request.args.get('cursor')
+        )
+    except ValueError:
+        return jsonify({
+            'error': 'invalid_parameters',
+            'message': 'limit and cursor must be integers'
+        }), 400
+    
+    return jsonify({
+        'doctors': doctors,
+        'count': len(doctors),
+        'next_cursor': next_cursor
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'model_loaded': model is not None,
+        'model_status': model_status['state'],
+        'model_version': model_version,
+        'prediction_cache': prediction_cache.stats(),
+        'cascade': model.stats() if isinstance(model, CascadeModel) else None,
         'message': 'Disease Prediction API is running'
     })
 
+@app.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once the model can serve predictions, 503 before"""
+    ready = inference_engine is not None
+    return jsonify({
+        'status': 'ready' if ready else model_status['state'],
+        'model_loaded': ready,
+        'model_version': model_version,
+        'load_started_at': model_status['started_at'],
+        'load_seconds': model_status['load_seconds'],
+        'error': model_status['error']
+    }), 200 if ready else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Stage latency histograms in Prometheus text format (ML_METRICS=1)"""
+    if not metrics.enabled:
+        return jsonify({
+            'error': 'metrics_disabled',
+            'message': 'Start the server with ML_METRICS=1 to collect metrics'
+        }), 404
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/diseases', methods=['GET'])
 def get_diseases():
     """Get list of all diseases the model can predict"""
@@ -578,9 +646,12 @@ def get_diseases():
         })
     return jsonify({'diseases': [], 'count': 0})
 
+# Development server only; for production run gunicorn -c gunicorn.conf.py app:app
 if __name__ == '__main__':
-    print("Loading/Training Disease Prediction Model...")
-    load_or_train_model()
-    print(f"Model ready! Can predict {len(label_encoder.classes_)} diseases.")
+    debug = True
+    # The debug reloader runs this block in a watcher process too; only the serving child loads the model
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        print("Loading/Training Disease Prediction Model in the background...")
+        start_background_model_load()
     print("Starting Flask server...")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Memory-mapped model artifacts for the disease prediction model
+
+Layout of the artifact root:
+    CURRENT                     name of the active version (replaced atomically)
+    <version>/manifest.json     format version, classes, vectorizer settings, array index
+    <version>/forest_*.npy      CompiledForest node arrays, loaded with mmap_mode='r'
+      or <version>/linear_*.npy CompiledLinearModel coefficients (incrementally trained models)
+    <version>/cascade_*.npy     fast-tier CompiledLinearModel in front of the forest (optional)
+    <version>/idf.npy           TF-IDF weights (TF-IDF vectorizer only)
+    <version>/vocabulary.json   TF-IDF vocabulary (TF-IDF vectorizer only)
+    <version>/disease_specialty_map.json, symptom_keywords.json
+
+Arrays are mapped read-only, so every worker process shares the same page-cache
+pages and loading does not unpickle anything. A TF-IDF vectorizer is loaded as a
+CompiledTfidfVectorizer when its settings allow it.
+"""
+
+from collections import namedtuple
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+
+from compiled_model import CascadeModel, CompiledForest, CompiledLinearModel
+from compiled_vectorizer import CompiledTfidfVectorizer, is_supported
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+CURRENT = 'CURRENT'
+# Versions created or replaced as CURRENT this recently are never pruned, so a reader
+# that resolved CURRENT just before a publish can still map the version it read
+PRUNE_GRACE_SECONDS = 120
+
+# Fitted TfidfVectorizer settings that affect transform()
+VECTORIZER_PARAMS = ('input', 'encoding', 'decode_error', 'strip_accents', 'lowercase', 'analyzer',
+                     'token_pattern', 'ngram_range', 'stop_words', 'binary', 'norm', 'use_idf',
+                     'smooth_idf', 'sublinear_tf')
+# HashingVectorizer is stateless, its settings are all there is to save
+HASHING_PARAMS = ('input', 'encoding', 'decode_error', 'strip_accents', 'lowercase', 'analyzer',
+                  'token_pattern', 'ngram_range', 'stop_words', 'binary', 'norm', 'n_features',
+                  'alternate_sign')
+
+ModelArtifacts = namedtuple('ModelArtifacts', [
+    'version', 'path', 'model', 'vectorizer', 'label_encoder',
+    'disease_to_specialty', 'symptom_keywords', 'manifest'
+])
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def _read_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def current_version(root):
+    """Name of the active version, or None if nothing was published yet"""
+    try:
+        with open(os.path.join(root, CURRENT), 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _save_arrays(directory, prefix, obj, names):
+    arrays = {}
+    for name in names:
+        array = np.ascontiguousarray(getattr(obj, name))
+        filename = f'{prefix}_{name}.npy'
+        np.save(os.path.join(directory, filename), array, allow_pickle=False)
+        arrays[name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape)}
+    return arrays
+
+def _load_arrays(directory, arrays):
+    return {
+        name: np.load(os.path.join(directory, spec['file']), mmap_mode='r', allow_pickle=False)
+        for name, spec in arrays.items()
+    }
+
+def _save_vectorizer(directory, vectorizer):
+    params = vectorizer.get_params()
+    if isinstance(vectorizer, HashingVectorizer):
+        return {'kind': 'hashing', 'params': {key: params[key] for key in HASHING_PARAMS if key in params}}
+
+    np.save(os.path.join(directory, 'idf.npy'), np.asarray(vectorizer.idf_, dtype=np.float64), allow_pickle=False)
+    _write_json(os.path.join(directory, 'vocabulary.json'),
+                {term: int(index) for term, index in vectorizer.vocabulary_.items()})
+    return {
+        'kind': 'tfidf',
+        'params': {key: params[key] for key in VECTORIZER_PARAMS if key in params},
+        'vocabulary': 'vocabulary.json',
+        'idf': 'idf.npy'
+    }
+
+def save_artifacts(root, model, vectorizer, label_encoder, disease_to_specialty, symptom_keywords,
+                   version=None, keep=3):
+    """
+    Write a new artifact version and make it current
+    model may be a fitted RandomForestClassifier, a CompiledForest, a CompiledLinearModel
+    or a CascadeModel of a CompiledLinearModel in front of either forest
+    vectorizer may be a fitted TfidfVectorizer or a HashingVectorizer
+    Returns the version name
+    """
+    cascade = None
+    if isinstance(model, CascadeModel):
+        cascade, model = model, model.slow
+    if not isinstance(model, (CompiledForest, CompiledLinearModel)):
+        model = CompiledForest.from_sklearn(model)
+
+    version = version or time.strftime('%Y%m%d-%H%M%S') + f'-{uuid.uuid4().hex[:8]}'
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f'.staging-{version}')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'classes': [str(c) for c in label_encoder.classes_],
+    }
+    if isinstance(model, CompiledForest):
+        manifest['forest'] = {
+            'n_estimators': model.n_estimators,
+            'node_count': model.node_count,
+            'n_features': model.n_features,
+            'max_depth': model.max_depth,
+            'arrays': _save_arrays(staging, 'forest', model, CompiledForest.ARRAYS + CompiledForest.TRAVERSAL_ARRAYS)
+        }
+    else:
+        manifest['linear'] = {
+            'link': model.link,
+            'n_features': model.n_features,
+            'arrays': _save_arrays(staging, 'linear', model, CompiledLinearModel.ARRAYS)
+        }
+    if cascade is not None:
+        manifest['cascade'] = {
+            'threshold': cascade.threshold,
+            'link': cascade.fast.link,
+            'n_features': cascade.fast.n_features,
+            'arrays': _save_arrays(staging, 'cascade', cascade.fast, CompiledLinearModel.ARRAYS)
+        }
+    manifest['vectorizer'] = _save_vectorizer(staging, vectorizer)
+
+    _write_json(os.path.join(staging, 'disease_specialty_map.json'), disease_to_specialty)
+    _write_json(os.path.join(staging, 'symptom_keywords.json'), sorted(symptom_keywords))
+    manifest['disease_specialty_map'] = 'disease_specialty_map.json'
+    manifest['symptom_keywords'] = 'symptom_keywords.json'
+    # The manifest is written last, a version directory without one is incomplete
+    _write_json(os.path.join(staging, MANIFEST), manifest)
+
+    target = os.path.join(root, version)
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(staging, target)
+    _set_current(root, version)
+    prune_versions(root, keep=keep)
+    return version
+
+def _set_current(root, version):
+    # os.replace is atomic, readers see either the old or the new version name
+    previous = current_version(root)
+    tmp = os.path.join(root, f'.{CURRENT}.{os.getpid()}')
+    with open(tmp, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT))
+    # The directory mtime of the replaced version marks when it was retired, see prune_versions
+    if previous and previous != version:
+        try:
+            os.utime(os.path.join(root, previous))
+        except FileNotFoundError:
+            pass
+
+def prune_versions(root, keep=3):
+    """
+    Delete all but the newest `keep` versions, never the current one nor one created or
+    retired within PRUNE_GRACE_SECONDS
+    Workers that still map an old version keep their pages until they unmap them
+    """
+    current = current_version(root)
+    now = time.time()
+    manifests = {
+        name: os.path.join(root, name, MANIFEST) for name in os.listdir(root)
+        if not name.startswith('.') and os.path.isfile(os.path.join(root, name, MANIFEST))
+    }
+    versions = sorted(manifests, key=lambda name: os.path.getmtime(manifests[name]))
+    for name in versions[:-keep] if keep else versions:
+        path = os.path.join(root, name)
+        if name != current and now - os.path.getmtime(path) >= PRUNE_GRACE_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+
+def _load_vectorizer(path, spec):
+    params = dict(spec['params'])
+    if 'ngram_range' in params:
+        params['ngram_range'] = tuple(params['ngram_range'])
+    if spec.get('kind', 'tfidf') == 'hashing':
+        return HashingVectorizer(**params)
+    vocabulary = _read_json(os.path.join(path, spec['vocabulary']))
+    idf = np.load(os.path.join(path, spec['idf']))
+    # Same output as TfidfVectorizer.transform, without its per-call overhead
+    if is_supported(params):
+        return CompiledTfidfVectorizer(vocabulary, idf, **params)
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = idf
+    return vectorizer
+
+def load_artifacts(root, version=None):
+    """
+    Map the current (or given) artifact version read-only
+    Without a version, a version pruned between reading CURRENT and mapping it is retried
+    from the new CURRENT
+    Raises FileNotFoundError when no version has been published
+    """
+    if version is not None:
+        return _load_version(root, version)
+    for attempt in range(3):
+        version = current_version(root)
+        if version is None:
+            raise FileNotFoundError(f"No model artifacts published in {root}")
+        try:
+            return _load_version(root, version)
+        except FileNotFoundError:
+            if attempt == 2 or current_version(root) == version:
+                raise
+
+def _load_version(root, version):
+    path = os.path.join(root, version)
+    manifest = _read_json(os.path.join(path, MANIFEST))
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format_version')} in {path}")
+
+    if 'forest' in manifest:
+        forest = manifest['forest']
+        model = CompiledForest(n_features=forest['n_features'], max_depth=forest['max_depth'],
+                               **_load_arrays(path, forest['arrays']))
+    else:
+        linear = manifest['linear']
+        model = CompiledLinearModel(link=linear['link'], **_load_arrays(path, linear['arrays']))
+    if 'cascade' in manifest:
+        cascade = manifest['cascade']
+        fast = CompiledLinearModel(link=cascade['link'], **_load_arrays(path, cascade['arrays']))
+        model = CascadeModel(fast, model, cascade['threshold'])
+
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = np.asarray(manifest['classes'], dtype=object)
+
+    return ModelArtifacts(
+        version=version,
+        path=path,
+        model=model,
+        vectorizer=_load_vectorizer(path, manifest['vectorizer']),
+        label_encoder=label_encoder,
+        disease_to_specialty=_read_json(os.path.join(path, manifest['disease_specialty_map'])),
+        symptom_keywords=set(_read_json(os.path.join(path, manifest['symptom_keywords']))),
+        manifest=manifest
+    )
@@ -0,0 +1,112 @@
+"""
+Cold-start time and per-worker memory: pickled model vs memory-mapped artifacts
+Forks N workers that each load the model and run one prediction, like a prefork server
+Memory figures come from /proc/self/smaps_rollup (Linux only)
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def memory_kb():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+def load_pickles():
+    from inference import DiseaseInferenceEngine
+    with open('disease_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open('vectorizer.pkl', 'rb') as f:
+        vectorizer = pickle.load(f)
+    with open('label_encoder.pkl', 'rb') as f:
+        label_encoder = pickle.load(f)
+    return DiseaseInferenceEngine.from_label_encoder(model, vectorizer, label_encoder)
+
+def load_mapped():
+    from artifacts import load_artifacts
+    from inference import DiseaseInferenceEngine
+    artifacts = load_artifacts('model_artifacts')
+    return DiseaseInferenceEngine.from_label_encoder(artifacts.model, artifacts.vectorizer, artifacts.label_encoder)
+
+def worker(loader, write_fd, ready_fd):
+    before = memory_kb()
+    start = time.perf_counter()
+    engine = loader()
+    engine.predict_one('fever headache body pain')
+    load_seconds = time.perf_counter() - start
+    os.write(write_fd, b'loaded\n')
+    # Wait until every worker has loaded, so shared pages are split across all of them
+    os.read(ready_fd, 1)
+    after = memory_kb()
+    os.write(write_fd, (json.dumps({
+        'load_ms': load_seconds * 1000,
+        'pss_delta_kb': after['pss'] - before['pss'],
+        'private_delta_kb': after['private'] - before['private']
+    }) + '\n').encode())
+    os._exit(0)
+
+def run(loader, workers):
+    result_r, result_w = os.pipe()
+    ready_r, ready_w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(result_r)
+            worker(loader, result_w, ready_r)
+        pids.append(pid)
+    os.close(result_w)
+    reader = os.fdopen(result_r)
+    for _ in pids:
+        reader.readline()
+    os.write(ready_w, b'x' * workers)
+    results = [json.loads(reader.readline()) for _ in pids]
+    for pid in pids:
+        os.waitpid(pid, 0)
+    reader.close()
+    os.close(ready_r)
+    os.close(ready_w)
+    return results
+
+def summarize(name, results):
+    mean = lambda key: sum(r[key] for r in results) / len(results)
+    print(f"{name:<8} workers {len(results)}  load {mean('load_ms'):7.1f} ms  "
+          f"pss +{mean('pss_delta_kb') / 1024:6.1f} MB  "
+          f"private +{mean('private_delta_kb') / 1024:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    from artifacts import current_version
+    if not os.path.exists('disease_model.pkl'):
+        backend.train_model()
+    elif current_version(backend.ARTIFACT_DIR) is None:
+        backend.export_pickled_model()
+    # Import the heavy libraries once in the parent, as a preloading server would
+    import numpy, sklearn.ensemble, sklearn.feature_extraction.text  # noqa: F401
+
+    for workers in args.workers:
+        summarize('pickle', run(load_pickles, workers))
+        summarize('mmap', run(load_mapped, workers))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark /api/predict/batch against a loop of single /api/predict calls
+Run from anywhere: python benchmarks/bench_batch_predict.py --records 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_SYMPTOMS = [
+    'fever, headache, body pain',
+    'cough, cold, sore throat',
+    'stomach pain, nausea, vomiting',
+    'chest pain, shortness of breath',
+    'itchy skin, red rash, dry skin',
+    'joint pain, swelling, morning stiffness',
+    'increased thirst, frequent urination, blurred vision',
+    'memory loss, confusion, mood changes',
+    'wheezing and chest tightness at night',
+    'burning urination with cloudy urine',
+]
+
+def build_records(count):
+    return [
+        {'symptoms': SAMPLE_SYMPTOMS[i % len(SAMPLE_SYMPTOMS)], 'state': 'Delhi', 'city': 'New Delhi'}
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    backend.load_or_train_model()
+    client = backend.app.test_client()
+    records = build_records(args.records)
+
+    # Warm up both paths
+    client.post('/api/predict', json=records[0])
+    client.post('/api/predict/batch', json={'records': records[:10]})
+
+    single_times, batch_times = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for record in records:
+            client.post('/api/predict', json=record)
+        single_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post('/api/predict/batch', json={'records': records})
+        batch_times.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+
+    single = min(single_times)
+    batch = min(batch_times)
+    print(f"records:      {args.records}")
+    print(f"single loop:  {single:.3f}s  ({args.records / single:,.0f} records/s)")
+    print(f"batch call:   {batch:.3f}s  ({args.records / batch:,.0f} records/s)")
+    print(f"speedup:      {single / batch:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the published cascade (fast linear tier, forest fallback) with the forest alone
+Reports final decisions (disease, manual override or low-confidence error), their accuracy
+and the share of rows each tier answers on a freshly generated dataset, then batch and
+single-request latency through DiseaseInferenceEngine. Rows with a manual pattern match
+skip the fast tier, as in app.predict_with_cache.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def latency_ms(engine, texts, defer, iterations):
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        engine.predict([texts[i % len(texts)]], defer=[defer[i % len(texts)]])
+        timings.append(time.perf_counter() - start)
+    return np.percentile(np.array(timings) * 1000, [50, 99])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--samples-per-disease', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=7, help='Dataset seed, differs from the training default')
+    parser.add_argument('--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    from artifacts import load_artifacts
+    from compiled_model import CascadeModel
+    from inference import DiseaseInferenceEngine, interpret_prediction, preprocess_symptoms
+    from symptom_rules import SymptomRuleEngine
+    from train_pipeline import ARTIFACT_DIR
+    from training_data import create_training_dataset
+
+    artifacts = load_artifacts(ARTIFACT_DIR)
+    cascade = artifacts.model
+    if not isinstance(cascade, CascadeModel):
+        sys.exit(f"Artifacts {artifacts.version} have no cascade, publish with train_pipeline.py full")
+    engines = {
+        'forest': DiseaseInferenceEngine.from_label_encoder(cascade.slow, artifacts.vectorizer, artifacts.label_encoder),
+        'cascade': DiseaseInferenceEngine.from_label_encoder(cascade, artifacts.vectorizer, artifacts.label_encoder),
+    }
+
+    data = create_training_dataset(args.samples_per_disease, args.seed)
+    texts = data['symptoms'].map(preprocess_symptoms).tolist()
+    expected = data['disease'].tolist()
+    rules = SymptomRuleEngine.from_file()
+    overrides = [rules.match(text) for text in texts]
+    defer = [override is not None for override in overrides]
+    print(f"threshold {cascade.threshold:.3f}, {len(texts)} rows, {np.mean(defer):.1%} with a manual pattern match")
+
+    for engine in engines.values():
+        engine.predict(texts[:10], defer=defer[:10])
+    cascade.fast_rows = cascade.slow_rows = 0
+
+    decisions = {}
+    for name, engine in engines.items():
+        start = time.perf_counter()
+        predictions = engine.predict(texts, defer=defer)
+        batch = time.perf_counter() - start
+        outcomes = [interpret_prediction(p, o, artifacts.disease_to_specialty) for p, o in zip(predictions, overrides)]
+        decisions[name] = [result[0] if result else error['error'] for result, error in outcomes]
+        accuracy = np.mean([d == e for d, e in zip(decisions[name], expected)])
+        print(f"{name:<8} accuracy {accuracy:.2%}   batch {batch * 1000:8.1f} ms")
+    changed = np.mean([a != b for a, b in zip(decisions['forest'], decisions['cascade'])])
+    print(f"fast tier answered {cascade.stats()['fast_fraction']:.1%} of rows, {changed:.2%} of decisions changed")
+
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    single = [texts[i] for i in order]
+    single_defer = [defer[i] for i in order]
+    results = {}
+    for name, engine in engines.items():
+        results[name] = latency_ms(engine, single, single_defer, args.iterations)
+        print(f"single request {name:<8} p50 {results[name][0]:7.3f} ms   p99 {results[name][1]:7.3f} ms")
+    print(f"p50 speedup {results['forest'][0] / results['cascade'][0]:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Check the compiled forest against the sklearn forest and compare their costs
+Probabilities are compared on a freshly generated training dataset; the script fails on any mismatch
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def latency_ms(fn, X, iterations):
+    timings = []
+    for i in range(iterations):
+        row = X[i % X.shape[0]]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(np.array(timings) * 1000, [50, 99])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    from compiled_model import CompiledForest
+
+    if not os.path.exists('disease_model.pkl'):
+        backend.train_model()
+    backend.load_or_train_model()
+
+    forest, pickle_load = timed(lambda: pickle.load(open('disease_model.pkl', 'rb')))
+    compiled = CompiledForest.from_sklearn(forest)
+    npz_path = os.path.join(tempfile.mkdtemp(), 'disease_forest.npz')
+    compiled.save(npz_path)
+    compiled, npz_load = timed(CompiledForest.load, npz_path)
+
+    data = backend.create_training_dataset()
+    X = backend.vectorizer.transform(data['symptoms'].map(backend.preprocess_symptoms))
+
+    expected, sklearn_batch = timed(forest.predict_proba, X)
+    actual, compiled_batch = timed(compiled.predict_proba, X)
+    max_diff = float(np.abs(expected - actual).max())
+    argmax_agree = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    print(f"rows checked:        {X.shape[0]}")
+    print(f"bit-identical:       {np.array_equal(expected, actual)}  (max abs diff {max_diff:.3g})")
+    print(f"argmax agreement:    {argmax_agree:.2%}")
+    assert max_diff <= 1e-12 and argmax_agree == 1.0
+
+    print(f"artifact size:       pickle {os.path.getsize('disease_model.pkl') / 1e6:.1f} MB, "
+          f"npz {os.path.getsize(npz_path) / 1e6:.1f} MB")
+    print(f"load time:           pickle {pickle_load * 1000:.0f} ms, npz {npz_load * 1000:.0f} ms")
+    print(f"batch ({X.shape[0]} rows):  sklearn {sklearn_batch:.2f}s, compiled {compiled_batch:.2f}s")
+
+    for name, fn in (('sklearn', forest.predict_proba), ('compiled', compiled.predict_proba)):
+        fn(X[0])
+        p50, p99 = latency_ms(fn, X, args.iterations)
+        print(f"single row {name:<9} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+if __name__ == '__main__':
+    main()
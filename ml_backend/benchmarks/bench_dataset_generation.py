@@ -0,0 +1,61 @@
+"""
+Time the vectorized training dataset generator against the original per-row loop
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from training_data import (CONNECTORS, DISEASE_DATA, PREFIXES, SUFFIXES,  # noqa: E402
+                           create_training_dataset, write_training_dataset)
+
+def legacy_dataset(samples_per_disease):
+    """The original nested-loop generator"""
+    training_data = []
+    for disease, info in DISEASE_DATA.items():
+        symptoms_list = info['symptoms']
+        for _ in range(samples_per_disease):
+            num_symptoms = np.random.randint(2, min(8, len(symptoms_list) + 1))
+            selected_symptoms = np.random.choice(symptoms_list, num_symptoms, replace=False)
+            symptom_text = ''
+            for i, symptom in enumerate(selected_symptoms):
+                symptom_text = symptom if i == 0 else symptom_text + np.random.choice(CONNECTORS) + symptom
+            final_text = np.random.choice(PREFIXES) + symptom_text + np.random.choice(SUFFIXES)
+            training_data.append({'symptoms': final_text.strip(), 'disease': disease,
+                                  'specialty': info['specialty']})
+    return pd.DataFrame(training_data)
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20000])
+    parser.add_argument('--legacy-max', type=int, default=2000,
+                        help='Skip the legacy loop above this many samples per disease')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        data, vectorized = timed(create_training_dataset, size, seed=0)
+        line = f"{size:>7} per disease ({len(data):>9,} rows): vectorized {vectorized:7.2f}s"
+        if size <= args.legacy_max:
+            _, legacy = timed(legacy_dataset, size)
+            line += f"   legacy {legacy:7.2f}s   speedup {legacy / vectorized:5.1f}x"
+        print(line)
+
+    path = os.path.join(tempfile.mkdtemp(), 'symptoms.csv')
+    rows, streamed = timed(write_training_dataset, path, args.sizes[-1], seed=0)
+    print(f"streamed {rows:,} rows to CSV in {streamed:.2f}s ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+if __name__ == '__main__':
+    main()
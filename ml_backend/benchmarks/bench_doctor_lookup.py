@@ -0,0 +1,70 @@
+"""
+Measure doctor directory lookup latency against the original mock generator
+Seeds a synthetic directory (1M doctors by default) unless --db points at an existing one
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+from app import get_mock_doctors  # noqa: E402
+from doctor_directory import DoctorDirectory  # noqa: E402
+from seed_doctors import LOCATIONS, seed_directory, specialties  # noqa: E402
+
+def latencies(fn, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(*query)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+def report(name, samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    print(f"{name:<28} p50 {p50:7.3f} ms   p95 {p95:7.3f} ms   p99 {p99:7.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--db', default=None, help='Existing directory to query')
+    parser.add_argument('--doctors', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    path = args.db
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'doctors.db')
+        start = time.perf_counter()
+        seed_directory(path, args.doctors, seed=0)
+        print(f"seeded {args.doctors:,} doctors in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(path) / 1e6:.0f} MB)")
+    directory = DoctorDirectory(path)
+
+    rng = np.random.default_rng(0)
+    cities = [(state, city) for state, names in LOCATIONS.items() for city in names]
+    specialty_names = specialties()
+    queries = []
+    for _ in range(args.queries):
+        state, city = cities[rng.integers(len(cities))]
+        queries.append((specialty_names[rng.integers(len(specialty_names))], state, city))
+
+    report('mock generator (10)', latencies(get_mock_doctors, queries))
+    report('directory top 10', latencies(lambda *q: directory.search(*q, limit=10), queries))
+    report('directory top 10 available', latencies(lambda *q: directory.search(*q, limit=10, available=True), queries))
+
+    # Follow next_cursor 20 pages deep: every page is a fresh index seek
+    def deep_page(*query):
+        cursor = None
+        for _ in range(20):
+            _, cursor = directory.search(*query, limit=10, cursor=cursor)
+    report('directory page 20 (cursor)', latencies(deep_page, queries[:200]) / 20)
+
+if __name__ == '__main__':
+    main()
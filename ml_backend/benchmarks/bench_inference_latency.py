@@ -0,0 +1,69 @@
+"""
+Micro-benchmark of single-request inference latency
+Compares the legacy path (predict + predict_proba + per-index inverse_transform)
+with DiseaseInferenceEngine (one predict_proba, precomputed class names)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SAMPLE_SYMPTOMS = [
+    'fever headache body pain',
+    'cough cold sore throat',
+    'stomach pain nausea vomiting',
+    'itchy skin red rash dry skin',
+    'memory loss confusion mood changes',
+]
+
+def legacy_predict(backend, text):
+    symptoms_vectorized = backend.vectorizer.transform([text])
+    prediction = backend.model.predict(symptoms_vectorized)[0]
+    probabilities = backend.model.predict_proba(symptoms_vectorized)[0]
+    confidence = float(probabilities[prediction])
+    top_3_indices = np.argsort(probabilities)[-3:][::-1]
+    top_3 = [(backend.label_encoder.inverse_transform([idx])[0], probabilities[idx]) for idx in top_3_indices]
+    disease = backend.label_encoder.inverse_transform([prediction])[0]
+    return disease, confidence, top_3
+
+def engine_predict(backend, text):
+    return backend.inference_engine.predict_one(text)
+
+def measure(fn, backend, iterations):
+    timings = []
+    for i in range(iterations):
+        text = SAMPLE_SYMPTOMS[i % len(SAMPLE_SYMPTOMS)]
+        start = time.perf_counter()
+        fn(backend, text)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1000
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    backend.load_or_train_model()
+
+    # Both paths must agree on the label before their timings are comparable
+    for text in SAMPLE_SYMPTOMS:
+        legacy = legacy_predict(backend, text)
+        engine = engine_predict(backend, text)
+        assert legacy[0] == engine.disease and np.isclose(legacy[1], engine.confidence), text
+
+    for name, fn in (('legacy', legacy_predict), ('engine', engine_predict)):
+        fn(backend, SAMPLE_SYMPTOMS[0])
+        p50, p99 = measure(fn, backend, args.iterations)
+        print(f"{name:<8} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Cost of the stage instrumentation in metrics.py
+Times the /api/predict pipeline functions with metrics disabled, with histograms
+and with histograms plus Server-Timing, and the bare cost of one disabled stage
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+from metrics import StageMetrics  # noqa: E402
+
+SAMPLE_SYMPTOMS = [
+    'fever headache body pain',
+    'cough cold sore throat',
+    'stomach pain nausea vomiting',
+    'itchy skin red rash dry skin',
+    'memory loss confusion mood changes',
+]
+
+def predict_pipeline(backend, text):
+    """What predict_disease() does per request, minus Flask"""
+    if backend.metrics.enabled:
+        backend.metrics.begin_request()
+    processed, error = backend.check_prediction_input(text, 'Delhi', 'New Delhi')
+    result, error = backend.predict_with_cache([(text, processed)])[0]
+    if result:
+        backend.get_doctors(result[2], 'Delhi', 'New Delhi')
+    if backend.metrics.enabled:
+        backend.metrics.end_request()
+
+def measure(backend, iterations):
+    samples = []
+    for i in range(iterations):
+        # Unique texts so every call runs the model instead of hitting the prediction cache
+        text = f'{SAMPLE_SYMPTOMS[i % len(SAMPLE_SYMPTOMS)]} {i}'
+        start = time.perf_counter()
+        predict_pipeline(backend, text)
+        samples.append(time.perf_counter() - start)
+    return np.array(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    import app as backend
+    backend.load_or_train_model()
+
+    configs = [('disabled', StageMetrics()),
+               ('histograms', StageMetrics(enabled=True)),
+               ('histograms + Server-Timing', StageMetrics(enabled=True, server_timing=True))]
+    results = {name: [] for name, _ in configs}
+    # Interleave the configurations so drift in machine load hits all of them alike
+    for _ in range(args.rounds):
+        for name, metrics in configs:
+            backend.metrics = metrics
+            backend.inference_engine.stage = metrics.stage
+            backend.prediction_cache.clear()
+            results[name].append(measure(backend, args.iterations))
+
+    for name, runs in results.items():
+        samples = np.concatenate(runs)
+        p50, p99 = np.percentile(samples, [50, 99])
+        print(f"{name:<28} mean {samples.mean():7.3f} ms   p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+
+    disabled = StageMetrics()
+    start = time.perf_counter()
+    for _ in range(1_000_000):
+        with disabled.stage('vectorize'):
+            pass
+    # 1M iterations: elapsed ms * 1000 is ns per iteration, loop overhead included
+    print(f"one disabled stage: {(time.perf_counter() - start) * 1000:.0f} ns")
+
+if __name__ == '__main__':
+    main()
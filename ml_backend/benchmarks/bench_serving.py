@@ -0,0 +1,120 @@
+"""
+/api/predict throughput of the Flask dev server (python app.py) against the
+gunicorn prefork mode (gunicorn -c gunicorn.conf.py app:app)
+
+Each server is started from the backend directory and driven by client processes
+posting distinct symptom texts, so every request misses the prediction cache.
+Run it on the box you deploy to: the gain comes from using every core.
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from seed_doctors import LOCATIONS  # noqa: E402
+
+def symptom_texts(count, seed):
+    with open(os.path.join(BACKEND_DIR, 'symptom_keywords.json'), 'r') as f:
+        keywords = sorted(word for word in json.load(f) if len(word) > 3)
+    rng = random.Random(seed)
+    return [' '.join(rng.sample(keywords, rng.randint(3, 6))) for _ in range(count)]
+
+def start_server(mode, port, workers, threads):
+    env = dict(os.environ)
+    if mode == 'dev':
+        # app.py always listens on port 5000
+        command = [sys.executable, 'app.py']
+    else:
+        env.update(ML_BIND=f'127.0.0.1:{port}', ML_WORKERS=str(workers), ML_THREADS=str(threads))
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning', 'app:app']
+    # Own process group: the dev server's reloader and gunicorn's workers are stopped with it
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    url = f'http://127.0.0.1:{5000 if mode == "dev" else port}'
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f'{url}/api/health/ready', timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{mode} server did not become ready")
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+def client_process(url, threads, duration, seed):
+    """Latencies (seconds) and error count of threads closed-loop clients"""
+    texts = symptom_texts(20000, seed)
+    state, cities = next(iter(LOCATIONS.items()))
+    deadline = time.monotonic() + duration
+
+    def run(i):
+        session = requests.Session()
+        samples, errors, n = [], 0, i
+        while time.monotonic() < deadline:
+            body = {'symptoms': texts[n % len(texts)], 'state': state, 'city': cities[0]}
+            n += threads
+            start = time.perf_counter()
+            response = session.post(f'{url}/api/predict', json=body)
+            samples.append(time.perf_counter() - start)
+            # 400 is a valid answer for texts the model is unsure about
+            errors += response.status_code not in (200, 400)
+        return samples, errors
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(run, range(threads)))
+    return [s for samples, _ in results for s in samples], sum(errors for _, errors in results)
+
+def drive(url, clients, processes, duration):
+    per_process = max(1, clients // processes)
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(client_process, [(url, per_process, duration, seed) for seed in range(processes)])
+    samples = np.array([s for latencies, _ in results for s in latencies]) * 1000
+    return samples, sum(errors for _, errors in results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--modes', nargs='+', choices=['dev', 'prefork'], default=['dev', 'prefork'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=2)
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent closed-loop clients')
+    parser.add_argument('--client-processes', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=15.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.clients} clients, {args.duration:.0f}s per mode")
+    for mode in args.modes:
+        process, url = start_server(mode, args.port, args.workers, args.threads)
+        try:
+            drive(url, args.clients, args.client_processes, 2)  # warm up
+            samples, errors = drive(url, args.clients, args.client_processes, args.duration)
+        finally:
+            stop_server(process)
+        name = 'dev server' if mode == 'dev' else f'prefork {args.workers}x{args.threads}'
+        p50, p99 = np.percentile(samples, [50, 99])
+        print(f"{name:<16} {len(samples) / args.duration:8.0f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms"
+              f"   {errors} errors")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Check CompiledTfidfVectorizer against TfidfVectorizer and compare their transform() costs
+Both are built from the published artifacts; the script fails unless every batch is bit-identical
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+def identical(expected, actual):
+    return (type(expected) is type(actual) and expected.shape == actual.shape
+            and np.array_equal(expected.indptr, actual.indptr) and np.array_equal(expected.indices, actual.indices)
+            and expected.data.tobytes() == actual.data.tobytes())
+
+def latency_ms(fn, texts, size, iterations):
+    timings = []
+    for i in range(iterations):
+        start_row = (i * size) % max(1, len(texts) - size)
+        batch = texts[start_row:start_row + size]
+        start = time.perf_counter()
+        fn(batch)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(np.array(timings) * 1000, [50, 99])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(BACKEND_DIR)
+    import app as backend
+    from artifacts import load_artifacts
+    from compiled_vectorizer import CompiledTfidfVectorizer
+    from train_pipeline import ARTIFACT_DIR
+
+    backend.load_or_train_model()
+    artifacts = load_artifacts(ARTIFACT_DIR)
+    compiled = artifacts.vectorizer
+    if not isinstance(compiled, CompiledTfidfVectorizer):
+        sys.exit(f"Published vectorizer is a {type(compiled).__name__}, nothing to compare")
+    params = dict(artifacts.manifest['vectorizer']['params'])
+    params['ngram_range'] = tuple(params['ngram_range'])
+    reference = TfidfVectorizer(**params)
+    reference.vocabulary_ = compiled.vocabulary_
+    reference.idf_ = compiled.idf_
+
+    data = backend.create_training_dataset()
+    texts = data['symptoms'].map(backend.preprocess_symptoms).tolist()
+    texts += ['', 'xyz', 'fever fever fever fever', data['symptoms'].iloc[0].upper()]
+    for size in sorted(set(args.sizes + [len(texts)])):
+        for start_row in range(0, len(texts), max(size, len(texts) // 50)):
+            batch = texts[start_row:start_row + size]
+            assert identical(reference.transform(batch), compiled.transform(batch)), (size, start_row)
+    print(f"bit-identical:       {len(texts)} texts, batch sizes {sorted(set(args.sizes))} and all at once")
+
+    for size in args.sizes:
+        iterations = max(5, args.iterations // max(1, size // 10))
+        results = [latency_ms(vectorizer.transform, texts, size, iterations) for vectorizer in (reference, compiled)]
+        (sk50, sk99), (c50, c99) = results
+        print(f"{size:>5} rows  sklearn p50 {sk50:7.3f} ms  p99 {sk99:7.3f} ms   "
+              f"compiled p50 {c50:7.3f} ms  p99 {c99:7.3f} ms   {sk50 / c50:5.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+"""
+Load test of /api/predict with a configurable mix of inputs, JSON report for comparing commits
+
+    python benchmarks/load_test.py --concurrency 1 8 32 --output load.json
+    python benchmarks/load_test.py --rate 50 100 200 --server prefork
+    python benchmarks/load_test.py --url http://staging:5000 --concurrency 16
+    python benchmarks/load_test.py --concurrency 8 --compare load.json
+
+Input kinds (--mix kind=weight,...):
+    valid           2-4 symptoms of one disease from training_data.DISEASE_DATA, phrased like users do
+    manual_pattern  texts that fire a rule in symptom_rules.json
+    low_confidence  made-up words the vectorizer does not know
+    empty           empty or whitespace-only symptoms
+Generated texts are unique per request, so the prediction cache does not hide model cost.
+
+--concurrency runs closed-loop clients (each sends its next request when the last one
+answered). --rate runs open-loop Poisson arrivals: latency is measured from the scheduled
+send time, so a server falling behind shows up in the percentiles instead of slowing the
+load down. An answer counts as an error when the request failed, the status was 5xx or
+the status is not one the input kind allows.
+"""
+
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_serving import start_server, stop_server  # noqa: E402
+from training_data import CONNECTORS, DISEASE_DATA, PREFIXES, SUFFIXES  # noqa: E402
+
+DEFAULT_MIX = {'valid': 70, 'manual_pattern': 15, 'low_confidence': 10, 'empty': 5}
+# Statuses each input kind may legitimately get
+EXPECTED_STATUSES = {
+    'valid': {200, 400},  # 400 low_confidence for vague combinations
+    'manual_pattern': {200},
+    'low_confidence': {400},
+    'empty': {400},
+}
+MANUAL_PATTERNS = [
+    'cold, runny nose, sneezing',
+    'stuffy nose and congestion',
+    'fever, headache, body pain',
+    'chills and fatigue with headache',
+    'chest pain, shortness of breath',
+    'breathing difficulty',
+    'stomach pain, nausea, vomiting',
+]
+LOCATIONS = [('Delhi', 'New Delhi'), ('Maharashtra', 'Mumbai'), ('Karnataka', 'Bangalore')]
+# Upper bounds of the latency histogram buckets in ms, the last bucket is open
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in EXPECTED_STATUSES:
+            raise argparse.ArgumentTypeError(f"unknown input kind {kind!r}, choose from {sorted(EXPECTED_STATUSES)}")
+        mix[kind] = float(weight)
+    return mix
+
+class InputGenerator:
+    """Draws (kind, request body) pairs following a mix of input kinds"""
+
+    def __init__(self, mix, seed=0):
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.rng = random.Random(seed)
+        self.diseases = list(DISEASE_DATA.values())
+        self.lock = threading.Lock()
+
+    def _phrase(self, symptoms):
+        rng = self.rng
+        text = symptoms[0]
+        for symptom in symptoms[1:]:
+            text += rng.choice(CONNECTORS) + symptom
+        # The number only makes the cache key unique, digits carry no symptom weight
+        return rng.choice(PREFIXES) + text + rng.choice(SUFFIXES) + f' {rng.randrange(10 ** 6)} days'
+
+    def _text(self, kind):
+        rng = self.rng
+        if kind == 'valid':
+            symptoms = rng.choice(self.diseases)['symptoms']
+            return self._phrase(rng.sample(symptoms, min(len(symptoms), rng.randint(2, 4))))
+        if kind == 'manual_pattern':
+            return f'{rng.choice(MANUAL_PATTERNS)} for {rng.randrange(10 ** 6)} hours'
+        if kind == 'low_confidence':
+            return ' '.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+                            for _ in range(rng.randint(2, 4)))
+        return rng.choice(['', ' ', '\n'])
+
+    def next(self):
+        with self.lock:
+            kind = self.rng.choices(self.kinds, self.weights)[0]
+            state, city = self.rng.choice(LOCATIONS)
+            return kind, {'symptoms': self._text(kind), 'state': state, 'city': city}
+
+class Recorder:
+    """Thread-safe collection of (kind, latency seconds, status or error name)"""
+
+    def __init__(self):
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def add(self, kind, latency, outcome):
+        with self.lock:
+            self.samples.append((kind, latency, outcome))
+
+def send(session, url, kind, body, recorder, started):
+    try:
+        response = session.post(f'{url}/api/predict', json=body, timeout=30)
+        outcome = response.status_code
+    except requests.RequestException as e:
+        outcome = type(e).__name__
+    recorder.add(kind, time.perf_counter() - started, outcome)
+
+def run_closed_loop(url, generator, concurrency, duration):
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            kind, body = generator.next()
+            send(session, url, kind, body, recorder, time.perf_counter())
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return recorder.samples
+
+def run_open_loop(url, generator, rate, duration, max_inflight, seed=0):
+    """Poisson arrivals at rate per second; threads pick the next scheduled request"""
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1 / rate, size=int(rate * duration * 1.2) + 10))
+    arrivals = arrivals[arrivals < duration]
+    recorder = Recorder()
+    position = iter(range(len(arrivals)))
+    position_lock = threading.Lock()
+    start = time.perf_counter()
+
+    def client():
+        session = requests.Session()
+        while True:
+            with position_lock:
+                i = next(position, None)
+            if i is None:
+                return
+            scheduled = start + arrivals[i]
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            kind, body = generator.next()
+            # Measured from the schedule: waiting for a free client thread counts as latency
+            send(session, url, kind, body, recorder, scheduled)
+
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        for future in [pool.submit(client) for _ in range(max_inflight)]:
+            future.result()
+    return recorder.samples
+
+def latency_summary(latencies_ms):
+    if len(latencies_ms) == 0:
+        return {}
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3),
+            'mean': round(float(latencies_ms.mean()), 3), 'max': round(float(latencies_ms.max()), 3)}
+
+def summarize(samples, elapsed):
+    kinds = np.array([kind for kind, _, _ in samples], dtype=object)
+    latencies = np.array([latency for _, latency, _ in samples]) * 1000
+    outcomes = [outcome for _, _, outcome in samples]
+    errors = np.array([not (isinstance(outcome, int) and outcome in EXPECTED_STATUSES[kind])
+                       for kind, _, outcome in samples], dtype=bool)
+
+    counts, _ = np.histogram(latencies, bins=[0] + HISTOGRAM_BOUNDS_MS + [np.inf])
+    by_kind = {}
+    for kind in sorted(set(kinds)):
+        mask = kinds == kind
+        by_kind[kind] = {
+            'requests': int(mask.sum()),
+            'error_rate': round(float(errors[mask].mean()), 5),
+            'outcomes': {str(k): v for k, v in Counter(o for o, m in zip(outcomes, mask) if m).items()},
+            'latency_ms': latency_summary(latencies[mask]),
+        }
+    return {
+        'requests': len(samples),
+        'duration_s': round(elapsed, 3),
+        'rps': round(len(samples) / elapsed, 2),
+        'error_rate': round(float(errors.mean()), 5) if len(samples) else 0.0,
+        'outcomes': {str(k): v for k, v in Counter(outcomes).items()},
+        'latency_ms': latency_summary(latencies),
+        'histogram': {'bounds_ms': HISTOGRAM_BOUNDS_MS, 'counts': counts.tolist()},
+        'by_kind': by_kind,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_key(run):
+    return (run['mode'], run.get('concurrency', run.get('rate')))
+
+def compare(report, baseline_path, tolerance):
+    """Print changes against a previous report, returns False when a run regressed beyond tolerance"""
+    with open(baseline_path, 'r') as f:
+        baseline = {run_key(run): run for run in json.load(f)['runs']}
+    ok = True
+    print(f"compared with {baseline_path}")
+    for run in report['runs']:
+        old = baseline.get(run_key(run))
+        if old is None:
+            continue
+        rps = run['rps'] / old['rps'] - 1
+        p99 = run['latency_ms']['p99'] / old['latency_ms']['p99'] - 1
+        regressed = rps < -tolerance or p99 > tolerance or run['error_rate'] > old['error_rate']
+        ok &= not regressed
+        print(f"  {run['mode']} {run_key(run)[1]:>6}: req/s {rps:+7.1%}   p99 {p99:+7.1%}   "
+              f"errors {old['error_rate']:.3%} -> {run['error_rate']:.3%}{'   REGRESSION' if regressed else ''}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Test a running server instead of starting one')
+    parser.add_argument('--server', choices=['dev', 'prefork'], default='dev', help='Server to start')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='--server prefork workers')
+    parser.add_argument('--threads', type=int, default=2, help='--server prefork threads per worker')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--concurrency', type=int, nargs='*', default=[], help='Closed-loop client counts')
+    parser.add_argument('--rate', type=float, nargs='*', default=[], help='Open-loop arrivals per second')
+    parser.add_argument('--max-inflight', type=int, default=64, help='Client threads for --rate runs')
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds per run')
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Input kind weights, e.g. valid=70,manual_pattern=15,low_confidence=10,empty=5')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Relative req/s drop or p99 rise that counts as a regression')
+    args = parser.parse_args()
+    if not args.concurrency and not args.rate:
+        args.concurrency = [1, 8, 32]
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.server, args.port, args.workers, args.threads)
+    generator = InputGenerator(args.mix, args.seed)
+    runs = []
+    try:
+        run_closed_loop(url, generator, 4, args.warmup)
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            samples = run_closed_loop(url, generator, concurrency, args.duration)
+            runs.append(dict(mode='closed', concurrency=concurrency, **summarize(samples, time.perf_counter() - start)))
+            print(f"closed x{concurrency}: {runs[-1]['rps']} req/s, p99 {runs[-1]['latency_ms'].get('p99')} ms",
+                  file=sys.stderr)
+        for rate in args.rate:
+            samples = run_open_loop(url, generator, rate, args.duration, args.max_inflight, args.seed)
+            runs.append(dict(mode='open', rate=rate, **summarize(samples, args.duration)))
+            print(f"open {rate}/s: {runs[-1]['rps']} req/s, p99 {runs[-1]['latency_ms'].get('p99')} ms",
+                  file=sys.stderr)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'server': 'external' if args.url else args.server,
+            'url': url,
+            'workers': args.workers if args.server == 'prefork' and not args.url else None,
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'mix': args.mix,
+            'duration_s': args.duration,
+        },
+        'runs': runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare and not compare(report, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Array-backed inference models compiled from fitted sklearn estimators
+A CompiledForest holds every tree of a RandomForestClassifier in flat NumPy arrays
+and predicts with a batched pure-NumPy traversal
+"""
+
+import threading
+
+import numpy as np
+
+# Rows per traversal chunk are chosen so the (rows, trees, classes) leaf gather stays near this size
+_CHUNK_BYTES = 16 * 1024 * 1024
+
+class CompiledForest:
+    """
+    Flattened RandomForestClassifier
+
+    All trees share one node index space and leaves point to themselves.
+    Leaf class distributions are deduplicated: leaf_index maps a leaf node to a row of
+    leaf_values and is -1 for split nodes.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'children_left', 'children_right', 'leaf_index', 'leaf_values', 'roots', 'classes')
+    # Derived from ARRAYS; stored with the artifacts so workers map them instead of rebuilding them
+    TRAVERSAL_ARRAYS = ('children', 'is_leaf')
+
+    def __init__(self, feature, threshold, children_left, children_right, leaf_index, leaf_values,
+                 roots, classes, n_features, max_depth, children=None, is_leaf=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.leaf_index = leaf_index
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.classes = classes
+        self.n_features = int(n_features)
+        self.max_depth = int(max_depth)
+        # Traversal helpers: child of node i is children[2 * i + went_left]
+        self.children = np.stack([children_right, children_left], axis=1).ravel() if children is None else children
+        self.is_leaf = leaf_index >= 0 if is_leaf is None else is_leaf
+
+    @property
+    def classes_(self):
+        return self.classes
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def node_count(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Compile a fitted RandomForestClassifier (single output)"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        n_classes = len(forest.classes_)
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            left = np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32)
+
+            # sklearn >= 1.4 stores class fractions and returns them as-is,
+            # older releases store weighted counts and normalize in predict_proba
+            proba = tree.value[:, 0, :n_classes].copy()
+            if not np.allclose(proba.sum(axis=1), 1.0):
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+
+            features.append(feature)
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(left)
+            rights.append(right)
+            values.append(proba[is_leaf])
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature = np.concatenate(features)
+        children_left = np.concatenate(lefts)
+        is_leaf = children_left == np.arange(len(children_left))
+
+        leaf_values, inverse = np.unique(np.concatenate(values), axis=0, return_inverse=True)
+        leaf_index = np.full(len(feature), -1, dtype=np.int32)
+        leaf_index[is_leaf] = inverse.reshape(-1)
+
+        return cls(
+            feature=feature,
+            threshold=np.concatenate(thresholds),
+            children_left=children_left,
+            children_right=np.concatenate(rights),
+            leaf_index=leaf_index,
+            leaf_values=np.ascontiguousarray(leaf_values, dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            n_features=forest.n_features_in_,
+            max_depth=max_depth,
+        )
+
+    def _as_dense(self, X):
+        # sklearn trees compare float32 feature values against float64 thresholds
+        if hasattr(X, 'toarray'):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} features, got shape {X.shape}")
+        return X
+
+    def apply(self, X):
+        """Leaf node id reached in every tree, shape (n_samples, n_estimators)"""
+        X = self._as_dense(X)
+        n_samples, n_trees = X.shape[0], len(self.roots)
+        leaves = np.empty(n_samples * n_trees, dtype=np.int32)
+        X_flat = X.ravel()
+
+        # Walk all (sample, tree) pairs one level per step and drop the pairs that reached a leaf
+        node = np.tile(self.roots, n_samples)
+        row_offset = np.repeat(np.arange(n_samples, dtype=np.int64) * X.shape[1], n_trees)
+        position = np.arange(n_samples * n_trees)
+        while node.size:
+            done = self.is_leaf[node]
+            leaves[position[done]] = node[done]
+            pending = ~done
+            node, row_offset, position = node[pending], row_offset[pending], position[pending]
+
+            went_left = X_flat[row_offset + self.feature[node]] <= self.threshold[node]
+            node = self.children[2 * node + went_left]
+        return leaves.reshape(n_samples, n_trees)
+
+    def predict_proba(self, X):
+        """Mean of per-tree leaf distributions, identical to RandomForestClassifier.predict_proba"""
+        X = self._as_dense(X)
+        n_samples = X.shape[0]
+        n_trees, n_classes = len(self.roots), self.leaf_values.shape[1]
+        proba = np.empty((n_samples, n_classes), dtype=np.float64)
+
+        chunk = max(1, _CHUNK_BYTES // (n_trees * n_classes * 8))
+        for start in range(0, n_samples, chunk):
+            leaf_rows = self.leaf_index[self.apply(X[start:start + chunk])]
+            # Reducing over the leading tree axis adds one tree at a time, in the same order
+            # RandomForestClassifier accumulates them, so the sums match bit for bit
+            proba[start:start + chunk] = self.leaf_values[leaf_rows.T].sum(axis=0)
+        proba /= n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path):
+        """Write all node arrays to a single uncompressed .npz file"""
+        np.savez(
+            path,
+            n_features=self.n_features,
+            max_depth=self.max_depth,
+            **{name: getattr(self, name) for name in self.ARRAYS}
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in cls.ARRAYS}
+            return cls(n_features=int(data['n_features']), max_depth=int(data['max_depth']), **arrays)
+
+class CompiledLinearModel:
+    """
+    Linear classifier as plain coefficient arrays
+    link='softmax' matches multinomial LogisticRegression, link='ovr' matches one-vs-rest
+    log-loss models such as SGDClassifier(loss='log_loss')
+    """
+
+    ARRAYS = ('coef', 'intercept', 'classes')
+    LINKS = ('softmax', 'ovr')
+
+    def __init__(self, coef, intercept, classes, link='softmax'):
+        if link not in self.LINKS:
+            raise ValueError(f"Unknown link {link!r}, expected one of {self.LINKS}")
+        self.coef = coef
+        self.intercept = intercept
+        self.classes = classes
+        self.link = link
+
+    @property
+    def classes_(self):
+        return self.classes
+
+    @property
+    def n_features(self):
+        return self.coef.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, estimator, classes=None):
+        """
+        Compile a fitted multi-class linear classifier: LogisticRegression, SGDClassifier(loss='log_loss')
+        or a OneVsRestClassifier of either; other losses have no probabilistic link and are rejected
+        classes overrides estimator.classes_, e.g. encoded labels for string classes
+        """
+        if len(estimator.classes_) < 3:
+            raise ValueError("Only multi-class linear models can be compiled")
+        if hasattr(estimator, 'estimators_') and not hasattr(estimator, 'coef_'):
+            # OneVsRestClassifier: one binary model per class, sigmoids normalized like 'ovr'
+            for binary in estimator.estimators_:
+                if cls._link(binary) is None:
+                    raise ValueError(f"Cannot compile a one-vs-rest {type(binary).__name__}")
+            coef = np.vstack([binary.coef_ for binary in estimator.estimators_])
+            intercept = np.concatenate([binary.intercept_ for binary in estimator.estimators_])
+            link = 'ovr'
+        else:
+            link = cls._link(estimator)
+            if link is None:
+                raise ValueError(f"{type(estimator).__name__} with these settings has no probabilistic link")
+            coef, intercept = estimator.coef_, estimator.intercept_
+        return cls(
+            coef=np.ascontiguousarray(coef, dtype=np.float64),
+            intercept=np.asarray(intercept, dtype=np.float64),
+            classes=np.asarray(estimator.classes_ if classes is None else classes),
+            link=link,
+        )
+
+    @staticmethod
+    def _link(estimator):
+        """Link of sklearn's predict_proba for a multi-class estimator (sigmoid for binary ones), or None"""
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+        if isinstance(estimator, LogisticRegression):
+            # multi_class was removed in sklearn 1.8; before, 'auto' meant one-vs-rest for liblinear
+            multi_class = getattr(estimator, 'multi_class', 'multinomial')
+            if multi_class == 'ovr' or (multi_class in ('auto', 'deprecated') and estimator.solver == 'liblinear'):
+                return 'ovr'
+            return 'softmax'
+        if isinstance(estimator, SGDClassifier) and estimator.loss in ('log_loss', 'log'):
+            return 'ovr'
+        return None
+
+    def decision_function(self, X):
+        scores = X @ self.coef.T
+        return np.asarray(scores, dtype=np.float64) + self.intercept
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if self.link == 'softmax':
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            # Same normalization of per-class sigmoids as sklearn's one-vs-rest predict_proba
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.decision_function(X), axis=1)]
+
+class CascadeModel:
+    """
+    Two-tier classifier: the fast model answers the rows whose best class probability
+    reaches threshold, only the remaining (and deferred) rows are passed to the slow model
+    Both tiers take the same features and share classes
+    """
+
+    def __init__(self, fast, slow, threshold):
+        if not np.array_equal(np.asarray(fast.classes_), np.asarray(slow.classes_)):
+            raise ValueError("Cascade tiers must have the same classes")
+        self.fast = fast
+        self.slow = slow
+        self.threshold = float(threshold)
+        self.fast_rows = 0
+        self.slow_rows = 0
+        self._lock = threading.Lock()
+
+    @property
+    def classes_(self):
+        return self.slow.classes_
+
+    @property
+    def n_features(self):
+        return self.slow.n_features
+
+    def predict_proba(self, X, defer=None):
+        """defer: optional per-row flags of rows the slow model must answer regardless"""
+        proba = self.fast.predict_proba(X)
+        uncertain = proba.max(axis=1) < self.threshold
+        if defer is not None:
+            uncertain |= np.asarray(defer, dtype=bool)
+        uncertain = np.flatnonzero(uncertain)
+        if len(uncertain):
+            proba[uncertain] = self.slow.predict_proba(X[uncertain])
+        with self._lock:
+            self.fast_rows += proba.shape[0] - len(uncertain)
+            self.slow_rows += len(uncertain)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def stats(self):
+        """Rows answered by each tier since the model was loaded"""
+        with self._lock:
+            rows = self.fast_rows + self.slow_rows
+            return {
+                'threshold': self.threshold,
+                'fast_rows': self.fast_rows,
+                'slow_rows': self.slow_rows,
+                'fast_fraction': round(self.fast_rows / rows, 4) if rows else 0.0
+            }
@@ -0,0 +1,264 @@
+"""
+TF-IDF transform for short symptom strings without the sklearn machinery
+A CompiledTfidfVectorizer is built from the vocabulary and idf weights stored in the
+model artifacts and reproduces TfidfVectorizer.transform bit for bit for the word
+analyzer: one precompiled token regex, 1..n-gram strings looked up in a plain dict,
+sublinear TF from a precomputed table, idf weights, row norm and a directly built CSR.
+
+Single documents go through a short pure-Python loop. Batches map tokens to word ids
+once and look all n-grams up at the same time as integer keys in NumPy. Both paths
+accumulate row norms one value at a time in column order, like sklearn's normalizers,
+so the floating point results are identical and not just close.
+"""
+
+import math
+import re
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# Largest term count served from the sublinear TF table, larger counts use np.log directly
+_TF_TABLE_SIZE = 256
+# Documents per transform() call from which the NumPy batch path is used
+BATCH_THRESHOLD = 24
+
+# Settings the compiled transform reproduces; anything else stays on TfidfVectorizer
+SUPPORTED = {
+    'input': ('content',),
+    'analyzer': ('word',),
+    'strip_accents': (None,),
+    'norm': ('l2', 'l1', None),
+}
+
+def is_supported(params):
+    """True if a TfidfVectorizer with these get_params() can be compiled"""
+    return all(params.get(key, allowed[0]) in allowed for key, allowed in SUPPORTED.items()) \
+        and params.get('preprocessor') is None and params.get('tokenizer') is None \
+        and np.dtype(params.get('dtype', np.float64)) == np.float64
+
+def _sublinear_tf(counts):
+    # Same calls as TfidfTransformer: np.log in place, then += 1
+    values = np.asarray(counts, dtype=np.float64)
+    np.log(values, values)
+    values += 1.0
+    return values
+
+class CompiledTfidfVectorizer:
+    """Drop-in transform() for a fitted word-analyzer TfidfVectorizer"""
+
+    def __init__(self, vocabulary, idf, ngram_range=(1, 1), lowercase=True, token_pattern=r"(?u)\b\w\w+\b",
+                 stop_words=None, norm='l2', use_idf=True, sublinear_tf=False, binary=False, **params):
+        """
+        vocabulary: {term: column}, idf: weight per column (TfidfVectorizer.vocabulary_, idf_)
+        The remaining arguments are TfidfVectorizer parameters; ones that do not change
+        transform() (max_df, min_df, max_features, smooth_idf, ...) are accepted and ignored
+        """
+        if not is_supported(dict(params, norm=norm)):
+            raise ValueError(f"Unsupported vectorizer settings {params}")
+        self.vocabulary_ = vocabulary
+        self.idf_ = np.asarray(idf, dtype=np.float64)
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.norm = norm
+        self.use_idf = use_idf
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.n_features = len(vocabulary)
+
+        self._token_regex = re.compile(token_pattern)
+        if self._token_regex.groups > 1:
+            raise ValueError("More than 1 capturing group in token pattern")
+        if stop_words == 'english':
+            stop_words = ENGLISH_STOP_WORDS
+        self._stop_words = frozenset(stop_words) if stop_words is not None else None
+        self._idf = self.idf_.tolist()
+        self._tf_table = [0.0] + _sublinear_tf(np.arange(1, _TF_TABLE_SIZE)).tolist() if sublinear_tf else None
+        self._compile_ngrams()
+
+    def _compile_ngrams(self):
+        """
+        Integer keys for the batch path: every word used by a vocabulary term gets an id
+        from 1, an n-gram of ids (a, b, c) becomes ((a * base) + b) * base + c
+        """
+        words = sorted({word for term in self.vocabulary_ for word in term.split(' ')})
+        self._word_ids = {word: i for i, word in enumerate(words, 1)}
+        self._base = len(words) + 1
+        min_n, max_n = self.ngram_range
+        # The key of an n-gram of n words lies in [base**(n-1), base**n), so lengths never collide
+        if self._base ** max_n >= 2 ** 63:
+            self._term_keys = None
+            return
+        keys, columns = [], []
+        for term, column in self.vocabulary_.items():
+            key = 0
+            for word in term.split(' '):
+                key = key * self._base + self._word_ids[word]
+            keys.append(key)
+            columns.append(column)
+        order = np.argsort(keys)
+        self._term_keys = np.asarray(keys, dtype=np.int64)[order]
+        self._term_columns = np.asarray(columns, dtype=np.int64)[order]
+
+    @classmethod
+    def from_sklearn(cls, vectorizer):
+        params = vectorizer.get_params()
+        del params['vocabulary']  # the constructor-time vocabulary, vocabulary_ is the fitted one
+        return cls(vectorizer.vocabulary_, vectorizer.idf_, **params)
+
+    def analyze(self, text):
+        """Term strings of one document in TfidfVectorizer's build_analyzer() order"""
+        tokens = self._tokens(text)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(min_n, 2), min(max_n + 1, n_tokens + 1)):
+            for i in range(n_tokens - n + 1):
+                terms.append(' '.join(tokens[i:i + n]))
+        return terms
+
+    def _row(self, text):
+        """Sorted column indices and final weights of one document"""
+        vocabulary = self.vocabulary_
+        counts = {}
+        for term in self.analyze(text):
+            column = vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = sorted(counts)
+
+        if self.binary:
+            tf = [1.0] * len(columns)
+        elif self._tf_table is not None:
+            table = self._tf_table
+            tf = [table[counts[c]] if counts[c] < _TF_TABLE_SIZE else float(_sublinear_tf([counts[c]])[0])
+                  for c in columns]
+        else:
+            tf = [float(counts[c]) for c in columns]
+
+        if self.use_idf:
+            idf = self._idf
+            weights = [value * idf[c] for value, c in zip(tf, columns)]
+        else:
+            weights = tf
+
+        # Accumulated one value at a time in column order, like sklearn's row normalizers
+        if self.norm == 'l2':
+            total = 0.0
+            for w in weights:
+                total += w * w
+            total = math.sqrt(total)
+        elif self.norm == 'l1':
+            total = 0.0
+            for w in weights:
+                total += abs(w)
+        else:
+            total = 0.0
+        if total != 0.0:
+            weights = [w / total for w in weights]
+        return columns, weights
+
+    def _tokens(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_regex.findall(text)
+        if self._stop_words is not None:
+            tokens = [w for w in tokens if w not in self._stop_words]
+        return tokens
+
+    def _transform_batch(self, documents):
+        """(data, indices, indptr) for many documents at once"""
+        word_ids = self._word_ids
+        ids, lengths = [], []
+        for text in documents:
+            tokens = self._tokens(text)
+            # 0 for words no term uses: every n-gram containing them is out of vocabulary
+            ids.extend([word_ids.get(token, 0) for token in tokens])
+            lengths.append(len(tokens))
+        ids = np.asarray(ids, dtype=np.int64)
+        lengths = np.asarray(lengths, dtype=np.int64)
+        n_docs = len(lengths)
+        doc_of = np.repeat(np.arange(n_docs), lengths)
+        position = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        # Keys of every n-gram that lies inside one document and has no unknown word
+        min_n, max_n = self.ngram_range
+        rows, keys = [], []
+        for n in range(min_n, max_n + 1):
+            starts = np.flatnonzero(position + n <= np.repeat(lengths, lengths)) if len(ids) else ids
+            key = np.zeros(len(starts), dtype=np.int64)
+            known = np.ones(len(starts), dtype=bool)
+            for offset in range(n):
+                word = ids[starts + offset]
+                known &= word > 0
+                key = key * self._base + word
+            rows.append(doc_of[starts[known]])
+            keys.append(key[known])
+        rows, keys = np.concatenate(rows), np.concatenate(keys)
+
+        found = np.searchsorted(self._term_keys, keys)
+        found[found == len(self._term_keys)] = 0
+        hit = self._term_keys[found] == keys
+        pairs = rows[hit] * self.n_features + self._term_columns[found[hit]]
+        pairs, counts = np.unique(pairs, return_counts=True)
+        row = pairs // self.n_features
+        indices = pairs - row * self.n_features
+        nnz = np.bincount(row, minlength=n_docs)
+        indptr = np.concatenate([[0], np.cumsum(nnz)])
+
+        if self.binary:
+            data = np.ones(len(indices), dtype=np.float64)
+        elif self.sublinear_tf:
+            data = _sublinear_tf(counts)
+            small = counts < _TF_TABLE_SIZE
+            data[small] = np.asarray(self._tf_table)[counts[small]]
+        else:
+            data = counts.astype(np.float64)
+        if self.use_idf:
+            data *= self.idf_[indices]
+
+        if self.norm is not None and len(data):
+            # cumsum runs left to right along each padded row, so every row total is the
+            # same sequence of additions as the scalar loop (trailing + 0.0 changes nothing)
+            values = data * data if self.norm == 'l2' else np.abs(data)
+            padded = np.zeros((n_docs, nnz.max()))
+            padded[row, np.arange(len(data)) - indptr[row]] = values
+            totals = np.cumsum(padded, axis=1)[:, -1]
+            if self.norm == 'l2':
+                totals = np.sqrt(totals)
+            totals[totals == 0.0] = 1.0
+            data /= totals[row]
+        return data, indices, indptr
+
+    def transform(self, raw_documents):
+        """CSR matrix of shape (n_documents, n_features) equal to TfidfVectorizer.transform"""
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        if not isinstance(raw_documents, (list, tuple)):
+            raw_documents = list(raw_documents)
+        if len(raw_documents) >= BATCH_THRESHOLD and self._term_keys is not None:
+            data, indices, indptr = self._transform_batch(raw_documents)
+            index_dtype = np.int32 if len(indices) <= np.iinfo(np.int32).max else np.int64
+            X = sp.csr_matrix((data, indices.astype(index_dtype), indptr.astype(index_dtype)),
+                              shape=(len(indptr) - 1, self.n_features))
+            X.has_sorted_indices = True
+            return X
+
+        indices, data, indptr = [], [], [0]
+        for text in raw_documents:
+            columns, weights = self._row(text)
+            indices.extend(columns)
+            data.extend(weights)
+            indptr.append(len(indices))
+
+        index_dtype = np.int32 if indptr[-1] <= np.iinfo(np.int32).max else np.int64
+        X = sp.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=index_dtype),
+             np.array(indptr, dtype=index_dtype)),
+            shape=(len(indptr) - 1, self.n_features)
+        )
+        X.has_sorted_indices = True
+        return X
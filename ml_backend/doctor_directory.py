@@ -0,0 +1,130 @@
+"""
+Doctor directory backed by SQLite
+
+Every doctor carries a precomputed rating_rank, its position in the directory-wide
+(rating DESC, id) order. Lookups go through a composite index on
+(specialty, state, city, rating_rank), so the top-N doctors for a location are read
+straight off the index in rating order: one B-tree descent plus N row reads, whatever
+the size of the directory. Pages after the first continue from the last rank seen
+instead of an OFFSET, which keeps deep pages just as cheap.
+
+Ratings that change must be followed by update_rating_ranks().
+
+Build a directory with seed_doctors.py.
+"""
+
+import os
+import sqlite3
+import threading
+
+DEFAULT_DB_PATH = 'doctors.db'
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS doctors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    state TEXT NOT NULL,
+    city TEXT NOT NULL,
+    rating REAL NOT NULL,
+    rating_rank INTEGER NOT NULL DEFAULT 0,
+    experience INTEGER NOT NULL,
+    hospital TEXT NOT NULL,
+    available INTEGER NOT NULL,
+    consultation_fee INTEGER NOT NULL
+)
+"""
+
+# Created after bulk loading, building an index once is much faster than maintaining it per row
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_doctors_location_rank '
+    'ON doctors (specialty, state, city, rating_rank)',
+    # With the available filter the matching rows are still contiguous and in rating order
+    'CREATE INDEX IF NOT EXISTS idx_doctors_location_available_rank '
+    'ON doctors (specialty, state, city, available, rating_rank)',
+)
+
+COLUMNS = ('id', 'name', 'specialty', 'state', 'city', 'rating', 'experience',
+           'hospital', 'available', 'consultation_fee')
+
+def create_schema(connection):
+    connection.execute(SCHEMA)
+
+def update_rating_ranks(connection):
+    """Recompute rating_rank for every doctor, best rating first and ties by id"""
+    connection.execute("""
+        UPDATE doctors SET rating_rank = ranked.position
+        FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY rating DESC, id) AS position FROM doctors) AS ranked
+        WHERE doctors.id = ranked.id
+    """)
+
+def create_indexes(connection):
+    for statement in INDEXES:
+        connection.execute(statement)
+    connection.execute('ANALYZE')
+
+class DoctorDirectory:
+    """Read-only paginated doctor lookups, safe to share between request threads"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Doctor directory {path} not found, run seed_doctors.py first")
+        self.path = path
+        # sqlite3 connections must not be shared across threads, each thread opens its own
+        self._local = threading.local()
+
+    def _connection(self):
+        # seed_doctors.py moves a rebuilt database over path, an open connection would
+        # keep reading the replaced file: reopen when the file at path changes
+        stat = os.stat(self.path)
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.identity != identity:
+            connection.close()
+            connection = None
+        if connection is None:
+            connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            self._local.connection = connection
+            self._local.identity = identity
+        return connection
+
+    @staticmethod
+    def _to_dict(row):
+        doctor = dict(zip(COLUMNS, row))
+        doctor['location'] = f"{doctor.pop('city')}, {doctor.pop('state')}"
+        doctor['available'] = bool(doctor['available'])
+        return doctor
+
+    def search(self, specialty, state, city, limit=10, available=None, cursor=None):
+        """
+        Doctors of a specialty in a city, best rated first (ties by id)
+        available=True/False keeps only (un)available doctors, None keeps all
+        cursor is the next_cursor of the previous page
+        Returns (doctors, next_cursor), next_cursor is None on the last page
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql = f"SELECT {', '.join(COLUMNS)}, rating_rank FROM doctors WHERE specialty = ? AND state = ? AND city = ?"
+        params = [specialty, state, city]
+        if available is not None:
+            sql += ' AND available = ?'
+            params.append(int(available))
+        if cursor is not None:
+            sql += ' AND rating_rank > ?'
+            params.append(int(cursor))
+        sql += ' ORDER BY rating_rank LIMIT ?'
+        # One extra row tells whether another page exists
+        params.append(limit + 1)
+
+        rows = self._connection().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1][-1])
+        return [self._to_dict(row[:-1]) for row in rows], next_cursor
+
+    def top_doctors(self, specialty, state, city, limit=10):
+        return self.search(specialty, state, city, limit=limit)[0]
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM doctors').fetchone()[0]
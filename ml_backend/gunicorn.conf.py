@@ -0,0 +1,66 @@
+"""
+Production serving for the ml_backend API (Linux/macOS)
+
+    gunicorn -c gunicorn.conf.py app:app
+    ML_WORKERS=8 ML_THREADS=4 gunicorn -c gunicorn.conf.py app:app
+
+The master process imports app.py and loads the model once before any worker is
+forked, so every worker starts ready and shares the loaded objects copy-on-write
+(the forest arrays are memory-mapped and shared through the page cache anyway).
+gc.freeze() moves everything loaded so far out of the collector's reach, so a
+worker's garbage collections do not write to, and thereby copy, those pages.
+
+Settings (environment variables):
+    ML_BIND            address to listen on (default 0.0.0.0:5000)
+    ML_WORKERS         worker processes (default: number of cores)
+    ML_THREADS         request threads per worker (default 2)
+    ML_NATIVE_THREADS  BLAS/OpenMP threads per worker (default 1), keeps workers x
+                       native threads from oversubscribing the cores
+
+A worker still swaps to newer artifacts published by train_pipeline.py on its own,
+like the dev server does.
+
+Throughput of /api/predict is compared by benchmarks/bench_serving.py (distinct symptom
+texts, so every request misses the prediction cache). The dev server runs every
+request in one process under one GIL; prefork adds a full interpreter per core.
+The multi-core comparison has not been measured yet: the only run so far was on a
+single core, where both modes are CPU-bound and equal (16 clients: dev 145 req/s,
+prefork 2x2 148 req/s, p50 116 ms vs 93 ms) and which says nothing about scaling.
+Record req/s, p50/p99 and the core count for both modes from a multi-core machine here.
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('ML_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('ML_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('ML_THREADS', 2))
+worker_class = 'gthread'
+preload_app = True
+timeout = 60
+keepalive = 5
+
+native_threads = int(os.environ.get('ML_NATIVE_THREADS', 1))
+# Read by OpenBLAS/MKL/OpenMP when NumPy is first imported, which happens in the
+# master after this file is loaded, so the limit is inherited by every worker
+for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(variable, str(native_threads))
+
+def on_starting(server):
+    """Load the model in the master, before listening and forking"""
+    import app as backend
+
+    backend.load_or_train_model()
+    server.log.info(f"Model {backend.model_version} loaded in {backend.model_status['load_seconds']}s, "
+                    f"forking {server.cfg.workers} workers x {server.cfg.threads} threads")
+    gc.collect()
+    gc.freeze()
+
+_thread_limits = None
+
+def post_fork(server, worker):
+    # Pools that were created before the environment variables were set still get capped
+    global _thread_limits
+    from threadpoolctl import threadpool_limits
+    _thread_limits = threadpool_limits(limits=native_threads)
@@ -0,0 +1,120 @@
+"""
+Inference engine for the disease prediction model
+Runs the vectorizer and classifier once per batch and decodes labels from a precomputed array
+"""
+
+from collections import namedtuple
+import re
+
+import numpy as np
+
+from compiled_model import CascadeModel
+from metrics import null_stage
+
+# disease: decoded label of the best class
+# confidence: probability of the best class
+# top_k: [(disease, probability), ...] best first, top_k[0] is always the best class
+Prediction = namedtuple('Prediction', ['disease', 'confidence', 'top_k'])
+
+def preprocess_symptoms(text):
+    """Preprocess symptom text"""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def interpret_prediction(prediction, manual_override, disease_to_specialty):
+    """
+    Combine the model Prediction for one record with its manual pattern match
+    Returns ((disease, confidence, specialty), None) or (None, error)
+    """
+    # Get confidence score
+    confidence = float(prediction.confidence)
+    
+    # If manual override exists and has better confidence, use it
+    if manual_override and manual_override[1] > confidence:
+        return manual_override, None
+    
+    disease = prediction.disease
+    specialty = disease_to_specialty.get(disease, 'General Physician')
+    
+    # Very lenient threshold - accept almost any reasonable prediction
+    # top_k[0] is the best prediction, so below 8% it is kept only if above 5%
+    if confidence < 0.08 and prediction.top_k[0][1] <= 0.05:
+        return None, {
+            'error': 'low_confidence',
+            'message': 'Could not confidently predict. Please provide more specific symptoms.',
+            'confidence': confidence
+        }
+    
+    return (disease, confidence, specialty), None
+
+class DiseaseInferenceEngine:
+    """Single-pass disease inference over a fitted vectorizer and classifier"""
+
+    def __init__(self, model, vectorizer, class_names, top_k=3, stage=None):
+        """
+        model: fitted classifier exposing predict_proba() and classes_
+        vectorizer: fitted text vectorizer exposing transform()
+        class_names: decoded disease name for every encoded label (label_encoder.classes_)
+        stage: StageMetrics.stage, times vectorize / inference / decode in predict()
+        """
+        self.model = model
+        self.vectorizer = vectorizer
+        self.top_k = top_k
+        self.stage = stage or null_stage
+        # Column j of predict_proba belongs to encoded label model.classes_[j]
+        self.class_names = np.asarray(class_names, dtype=object)[np.asarray(model.classes_)]
+
+    @classmethod
+    def from_label_encoder(cls, model, vectorizer, label_encoder, top_k=3, stage=None):
+        return cls(model, vectorizer, label_encoder.classes_, top_k=top_k, stage=stage)
+
+    def vectorize(self, texts):
+        return self.vectorizer.transform(texts)
+
+    def predict_proba(self, texts, defer=None):
+        """Probability matrix of shape (len(texts), n_classes) from one model pass"""
+        return self._predict_proba(self.vectorize(texts), defer)
+
+    def _predict_proba(self, X, defer):
+        # Only a cascade has tiers to pick from, every other model scores all rows alike
+        if defer is not None and isinstance(self.model, CascadeModel):
+            return self.model.predict_proba(X, defer=defer)
+        return self.model.predict_proba(X)
+
+    def top_indices(self, probabilities, k=None):
+        """
+        Column indices of the k most probable classes per row, best first
+        Ties resolve to the lowest index, matching np.argmax and model.predict
+        """
+        k = min(k or self.top_k, probabilities.shape[1])
+        return np.argsort(-probabilities, axis=1, kind='stable')[:, :k]
+
+    def decode(self, probabilities, k=None):
+        """Turn a probability matrix into one Prediction per row"""
+        top = self.top_indices(probabilities, k)
+        top_probabilities = np.take_along_axis(probabilities, top, axis=1)
+        top_names = self.class_names[top]
+
+        predictions = []
+        for names, probs in zip(top_names.tolist(), top_probabilities.tolist()):
+            predictions.append(Prediction(names[0], probs[0], list(zip(names, probs))))
+        return predictions
+
+    def predict(self, texts, k=None, defer=None):
+        """
+        Predict preprocessed symptom texts, returns a list of Prediction
+        defer: one flag per text, flagged texts skip the fast tier of a CascadeModel
+        """
+        if not texts:
+            return []
+        with self.stage('vectorize'):
+            X = self.vectorize(texts)
+        with self.stage('inference'):
+            probabilities = self._predict_proba(X, defer)
+        with self.stage('decode'):
+            return self.decode(probabilities, k)
+
+    def predict_one(self, text, k=None):
+        return self.predict([text], k)[0]
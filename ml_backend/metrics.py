@@ -0,0 +1,136 @@
+"""
+Per-stage latency metrics for the prediction pipeline
+
+    with metrics.stage('vectorize'):
+        X = vectorizer.transform(texts)
+
+Each stage feeds an in-process histogram, exported in Prometheus text format by
+/api/metrics. With server_timing on, the stages of the current request are also
+summed into a Server-Timing header. Under gunicorn every worker keeps its own
+histograms, a scrape sees the worker that answered it.
+
+A disabled StageMetrics hands out one shared no-op context manager, so the
+instrumented code costs an attribute lookup and a call per stage.
+"""
+
+from bisect import bisect_left
+import threading
+import time
+
+# Upper bounds in seconds, from sub-millisecond text handling to slow doctor lookups
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_STAGE = _NullStage()
+
+def null_stage(name):
+    """Stage factory that measures nothing"""
+    return NULL_STAGE
+
+class Histogram:
+    """Bucketed observation counts with sum, not thread-safe on its own"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, n_buckets):
+        self.counts = [0] * (n_buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class StageMetrics:
+    """Stage timers, histograms and the per-request Server-Timing breakdown"""
+
+    def __init__(self, enabled=False, server_timing=False, buckets=DEFAULT_BUCKETS, prefix='ml_backend'):
+        self.enabled = enabled or server_timing
+        self.server_timing = server_timing
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._request = threading.local()
+
+    def stage(self, name):
+        """Context manager timing one stage, a no-op when disabled"""
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def observe(self, name, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(len(self.buckets))
+            histogram.counts[index] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+        timings = getattr(self._request, 'timings', None)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+    def begin_request(self):
+        """Start collecting this thread's stage timings for a Server-Timing header"""
+        self._request.timings = {} if self.server_timing else None
+        self._request.start = time.perf_counter()
+
+    def end_request(self, name='total'):
+        """
+        Record the whole request as stage name
+        Returns the Server-Timing header value, or None when server_timing is off
+        """
+        start = getattr(self._request, 'start', None)
+        if start is None:
+            return None
+        self._request.start = None
+        self.observe(name, time.perf_counter() - start)
+        timings, self._request.timings = self._request.timings, None
+        if not timings:
+            return None
+        return ', '.join(f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in timings.items())
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """All histograms in the Prometheus text exposition format"""
+        metric = f'{self.prefix}_stage_seconds'
+        lines = [
+            f'# HELP {metric} Time spent in each stage of the prediction pipeline',
+            f'# TYPE {metric} histogram',
+        ]
+        bounds = [repr(float(b)) for b in self.buckets] + ['+Inf']
+        with self._lock:
+            snapshot = {name: (list(h.counts), h.sum, h.count) for name, h in self._histograms.items()}
+        for name in sorted(snapshot):
+            counts, total, count = snapshot[name]
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total!r}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,107 @@
+"""
+Generate a synthetic doctor directory for development and benchmarking
+
+    python seed_doctors.py [--doctors 1000000] [--db doctors.db] [--seed 42]
+
+Doctors are spread over every specialty the model can recommend and the states and
+cities offered by the frontend. The database is built under a temporary name and
+moved into place when complete, so a running server never opens a half-written file.
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from doctor_directory import COLUMNS, DEFAULT_DB_PATH, create_indexes, create_schema, update_rating_ranks
+from training_data import DISEASE_DATA
+
+# Keep in sync with the state/city picker in frontend/src/pages/DiseasePredictor.js
+LOCATIONS = {
+    'Maharashtra': ['Mumbai', 'Pune', 'Nagpur', 'Thane', 'Nashik'],
+    'Delhi': ['New Delhi', 'North Delhi', 'South Delhi', 'East Delhi', 'West Delhi'],
+    'Karnataka': ['Bangalore', 'Mysore', 'Mangalore', 'Hubli', 'Belgaum'],
+    'Tamil Nadu': ['Chennai', 'Coimbatore', 'Madurai', 'Tiruchirappalli', 'Salem'],
+    'Gujarat': ['Ahmedabad', 'Surat', 'Vadodara', 'Rajkot', 'Bhavnagar'],
+    'West Bengal': ['Kolkata', 'Howrah', 'Durgapur', 'Asansol', 'Siliguri'],
+    'Uttar Pradesh': ['Lucknow', 'Kanpur', 'Agra', 'Varanasi', 'Noida'],
+    'Rajasthan': ['Jaipur', 'Jodhpur', 'Kota', 'Udaipur', 'Ajmer'],
+}
+
+FIRST_NAMES = ['Aarav', 'Ananya', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Nikhil',
+               'Priya', 'Rahul', 'Rohan', 'Saanvi', 'Sneha', 'Vikram', 'Aditi', 'Karan']
+LAST_NAMES = ['Sharma', 'Patel', 'Kumar', 'Singh', 'Reddy', 'Gupta', 'Verma', 'Mehta',
+              'Joshi', 'Khan', 'Agarwal', 'Desai', 'Iyer', 'Nair', 'Rao']
+HOSPITALS = ['Apollo Hospital', 'Fortis Healthcare', 'Max Hospital', 'Manipal Hospital', 'AIIMS',
+             'Lilavati Hospital', 'Kokilaben Hospital', 'Jaslok Hospital', 'Hinduja Hospital',
+             'Breach Candy Hospital', 'Medanta', 'Columbia Asia']
+
+CHUNK_SIZE = 100_000
+
+def specialties():
+    return sorted({info['specialty'] for info in DISEASE_DATA.values()})
+
+def generate_chunk(rng, start_id, size):
+    """Rows for doctors start_id .. start_id + size - 1, in COLUMNS order (rating_rank is set later)"""
+    cities = [(state, city) for state, names in LOCATIONS.items() for city in names]
+    specialty_names = np.array(specialties(), dtype=object)
+    location = rng.integers(len(cities), size=size)
+    states = np.array([state for state, _ in cities], dtype=object)[location]
+    city_names = np.array([city for _, city in cities], dtype=object)[location]
+    names = ('Dr. ' + np.array(FIRST_NAMES, dtype=object)[rng.integers(len(FIRST_NAMES), size=size)]
+             + ' ' + np.array(LAST_NAMES, dtype=object)[rng.integers(len(LAST_NAMES), size=size)])
+
+    columns = (
+        range(start_id, start_id + size),
+        names,
+        specialty_names[rng.integers(len(specialty_names), size=size)],
+        states,
+        city_names,
+        np.round(3.0 + rng.random(size) * 2.0, 1).tolist(),
+        rng.integers(1, 36, size=size).tolist(),
+        np.array(HOSPITALS, dtype=object)[rng.integers(len(HOSPITALS), size=size)],
+        (rng.random(size) > 0.3).astype(int).tolist(),
+        (rng.integers(10, 41, size=size) * 50).tolist(),
+    )
+    return zip(*columns)
+
+def seed_directory(path=DEFAULT_DB_PATH, n_doctors=1_000_000, seed=None):
+    """Write a new directory of n_doctors synthetic doctors to path, replacing any existing one"""
+    rng = np.random.default_rng(seed)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    connection = sqlite3.connect(tmp)
+    try:
+        # Nothing to recover if seeding is interrupted, skip the journal and fsyncs
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        create_schema(connection)
+        insert = f"INSERT INTO doctors ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        with connection:
+            for start in range(0, n_doctors, CHUNK_SIZE):
+                size = min(CHUNK_SIZE, n_doctors - start)
+                connection.executemany(insert, generate_chunk(rng, start + 1, size))
+            update_rating_ranks(connection)
+            create_indexes(connection)
+        connection.execute('VACUUM')
+    finally:
+        connection.close()
+    os.replace(tmp, path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic doctor directory')
+    parser.add_argument('--doctors', type=int, default=1_000_000)
+    parser.add_argument('--db', default=DEFAULT_DB_PATH)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed_directory(args.db, args.doctors, args.seed)
+    print(f"Wrote {args.doctors} doctors to {args.db} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Data-driven symptom pattern rules
+Rules are loaded from symptom_rules.json and all their keywords are compiled into one
+Aho-Corasick automaton, so a single pass over the text scores every rule at once
+
+Rule fields:
+    disease, confidence, specialty   result when the rule fires
+    keywords + min_matches           fires when at least min_matches distinct keywords occur
+    any_of                           list of keyword groups, fires when every keyword of a group occurs
+Keywords match as lowercase substrings ('sneez' matches 'sneezing'). The first rule in file
+order that fires wins.
+"""
+
+from collections import deque
+import json
+import os
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'symptom_rules.json')
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every (possibly overlapping) keyword occurrence"""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        goto = [{}]
+        outputs = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].append(keyword_id)
+
+        # Breadth-first failure links, folded into a full transition table
+        alphabet = {ch for keyword in self.keywords for ch in keyword}
+        fail = [0] * len(goto)
+        delta = [dict() for _ in goto]
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch in alphabet:
+                child = goto[state].get(ch)
+                if child is None:
+                    target = delta[fail[state]].get(ch, 0)
+                    if target:
+                        delta[state][ch] = target
+                else:
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                    delta[state][ch] = child
+                    queue.append(child)
+
+        self._delta = delta
+        self._outputs = [tuple(ids) for ids in outputs]
+
+    def find(self, text):
+        """Set of keyword ids occurring in text"""
+        found = set()
+        state = 0
+        delta, outputs = self._delta, self._outputs
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+class SymptomRuleEngine:
+    """Evaluates all symptom rules with one automaton pass per text"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        keyword_ids = {}
+        # A clause is a keyword set with a threshold; a rule fires when any of its clauses is met
+        self._clause_rule = []
+        self._clause_needed = []
+        keyword_clauses = []
+
+        for rule_index, rule in enumerate(self.rules):
+            clauses = []
+            if rule.get('keywords'):
+                clauses.append((rule['keywords'], rule.get('min_matches', 1)))
+            for group in rule.get('any_of', []):
+                clauses.append((group, len(set(group))))
+            if not clauses:
+                raise ValueError(f"Rule {rule.get('name', rule_index)} has no keywords")
+
+            for keywords, needed in clauses:
+                clause_id = len(self._clause_rule)
+                self._clause_rule.append(rule_index)
+                self._clause_needed.append(needed)
+                for keyword in set(k.lower() for k in keywords):
+                    if keyword not in keyword_ids:
+                        keyword_ids[keyword] = len(keyword_ids)
+                        keyword_clauses.append([])
+                    keyword_clauses[keyword_ids[keyword]].append(clause_id)
+
+        self._keyword_clauses = [tuple(c) for c in keyword_clauses]
+        self._automaton = KeywordAutomaton(keyword_ids)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_PATH):
+        with open(path, 'r') as f:
+            return cls(json.load(f)['rules'])
+
+    def first_match(self, text):
+        """The first rule (as a dict) that fires for text, or None"""
+        counts = {}
+        best = None
+        for keyword_id in self._automaton.find(text.lower()):
+            for clause_id in self._keyword_clauses[keyword_id]:
+                counts[clause_id] = counts.get(clause_id, 0) + 1
+                if counts[clause_id] == self._clause_needed[clause_id]:
+                    rule_index = self._clause_rule[clause_id]
+                    if best is None or rule_index < best:
+                        best = rule_index
+        return None if best is None else self.rules[best]
+
+    def match(self, text):
+        """(disease, confidence, specialty) of the first rule that fires, or None"""
+        rule = self.first_match(text)
+        if rule is None:
+            return None
+        return (rule['disease'], rule['confidence'], rule['specialty'])
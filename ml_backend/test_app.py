@@ -0,0 +1,77 @@
+"""
+Tests for request handling in the Flask API that need no trained model
+Run with: python -m pytest test_app.py
+"""
+
+import pytest
+
+import app as backend
+from inference import Prediction
+
+@pytest.fixture
+def client(monkeypatch):
+    # Any engine lets requests past require_model; invalid input is rejected before it is used
+    monkeypatch.setattr(backend, 'inference_engine', object())
+    monkeypatch.setattr(backend, '_next_reload_check', float('inf'))
+    return backend.app.test_client()
+
+@pytest.mark.parametrize('kwargs', [
+    {'data': 'fever and headache', 'content_type': 'text/plain'},
+    {'data': 'not json', 'content_type': 'application/json'},
+    {'json': ['fever']},
+    {'json': {'symptoms': 42, 'state': 'Karnataka', 'city': 'Bangalore'}},
+    {'json': {'symptoms': None, 'state': 'Karnataka', 'city': 'Bangalore'}},
+    {'json': {'symptoms': ['fever'], 'state': 'Karnataka', 'city': 'Bangalore'}},
+])
+def test_predict_rejects_invalid_input(client, kwargs):
+    response = client.post('/api/predict', **kwargs)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'invalid_input'
+
+def test_batch_rejects_non_string_symptoms(client):
+    response = client.post('/api/predict/batch', json={'records': [
+        {'symptoms': 42, 'state': 'Karnataka', 'city': 'Bangalore'},
+        {'symptoms': '', 'state': 'Karnataka', 'city': 'Bangalore'},
+    ]})
+    assert response.status_code == 200
+    errors = [result['error'] for result in response.get_json()['results']]
+    assert errors == ['invalid_input', 'no_input']
+
+class CountingEngine:
+    """Answers with the text it was given and records every text it scored"""
+    def __init__(self):
+        self.scored = []
+
+    def predict(self, texts, k=None, defer=None):
+        self.scored.extend(texts)
+        return [Prediction(text, 0.9, []) for text in texts]
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = CountingEngine()
+    monkeypatch.setattr(backend, 'inference_engine', engine)
+    monkeypatch.setattr(backend, 'prediction_cache', backend.PredictionCache(maxsize=16, ttl=60))
+    return engine
+
+def predict(text):
+    result, error = backend.predict_with_cache([(text, backend.preprocess_symptoms(text))])[0]
+    return result[0]
+
+def test_cache_shares_case_and_punctuation_variants(engine):
+    assert predict('Fever, headache!') == predict('fever  headache') == 'fever headache'
+    assert engine.scored == ['fever headache']
+
+def test_cache_keeps_word_orders_apart(engine):
+    # The model's n-grams depend on word order, a hit must not answer for another order
+    assert predict('fever headache') == 'fever headache'
+    assert predict('headache fever') == 'headache fever'
+    assert engine.scored == ['fever headache', 'headache fever']
+
+def test_unknown_location_gets_mock_doctors(monkeypatch):
+    class EmptyDirectory:
+        def top_doctors(self, specialty, state, city, limit=10):
+            return []
+    monkeypatch.setattr(backend, 'doctor_directory', EmptyDirectory())
+    doctors = backend.get_doctors('General Physician', 'Karnataka', 'Atlantis')
+    assert len(doctors) == 10
+    assert all(doctor['location'] == 'Atlantis, Karnataka' for doctor in doctors)
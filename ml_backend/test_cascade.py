@@ -0,0 +1,65 @@
+"""
+Tests for the two-tier cascade
+Turning the cascade on must not change the final decisions (disease, manual override or
+low-confidence error) on held-out rows its threshold was tuned for
+Run with: python -m pytest test_cascade.py
+"""
+
+import numpy as np
+import pytest
+
+from compiled_model import CascadeModel, CompiledForest
+from inference import DiseaseInferenceEngine, interpret_prediction, preprocess_symptoms
+from symptom_rules import SymptomRuleEngine
+from train_pipeline import fit_forest, tune_cascade_threshold
+from training_data import create_training_dataset
+
+@pytest.fixture(scope='module')
+def trained():
+    return fit_forest(create_training_dataset(40, seed=3), cascade_margin=0.0)
+
+def served_decisions(engine, texts, overrides):
+    """Final decisions as app.predict_with_cache makes them"""
+    predictions = engine.predict(texts, defer=[override is not None for override in overrides])
+    decisions = []
+    for prediction, override in zip(predictions, overrides):
+        result, error = interpret_prediction(prediction, override, {})
+        decisions.append(error['error'] if error else (result[0], result is override))
+    return decisions
+
+def test_cascade_keeps_held_out_decisions(trained):
+    assert trained.fast_model is not None
+    held_out = create_training_dataset(20, seed=4)
+    texts = [preprocess_symptoms(text) for text in held_out['symptoms']]
+    rules = SymptomRuleEngine.from_file()
+    overrides = [rules.match(text) for text in texts]
+    X = trained.vectorizer.transform(texts)
+    forest = CompiledForest.from_sklearn(trained.model)
+    threshold = tune_cascade_threshold(trained.fast_model.predict_proba(X), forest.predict_proba(X), overrides,
+                                       trained.label_encoder.classes_, margin=0.0)
+    assert threshold is not None
+
+    cascade = CascadeModel(trained.fast_model, forest, threshold)
+    forest_engine = DiseaseInferenceEngine.from_label_encoder(forest, trained.vectorizer, trained.label_encoder)
+    cascade_engine = DiseaseInferenceEngine.from_label_encoder(cascade, trained.vectorizer, trained.label_encoder)
+    assert served_decisions(cascade_engine, texts, overrides) == served_decisions(forest_engine, texts, overrides)
+    assert cascade.fast_rows > 0 and cascade.slow_rows > 0
+
+def test_deferred_rows_skip_fast_tier(trained):
+    texts = [preprocess_symptoms(text) for text in create_training_dataset(2, seed=5)['symptoms']]
+    X = trained.vectorizer.transform(texts)
+    forest = CompiledForest.from_sklearn(trained.model)
+    cascade = CascadeModel(trained.fast_model, forest, threshold=0.0)
+    defer = np.arange(len(texts)) % 2 == 0
+
+    proba = cascade.predict_proba(X, defer=defer)
+    assert np.array_equal(proba[defer], forest.predict_proba(X[np.flatnonzero(defer)]))
+    assert np.array_equal(proba[~defer], trained.fast_model.predict_proba(X[np.flatnonzero(~defer)]))
+    assert cascade.stats()['fast_rows'] == int((~defer).sum())
+
+def test_no_threshold_when_every_fast_answer_changes_a_decision():
+    class_names = np.array(['A', 'B'])
+    fast = np.array([[0.9, 0.1], [0.8, 0.2]])
+    slow = np.array([[0.2, 0.8], [0.3, 0.7]])
+    assert tune_cascade_threshold(fast, slow, [None, None], class_names, margin=0.0) is None
+    assert tune_cascade_threshold(fast, slow, [None, None], class_names, margin=0.5) == 0.9
@@ -0,0 +1,76 @@
+"""
+Tests for the compiled forest and linear model
+Compiled probabilities must match sklearn's predict_proba for every supported estimator
+Run with: python -m pytest test_compiled_model.py
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from artifacts import load_artifacts, save_artifacts
+from compiled_model import CompiledForest, CompiledLinearModel
+from inference import preprocess_symptoms
+from training_data import create_training_dataset
+
+def dataset(seed=0, n_classes=4):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(n_classes, 6))
+    y = rng.integers(n_classes, size=300)
+    return centers[y] + rng.normal(size=(300, 6)), y
+
+def assert_compiles_exactly(estimator, link):
+    X, y = dataset()
+    estimator.fit(X, y)
+    compiled = CompiledLinearModel.from_sklearn(estimator)
+    assert compiled.link == link
+    np.testing.assert_allclose(compiled.predict_proba(X), estimator.predict_proba(X), rtol=1e-10, atol=1e-12)
+    assert np.array_equal(compiled.predict(X), estimator.predict(X))
+
+def test_multinomial_logistic_regression():
+    assert_compiles_exactly(LogisticRegression(max_iter=1000), 'softmax')
+
+def test_one_vs_rest_logistic_regression():
+    assert_compiles_exactly(OneVsRestClassifier(LogisticRegression(max_iter=1000)), 'ovr')
+
+def test_log_loss_sgd():
+    assert_compiles_exactly(SGDClassifier(loss='log_loss', random_state=0), 'ovr')
+
+@pytest.mark.parametrize('loss', ['hinge', 'modified_huber'])
+def test_sgd_without_probabilistic_link_is_rejected(loss):
+    X, y = dataset()
+    with pytest.raises(ValueError):
+        CompiledLinearModel.from_sklearn(SGDClassifier(loss=loss, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        CompiledLinearModel.from_sklearn(OneVsRestClassifier(SGDClassifier(loss=loss, random_state=0)).fit(X, y))
+
+@pytest.fixture(scope='module')
+def forest():
+    """A small forest on symptom text, with its vectorizer, label encoder and features"""
+    data = create_training_dataset(10, seed=7)
+    vectorizer = TfidfVectorizer(ngram_range=(1, 3))
+    X = vectorizer.fit_transform(data['symptoms'].map(preprocess_symptoms))
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(data['disease'])
+    rf = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    return rf, vectorizer, label_encoder, X
+
+def test_compiled_forest_matches_sklearn(forest):
+    rf, _, _, X = forest
+    compiled = CompiledForest.from_sklearn(rf)
+    assert np.array_equal(compiled.predict_proba(X), rf.predict_proba(X))
+    assert np.array_equal(compiled.predict(X), rf.predict(X))
+
+def test_compiled_forest_artifact_round_trip(forest, tmp_path):
+    rf, vectorizer, label_encoder, X = forest
+    version = save_artifacts(str(tmp_path), rf, vectorizer, label_encoder, {}, set())
+    loaded = load_artifacts(str(tmp_path))
+    assert loaded.version == version
+    # Served from read-only maps of the saved arrays, traversal arrays included
+    for name in CompiledForest.ARRAYS + CompiledForest.TRAVERSAL_ARRAYS:
+        assert isinstance(getattr(loaded.model, name), np.memmap), name
+    assert np.array_equal(loaded.model.predict_proba(X), rf.predict_proba(X))
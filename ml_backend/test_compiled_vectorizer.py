@@ -0,0 +1,54 @@
+"""
+Tests for the compiled TF-IDF vectorizer
+Both the single-document path and the batch path (BATCH_THRESHOLD documents and more)
+must reproduce TfidfVectorizer.transform bit for bit
+Run with: python -m pytest test_compiled_vectorizer.py
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from compiled_vectorizer import BATCH_THRESHOLD, CompiledTfidfVectorizer
+from inference import preprocess_symptoms
+from training_data import create_training_dataset
+
+SETTINGS = [
+    # As fitted by train_pipeline.py
+    dict(max_features=1000, ngram_range=(1, 3), min_df=1, max_df=0.95, stop_words=None, sublinear_tf=True),
+    dict(ngram_range=(1, 2), stop_words='english', norm='l1'),
+    dict(ngram_range=(2, 3), binary=True, norm=None),
+]
+
+# Empty, out-of-vocabulary, repeated and mixed case strings
+EDGE_CASES = ['', '   ', 'xyzzy plugh', 'fever fever fever fever', 'Fever FEVER fever headache',
+              'pain pain pain pain pain pain chest pain']
+
+@pytest.fixture(scope='module')
+def texts():
+    data = create_training_dataset(5, seed=11)
+    return data['symptoms'].map(preprocess_symptoms).tolist()
+
+def assert_identical(expected, actual):
+    assert expected.shape == actual.shape
+    assert np.array_equal(expected.indptr, actual.indptr)
+    assert np.array_equal(expected.indices, actual.indices)
+    assert expected.data.tobytes() == actual.data.tobytes()
+
+@pytest.mark.parametrize('settings', SETTINGS)
+def test_matches_sklearn_on_both_paths(texts, settings):
+    reference = TfidfVectorizer(**settings).fit(texts)
+    compiled = CompiledTfidfVectorizer.from_sklearn(reference)
+    assert compiled._term_keys is not None  # otherwise every size takes the single-document path
+    documents = EDGE_CASES + texts[:200]
+    for size in (1, 2, BATCH_THRESHOLD - 1, BATCH_THRESHOLD, BATCH_THRESHOLD + 1, len(documents)):
+        for start in range(0, len(documents), size * 4):
+            batch = documents[start:start + size]
+            assert_identical(reference.transform(batch), compiled.transform(batch))
+
+def test_batch_of_edge_cases_only(texts):
+    reference = TfidfVectorizer(**SETTINGS[0]).fit(texts)
+    compiled = CompiledTfidfVectorizer.from_sklearn(reference)
+    batch = EDGE_CASES * (BATCH_THRESHOLD // len(EDGE_CASES) + 1)
+    assert len(batch) >= BATCH_THRESHOLD
+    assert_identical(reference.transform(batch), compiled.transform(batch))
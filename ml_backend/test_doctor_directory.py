@@ -0,0 +1,23 @@
+"""
+Tests for the SQLite doctor directory
+Run with: python -m pytest test_doctor_directory.py
+"""
+
+from doctor_directory import DoctorDirectory
+from seed_doctors import seed_directory
+
+def test_directory_follows_reseeded_file(tmp_path):
+    path = str(tmp_path / 'doctors.db')
+    seed_directory(path, n_doctors=200, seed=1)
+    directory = DoctorDirectory(path)
+    assert directory.count() == 200
+
+    # Reseeding moves a new file over path while the directory holds a connection
+    seed_directory(path, n_doctors=300, seed=2)
+    assert directory.count() == 300
+
+def test_search_unknown_city_is_empty(tmp_path):
+    path = str(tmp_path / 'doctors.db')
+    seed_directory(path, n_doctors=200, seed=1)
+    doctors, next_cursor = DoctorDirectory(path).search('General Physician', 'Karnataka', 'Atlantis')
+    assert doctors == [] and next_cursor is None
@@ -0,0 +1,101 @@
+"""
+Tests for the data-driven symptom rules
+The rule engine must make the same decisions as the original hard-coded check_manual_patterns
+Run with: python -m pytest test_symptom_rules.py
+"""
+
+import random
+
+import pytest
+
+from symptom_rules import KeywordAutomaton, SymptomRuleEngine
+
+def legacy_check_manual_patterns(text):
+    """check_manual_patterns as it was before the rules moved to symptom_rules.json"""
+    text_lower = text.lower()
+    
+    cold_keywords = ['cold', 'runny', 'nose', 'sneez', 'congestion', 'stuffy']
+    cold_count = sum(1 for keyword in cold_keywords if keyword in text_lower)
+    if cold_count >= 2:
+        return ('Common Cold', 0.75, 'General Physician')
+    
+    flu_keywords = ['fever', 'headache', 'body', 'pain', 'ache', 'fatigue', 'chills']
+    flu_count = sum(1 for keyword in flu_keywords if keyword in text_lower)
+    if flu_count >= 2:
+        return ('Influenza (Flu)', 0.70, 'General Physician')
+    
+    if ('chest' in text_lower and 'pain' in text_lower) or \
+       ('shortness' in text_lower and 'breath' in text_lower) or \
+       ('breathing' in text_lower and 'difficulty' in text_lower):
+        return ('Respiratory Infection', 0.65, 'Pulmonologist')
+    
+    stomach_keywords = ['stomach', 'nausea', 'vomit', 'diarrhea', 'abdominal']
+    stomach_count = sum(1 for keyword in stomach_keywords if keyword in text_lower)
+    if stomach_count >= 2:
+        return ('Gastroenteritis', 0.70, 'Gastroenterologist')
+    
+    return None
+
+KNOWN_CASES = [
+    'cold, runny nose, sneezing',
+    'fever, headache, body pain',
+    'headache',
+    'fever',
+    'chest pain, shortness of breath',
+    'shortness of breath',
+    'difficulty breathing',
+    'stomach pain, nausea, vomiting',
+    'nausea and vomiting',
+    'hello world',
+    '',
+    'itchy skin, red rash',
+    'chest tightness and wheezing',
+    'Stuffy NOSE',
+    'heartache',
+    'abdominal cramps with diarrhea',
+]
+
+FRAGMENTS = ['cold', 'runny', 'nose', 'sneezing', 'congestion', 'stuffy', 'fever', 'headache',
+             'body', 'pain', 'ache', 'fatigue', 'chills', 'chest', 'shortness', 'breath',
+             'breathing', 'difficulty', 'stomach', 'nausea', 'vomiting', 'diarrhea', 'abdominal',
+             'itchy', 'rash', 'and', 'with', 'since', 'yesterday', 'mild', 'severe', 'backache']
+
+def random_texts(count, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.sample(FRAGMENTS, rng.randint(1, 6))
+        yield rng.choice([' ', ', ', '']).join(words)
+
+def test_known_cases_match_legacy():
+    engine = SymptomRuleEngine.from_file()
+    for text in KNOWN_CASES:
+        assert engine.match(text) == legacy_check_manual_patterns(text), text
+
+def test_random_texts_match_legacy():
+    engine = SymptomRuleEngine.from_file()
+    for text in random_texts(5000):
+        assert engine.match(text) == legacy_check_manual_patterns(text), text
+
+def test_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(['ache', 'headache', 'he', 'breath', 'breathing'])
+    found = automaton.find('headache while breathing')
+    assert {automaton.keywords[i] for i in found} == {'ache', 'headache', 'he', 'breath', 'breathing'}
+
+def test_automaton_matches_substring_search():
+    keywords = ['sneez', 'nose', 'no', 'ose', 'pain', 'ain', 'in']
+    automaton = KeywordAutomaton(keywords)
+    for text in random_texts(500, seed=11):
+        expected = {i for i, k in enumerate(keywords) if k in text}
+        assert automaton.find(text) == expected, text
+
+def test_earlier_rule_wins():
+    engine = SymptomRuleEngine([
+        {'disease': 'A', 'confidence': 0.5, 'specialty': 'X', 'keywords': ['pain'], 'min_matches': 1},
+        {'disease': 'B', 'confidence': 0.9, 'specialty': 'Y', 'any_of': [['chest', 'pain']]},
+    ])
+    assert engine.match('chest pain') == ('A', 0.5, 'X')
+    assert engine.match('chest') is None
+
+def test_rule_without_keywords_is_rejected():
+    with pytest.raises(ValueError):
+        SymptomRuleEngine([{'disease': 'A', 'confidence': 0.5, 'specialty': 'X'}])
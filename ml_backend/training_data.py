@@ -0,0 +1,319 @@
+"""
+Synthetic symptom dataset for training the disease prediction model
+Rows are generated per disease with batched NumPy draws and vectorized string assembly
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Disease patterns with symptoms and specialties
+DISEASE_DATA = {
+    'Common Cold': {
+        'symptoms': ['runny nose', 'sneezing', 'sore throat', 'cough', 'mild fever', 'congestion', 
+                    'watery eyes', 'cold', 'stuffy nose', 'nasal discharge', 'blocked nose', 
+                    'nose', 'sneeze', 'running nose', 'nasal congestion'],
+        'specialty': 'General Physician'
+    },
+    'Influenza (Flu)': {
+        'symptoms': ['high fever', 'body aches', 'fatigue', 'chills', 'headache', 'dry cough', 'weakness'],
+        'specialty': 'General Physician'
+    },
+    'COVID-19': {
+        'symptoms': ['fever', 'dry cough', 'tiredness', 'loss of taste', 'loss of smell', 'breathing difficulty', 'chest pain'],
+        'specialty': 'Pulmonologist'
+    },
+    'Pneumonia': {
+        'symptoms': ['chest pain', 'cough with phlegm', 'fever', 'shortness of breath', 'rapid breathing', 'fatigue', 'sweating'],
+        'specialty': 'Pulmonologist'
+    },
+    'Bronchitis': {
+        'symptoms': ['persistent cough', 'mucus production', 'chest discomfort', 'wheezing', 'shortness of breath', 'mild fever'],
+        'specialty': 'Pulmonologist'
+    },
+    'Asthma': {
+        'symptoms': ['wheezing', 'shortness of breath', 'chest tightness', 'coughing at night', 'difficulty breathing', 'rapid breathing'],
+        'specialty': 'Pulmonologist'
+    },
+    'Migraine': {
+        'symptoms': ['severe headache', 'nausea', 'sensitivity to light', 'sensitivity to sound', 'visual disturbances', 'throbbing pain'],
+        'specialty': 'Neurologist'
+    },
+    'Tension Headache': {
+        'symptoms': ['mild to moderate headache', 'pressure in forehead', 'tight band around head', 'neck pain', 'shoulder pain'],
+        'specialty': 'Neurologist'
+    },
+    'Gastroenteritis': {
+        'symptoms': ['diarrhea', 'vomiting', 'stomach cramps', 'nausea', 'fever', 'abdominal pain', 'dehydration'],
+        'specialty': 'Gastroenterologist'
+    },
+    'Acid Reflux (GERD)': {
+        'symptoms': ['heartburn', 'chest pain', 'difficulty swallowing', 'regurgitation', 'sour taste', 'burning sensation'],
+        'specialty': 'Gastroenterologist'
+    },
+    'Irritable Bowel Syndrome': {
+        'symptoms': ['abdominal pain', 'bloating', 'gas', 'diarrhea', 'constipation', 'cramping', 'mucus in stool'],
+        'specialty': 'Gastroenterologist'
+    },
+    'Diabetes Type 2': {
+        'symptoms': ['increased thirst', 'frequent urination', 'increased hunger', 'fatigue', 'blurred vision', 'slow healing wounds'],
+        'specialty': 'Endocrinologist'
+    },
+    'Hypothyroidism': {
+        'symptoms': ['fatigue', 'weight gain', 'cold sensitivity', 'dry skin', 'hair loss', 'muscle weakness', 'depression'],
+        'specialty': 'Endocrinologist'
+    },
+    'Hyperthyroidism': {
+        'symptoms': ['weight loss', 'rapid heartbeat', 'increased appetite', 'nervousness', 'tremors', 'sweating', 'heat intolerance'],
+        'specialty': 'Endocrinologist'
+    },
+    'Hypertension': {
+        'symptoms': ['headaches', 'dizziness', 'nosebleeds', 'chest pain', 'shortness of breath', 'vision problems', 'fatigue'],
+        'specialty': 'Cardiologist'
+    },
+    'Coronary Artery Disease': {
+        'symptoms': ['chest pain', 'shortness of breath', 'heart palpitations', 'weakness', 'nausea', 'sweating', 'jaw pain'],
+        'specialty': 'Cardiologist'
+    },
+    'Arthritis': {
+        'symptoms': ['joint pain', 'stiffness', 'swelling', 'reduced range of motion', 'redness', 'warmth in joints', 'morning stiffness'],
+        'specialty': 'Rheumatologist'
+    },
+    'Osteoporosis': {
+        'symptoms': ['back pain', 'loss of height', 'stooped posture', 'bone fractures', 'weakness', 'bone pain'],
+        'specialty': 'Orthopedic'
+    },
+    'Dermatitis': {
+        'symptoms': ['itchy skin', 'red rash', 'dry skin', 'blisters', 'swelling', 'burning sensation', 'skin lesions'],
+        'specialty': 'Dermatologist'
+    },
+    'Psoriasis': {
+        'symptoms': ['red patches', 'silvery scales', 'dry cracked skin', 'itching', 'burning', 'thick nails', 'joint pain'],
+        'specialty': 'Dermatologist'
+    },
+    'Urinary Tract Infection': {
+        'symptoms': ['burning urination', 'frequent urination', 'cloudy urine', 'strong smelling urine', 'pelvic pain', 'blood in urine'],
+        'specialty': 'Urologist'
+    },
+    'Kidney Stones': {
+        'symptoms': ['severe back pain', 'side pain', 'painful urination', 'blood in urine', 'nausea', 'vomiting', 'frequent urination'],
+        'specialty': 'Nephrologist'
+    },
+    'Anemia': {
+        'symptoms': ['fatigue', 'weakness', 'pale skin', 'shortness of breath', 'dizziness', 'cold hands', 'chest pain', 'irregular heartbeat'],
+        'specialty': 'Hematologist'
+    },
+    'Depression': {
+        'symptoms': ['persistent sadness', 'loss of interest', 'fatigue', 'sleep problems', 'appetite changes', 'difficulty concentrating', 'hopelessness'],
+        'specialty': 'Psychiatrist'
+    },
+    'Anxiety Disorder': {
+        'symptoms': ['excessive worry', 'restlessness', 'rapid heartbeat', 'sweating', 'trembling', 'difficulty concentrating', 'insomnia'],
+        'specialty': 'Psychiatrist'
+    },
+    'Sinusitis': {
+        'symptoms': ['facial pain', 'nasal congestion', 'thick nasal discharge', 'reduced sense of smell', 'headache', 'cough', 'fever'],
+        'specialty': 'ENT Specialist'
+    },
+    'Tonsillitis': {
+        'symptoms': ['sore throat', 'difficulty swallowing', 'swollen tonsils', 'fever', 'bad breath', 'neck swelling', 'tender lymph nodes'],
+        'specialty': 'ENT Specialist'
+    },
+    'Conjunctivitis': {
+        'symptoms': ['red eyes', 'itchy eyes', 'discharge', 'watery eyes', 'burning sensation', 'swollen eyelids', 'blurred vision'],
+        'specialty': 'Ophthalmologist'
+    },
+    'Glaucoma': {
+        'symptoms': ['eye pain', 'blurred vision', 'seeing halos', 'redness', 'nausea', 'vision loss', 'headache'],
+        'specialty': 'Ophthalmologist'
+    },
+    'Dengue Fever': {
+        'symptoms': ['high fever', 'severe headache', 'pain behind eyes', 'joint pain', 'muscle pain', 'rash', 'mild bleeding'],
+        'specialty': 'General Physician'
+    },
+    'Malaria': {
+        'symptoms': ['fever', 'chills', 'sweating', 'headache', 'nausea', 'vomiting', 'muscle pain', 'fatigue'],
+        'specialty': 'General Physician'
+    },
+    'Typhoid': {
+        'symptoms': ['prolonged fever', 'weakness', 'stomach pain', 'headache', 'loss of appetite', 'constipation', 'rash'],
+        'specialty': 'General Physician'
+    },
+    'Chickenpox': {
+        'symptoms': ['itchy rash', 'blisters', 'fever', 'tiredness', 'loss of appetite', 'headache', 'red spots'],
+        'specialty': 'Dermatologist'
+    },
+    'Measles': {
+        'symptoms': ['fever', 'cough', 'runny nose', 'red eyes', 'rash', 'white spots in mouth', 'sore throat'],
+        'specialty': 'General Physician'
+    },
+    'Hepatitis': {
+        'symptoms': ['jaundice', 'fatigue', 'abdominal pain', 'loss of appetite', 'nausea', 'dark urine', 'pale stool'],
+        'specialty': 'Hepatologist'
+    },
+    'Cirrhosis': {
+        'symptoms': ['fatigue', 'easy bruising', 'swelling legs', 'yellow skin', 'itchy skin', 'weight loss', 'confusion'],
+        'specialty': 'Hepatologist'
+    },
+    'Appendicitis': {
+        'symptoms': ['sudden pain right side', 'nausea', 'vomiting', 'loss of appetite', 'fever', 'constipation', 'abdominal swelling'],
+        'specialty': 'General Surgeon'
+    },
+    'Gallstones': {
+        'symptoms': ['sudden pain upper right abdomen', 'back pain', 'nausea', 'vomiting', 'indigestion', 'bloating'],
+        'specialty': 'Gastroenterologist'
+    },
+    'Pancreatitis': {
+        'symptoms': ['upper abdominal pain', 'pain radiating to back', 'nausea', 'vomiting', 'fever', 'rapid pulse', 'tender abdomen'],
+        'specialty': 'Gastroenterologist'
+    },
+    'Vertigo': {
+        'symptoms': ['spinning sensation', 'loss of balance', 'nausea', 'vomiting', 'headache', 'sweating', 'ringing in ears'],
+        'specialty': 'ENT Specialist'
+    },
+    'Epilepsy': {
+        'symptoms': ['seizures', 'temporary confusion', 'staring spell', 'uncontrollable jerking', 'loss of consciousness', 'fear', 'anxiety'],
+        'specialty': 'Neurologist'
+    },
+    "Parkinson's Disease": {
+        'symptoms': ['tremors', 'slowed movement', 'rigid muscles', 'impaired posture', 'loss of balance', 'speech changes', 'writing changes'],
+        'specialty': 'Neurologist'
+    },
+    "Alzheimer's Disease": {
+        'symptoms': ['memory loss', 'difficulty planning', 'confusion', 'difficulty speaking', 'misplacing things', 'poor judgment', 'mood changes'],
+        'specialty': 'Neurologist'
+    },
+    'Multiple Sclerosis': {
+        'symptoms': ['numbness', 'tingling', 'weakness', 'vision problems', 'dizziness', 'fatigue', 'difficulty walking'],
+        'specialty': 'Neurologist'
+    },
+    'Chronic Kidney Disease': {
+        'symptoms': ['fatigue', 'swelling', 'shortness of breath', 'nausea', 'confusion', 'chest pain', 'high blood pressure'],
+        'specialty': 'Nephrologist'
+    },
+    'Lupus': {
+        'symptoms': ['fatigue', 'joint pain', 'rash', 'fever', 'chest pain', 'hair loss', 'sensitivity to light'],
+        'specialty': 'Rheumatologist'
+    },
+    'Gout': {
+        'symptoms': ['intense joint pain', 'redness', 'swelling', 'limited range of motion', 'tenderness', 'warmth'],
+        'specialty': 'Rheumatologist'
+    },
+    'Fibromyalgia': {
+        'symptoms': ['widespread pain', 'fatigue', 'sleep problems', 'cognitive difficulties', 'headaches', 'depression', 'anxiety'],
+        'specialty': 'Rheumatologist'
+    },
+    'Sleep Apnea': {
+        'symptoms': ['loud snoring', 'gasping during sleep', 'morning headache', 'excessive daytime sleepiness', 'difficulty concentrating', 'irritability'],
+        'specialty': 'Pulmonologist'
+    },
+    'Tuberculosis': {
+        'symptoms': ['persistent cough', 'coughing blood', 'chest pain', 'weight loss', 'fever', 'night sweats', 'fatigue'],
+        'specialty': 'Pulmonologist'
+    },
+    'COPD': {
+        'symptoms': ['shortness of breath', 'chronic cough', 'wheezing', 'chest tightness', 'frequent respiratory infections', 'fatigue', 'mucus production'],
+        'specialty': 'Pulmonologist'
+    }
+}
+
+# Natural language variations around the symptom list
+CONNECTORS = [', ', ' and ', ', ', ' with ', ', also ']
+PREFIXES = ['I have ', 'Experiencing ', 'Suffering from ', 'Feeling ',
+            'I am having ', 'Having ', '', 'Got ', 'Recently developed ',
+            'Patient has ', 'Started with ', 'Symptoms include ']
+SUFFIXES = ['', ' for few days', ' since yesterday', ' since last week',
+            ' recently', ' from past 2 days', ' today', ' for a while',
+            ' getting worse', ' mild', ' severe']
+
+# Upper bound on the number of symptoms combined into one sample
+MAX_SYMPTOMS = 7
+
+def _generate_texts(rng, symptoms, count):
+    """Draw `count` symptom descriptions for one disease"""
+    symptoms = np.asarray(symptoms)
+    # Random selection of 2-7 symptoms, without replacement and in random order
+    num_symptoms = rng.integers(2, min(MAX_SYMPTOMS, len(symptoms)) + 1, size=count)
+    order = np.argsort(rng.random((count, len(symptoms))), axis=1)
+    selected = symptoms[order]
+    width = min(MAX_SYMPTOMS, len(symptoms))
+    connectors = np.asarray(CONNECTORS)[rng.integers(0, len(CONNECTORS), size=(count, width - 1))]
+
+    # Append one column at a time; rows with fewer symptoms keep their text unchanged
+    text = selected[:, 0]
+    for i in range(1, width):
+        extended = np.char.add(np.char.add(text, connectors[:, i - 1]), selected[:, i])
+        text = np.where(i < num_symptoms, extended, text)
+
+    prefixes = np.asarray(PREFIXES)[rng.integers(0, len(PREFIXES), size=count)]
+    suffixes = np.asarray(SUFFIXES)[rng.integers(0, len(SUFFIXES), size=count)]
+    return np.char.strip(np.char.add(np.char.add(prefixes, text), suffixes))
+
+def iter_training_chunks(samples_per_disease=200, seed=None, chunk_size=100_000):
+    """
+    Yield the training dataset as DataFrames of at most chunk_size rows
+    Columns: symptoms, disease, specialty
+    """
+    rng = np.random.default_rng(seed)
+    for disease, info in DISEASE_DATA.items():
+        remaining = samples_per_disease
+        while remaining > 0:
+            count = min(remaining, chunk_size)
+            remaining -= count
+            yield pd.DataFrame({
+                'symptoms': _generate_texts(rng, info['symptoms'], count).astype(object),
+                'disease': disease,
+                'specialty': info['specialty']
+            })
+
+def create_training_dataset(samples_per_disease=200, seed=None):
+    """Create the training dataset in memory (200 samples per disease by default)"""
+    return pd.concat(iter_training_chunks(samples_per_disease, seed), ignore_index=True)
+
+def write_training_dataset(path, samples_per_disease=200, seed=None, chunk_size=100_000):
+    """
+    Stream the training dataset to a .csv or .parquet file chunk by chunk
+    Only one chunk is held in memory; Parquet output needs pyarrow
+    Returns the number of rows written
+    """
+    rows = 0
+    chunks = iter_training_chunks(samples_per_disease, seed, chunk_size)
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Writing Parquet requires pyarrow (pip install pyarrow)")
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    if os.path.exists(path):
+        os.remove(path)
+    for chunk in chunks:
+        chunk.to_csv(path, mode='a', header=rows == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate the synthetic symptom training dataset')
+    parser.add_argument('output', help='Output .csv or .parquet file')
+    parser.add_argument('--samples-per-disease', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    written = write_training_dataset(args.output, args.samples_per_disease, args.seed, args.chunk_size)
+    print(f"Wrote {written} rows to {args.output}")